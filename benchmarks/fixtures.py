@@ -0,0 +1,127 @@
+"""Synthetic inputs for run_benchmarks.py, generated from a seed so every run (and every
+commit) is measured on exactly the same data.
+
+- plcopen_export(): a PLCopen XML export with a mix of ST, FBD and CFC POUs that call
+  each other, with comments, strings and pragmas in the ST so the scanner has to skip them.
+- file_tree(): nested folders of empty files for FileRenamer.
+- qr_rows(): a name,data,label CSV for QRcodeMaker.
+- card_manifest(): a repo_name,image,subtext CSV plus a large JPEG for Create_social_card.
+"""
+import csv
+import os
+import random
+
+XML_HEADER = ('<?xml version="1.0" encoding="utf-8"?>\n'
+              '<project xmlns="http://www.plcopen.org/xml/tc6_0200">'
+              '<fileHeader companyName="bench" productName="bench" productVersion="1"/>'
+              '<types><dataTypes/><pous>\n')
+XML_FOOTER = '</pous></types><instances/></project>\n'
+XHTML = '<xhtml xmlns="http://www.w3.org/1999/xhtml">%s</xhtml>'
+
+def pou_names(n):
+    # Programs are the call-graph roots; the rest are function blocks and functions
+    names = []
+    for i in range(n):
+        if i % 50 == 0:
+            names.append(("PRG_%05d" % i, "program"))
+        elif i % 4 == 0:
+            names.append(("FC_%05d" % i, "function"))
+        else:
+            names.append(("FB_%05d" % i, "functionBlock"))
+    return names
+
+def _st_body(rng, names, lines):
+    out = []
+    for k in range(lines):
+        callee = rng.choice(names)
+        r = k % 5
+        if r == 0:
+            out.append("IF a%d &gt; 10 THEN %s(x := b%d); END_IF\n" % (k, callee, k))
+        elif r == 1:
+            out.append("y%d := %s(a%d, 3) + 1; (* %s( is not a call *)\n" % (k, callee, k, rng.choice(names)))
+        elif r == 2:
+            out.append("s%d := 'CALL %s(now)'; // %s()\n" % (k, rng.choice(names), rng.choice(names)))
+        elif r == 3:
+            out.append("{attribute 'hide'} inst%d.%s(); FOR i := 0 TO 9 DO n := n + i; END_FOR\n"
+                       % (k, callee))
+        else:
+            out.append("CASE state OF 1: state := 2; ELSE %s(); END_CASE\n" % callee)
+    return XHTML % "".join(out)
+
+def _graphical_body(rng, names, lang, blocks):
+    parts = []
+    for k in range(blocks):
+        parts.append('<block localId="%d" typeName="%s" height="60" width="80">'
+                     '<position x="%d" y="%d"/><inputVariables/><outputVariables/></block>'
+                     % (k + 1, rng.choice(names), 40 * k, 20 * (k % 7)))
+    return "<%s>%s</%s>" % (lang, "".join(parts), lang)
+
+def plcopen_export(path, n, seed=1, st_lines=200, blocks=20):
+    """Write an export with n POUs: 2/3 ST (some with an action), 1/6 FBD, 1/6 CFC."""
+    rng = random.Random(seed)
+    pous = pou_names(n)
+    names = [name for name, _ in pous]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(XML_HEADER)
+        for i, (name, pou_type) in enumerate(pous):
+            f.write('<pou name="%s" pouType="%s"><interface><localVars>'
+                    '<variable name="x"><type><INT/></type></variable></localVars></interface><body>'
+                    % (name, pou_type))
+            kind = i % 6
+            if kind == 0:
+                f.write(_graphical_body(rng, names, "FBD", blocks))
+            elif kind == 3:
+                f.write(_graphical_body(rng, names, "CFC", blocks))
+            else:
+                f.write("<ST>%s</ST>" % _st_body(rng, names, st_lines))
+            f.write("</body>")
+            if kind == 1:
+                f.write('<actions><action name="Reset"><body><ST>%s</ST></body></action></actions>'
+                        % _st_body(rng, names, st_lines // 10))
+            f.write("</pou>\n")
+        f.write(XML_FOOTER)
+    return path
+
+def file_tree(root, n, per_dir=50):
+    """Create n empty files (.txt and .log, alternating) spread over nested folders."""
+    made = folder = 0
+    while made < n:
+        path = os.path.join(root, "a%d" % (folder % 10), "b%d" % (folder // 10 % 10), "c%d" % folder)
+        os.makedirs(path, exist_ok=True)
+        for i in range(min(per_dir, n - made)):
+            name = "f%d.txt" % i if i % 2 else "f%d.log" % i
+            open(os.path.join(path, name), "w").close()
+            made += 1
+        folder += 1
+    return root
+
+def qr_rows(path, n, seed=1):
+    """name,data,label CSV with part-number style rows (no duplicates)."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "data", "label"])
+        for i in range(n):
+            part = "P%06d" % i
+            w.writerow([part, "https://parts.example.com/item/%s?rev=%d" % (part, rng.randint(1, 9)),
+                        "Part %s rev %d" % (part, rng.randint(1, 9))])
+    return path
+
+def card_manifest(directory, n, image_size=(6000, 4000)):
+    """cards.csv with n cards sharing one large JPEG, like a folder of camera photos."""
+    from PIL import Image, ImageDraw
+    os.makedirs(directory, exist_ok=True)
+    image = os.path.join(directory, "photo.jpg")
+    if not os.path.exists(image):
+        img = Image.new("RGB", image_size, (40, 90, 160))
+        draw = ImageDraw.Draw(img)
+        for k in range(0, image_size[0], 200):
+            draw.rectangle([k, 0, k + 100, image_size[1]], fill=(200, 120 + k % 100, 60))
+        img.save(image, quality=90)
+    path = os.path.join(directory, "cards.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["repo_name", "image", "subtext", "output"])
+        for i in range(n):
+            w.writerow(["repo-%d" % (i % 4), "photo.jpg", "Benchmark card number %d" % i, "card_%04d.png" % i])
+    return path
@@ -0,0 +1,360 @@
+"""Benchmark the call-graph engine, FileRenamer and the image tools on synthetic inputs.
+
+    python benchmarks/run_benchmarks.py                       # medium size, all benchmarks
+    python benchmarks/run_benchmarks.py --size small --only st_scan,build_call_graph
+    python benchmarks/run_benchmarks.py -o before.json        # save the results ...
+    python benchmarks/run_benchmarks.py --compare before.json # ... and compare after a change
+
+Inputs come from fixtures.py with a fixed seed, so results from different commits are
+directly comparable. Each benchmark runs --repeat times; the minimum is the number to
+compare (the median shows how noisy the machine was). --compare exits with status 1
+if any benchmark got slower by more than --threshold. The startup_* benchmarks also
+fail the run when a tool takes longer than STARTUP_BUDGET_MS to start.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+sys.path.insert(0, REPO)
+
+import fixtures # noqa: E402
+
+RESULTS_VERSION = 1
+
+# Cold start of `mypyhelpers <tool> --help` in a new interpreter, in milliseconds.
+# Heavy dependencies are imported lazily, so this stays well below the budget; the
+# run fails if any tool goes over it.
+STARTUP_BUDGET_MS = 100
+STARTUP_TOOLS = ("rename", "qr", "card", "callgraph", "analyse", "render", "crossref", "diff")
+
+# Fixture sizes: POUs in the export, files in the rename tree, QR rows, social cards
+SIZES = {
+    "small": {"pous": 300, "files": 2000, "qr": 200, "cards": 4},
+    "medium": {"pous": 3000, "files": 20000, "qr": 1000, "cards": 12},
+    "large": {"pous": 20000, "files": 100000, "qr": 5000, "cards": 40},
+}
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+# Each benchmark is prepared once (fixtures, imports) and returns a function that does
+# the measured work and returns the number of items processed.
+class Workspace:
+    def __init__(self, root, size):
+        self.root = root
+        self.size = SIZES[size]
+        self._xml = None
+        self._pous = None
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def xml(self):
+        if self._xml is None:
+            self._xml = fixtures.plcopen_export(self.path("export.xml"), self.size["pous"])
+        return self._xml
+
+    def pous(self):
+        if self._pous is None:
+            from mypyhelpers.plcopen_xml import iter_pous
+            self._pous = [pou for pou in iter_pous(self.xml()) if pou.name]
+        return self._pous
+
+    def fresh_dir(self, name):
+        path = self.path(name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+def bench_parse(ws):
+    from mypyhelpers.plcopen_xml import iter_pous
+    xml = ws.xml()
+    return lambda: sum(1 for _ in iter_pous(xml))
+
+def bench_st_scan(ws):
+    from mypyhelpers.callgraph import detect_calls_in_st
+    from mypyhelpers.st_scanner import PouIndex
+    pous = ws.pous()
+    index = PouIndex(pou.name for pou in pous)
+    texts = [text for pou in pous for text in pou.st_texts]
+    def run():
+        for text in texts:
+            detect_calls_in_st(text, index)
+        return len(texts)
+    return run
+
+def bench_fbd_scan(ws):
+    from mypyhelpers.callgraph import detect_calls_in_fbd
+    bodies = [pou.block_types for pou in ws.pous() if pou.block_types]
+    def run():
+        for block_types in bodies:
+            detect_calls_in_fbd(block_types)
+        return len(bodies)
+    return run
+
+def bench_build_call_graph(ws):
+    from mypyhelpers.callgraph import build_call_graph
+    xml = ws.xml()
+    count = len(ws.pous())
+    def run():
+        build_call_graph(xml, workers=1, cache=None)
+        return count
+    return run
+
+def bench_build_call_graph_cached(ws):
+    # Second run of an unchanged export: everything comes from callgraph_cache.json
+    from mypyhelpers.callgraph import build_call_graph
+    from mypyhelpers.callgraph_cache import CACHE_FILE, CallGraphCache
+    xml = ws.xml()
+    cache_path = os.path.join(ws.fresh_dir("callgraph_cache"), CACHE_FILE)
+    build_call_graph(xml, cache=CallGraphCache(cache_path))
+    count = len(ws.pous())
+    def run():
+        build_call_graph(xml, workers=1, cache=CallGraphCache(cache_path))
+        return count
+    return run
+
+def bench_callgraph_diff(ws):
+    # The fixture's call graph against a "next release": 1% of the edges dropped, 1% new
+    import random
+    from mypyhelpers.callgraph import build_call_graph
+    from mypyhelpers.callgraph_diff import diff_call_graphs
+    old = build_call_graph(ws.xml())
+    rng = random.Random(1)
+    new = set(e for e in old if rng.random() > 0.01)
+    callers = sorted(set(a for a, _ in old))
+    new.update((rng.choice(callers), "FB_NEW_%d" % i) for i in range(len(old) // 100))
+    def run():
+        diff_call_graphs(old, new)
+        return len(old) + len(new)
+    return run
+
+def _rename_tree(ws):
+    root = ws.path("tree")
+    if not os.path.isdir(root):
+        fixtures.file_tree(root, ws.size["files"])
+    return root
+
+def bench_rename_plan(ws):
+    from mypyhelpers.FileRenamer import make_rule, plan_renames
+    root = _rename_tree(ws)
+    rule = make_rule("add", "prefix", "bak_", ".txt")
+    return lambda: plan_renames(root, rule, recursive=True).entries
+
+def bench_rename_apply(ws):
+    # Rename half the tree (the .txt files), then undo outside the timed part
+    from mypyhelpers.FileRenamer import make_rule, run_rule, undo_journal
+    root = _rename_tree(ws)
+    rule = make_rule("add", "prefix", "bak_", ".txt")
+    journal = ws.path("rename_journal.jsonl")
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = run_rule(root, rule, recursive=True, journal_path=journal, verbose=False)
+        return summary["renamed"]
+    def undo():
+        undo_journal(journal)
+        os.remove(journal)
+    run.teardown = undo
+    return run
+
+def _qr_bench(kind, use_cache=False):
+    def bench(ws):
+        from mypyhelpers.QRcodeMaker import batch_generate
+        rows = ws.path("qr.csv")
+        if not os.path.exists(rows):
+            fixtures.qr_rows(rows, ws.size["qr"])
+        out = ws.fresh_dir("qr_" + kind + ("_cached" if use_cache else ""))
+        if use_cache:
+            with contextlib.redirect_stdout(io.StringIO()):
+                batch_generate(rows, out, workers=1, kind=kind)
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = batch_generate(rows, out, workers=1, use_cache=use_cache, kind=kind)
+            return summary["images"] + summary["skipped"]
+        return run
+    return bench
+
+def bench_social_cards(ws):
+    from mypyhelpers.Create_social_card import batch_social_cards
+    manifest = fixtures.card_manifest(ws.path("cards_in"), ws.size["cards"])
+    out = ws.fresh_dir("cards_out")
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = batch_social_cards(manifest, out, workers=1, use_cache=False)
+        return summary["cards"]
+    return run
+
+def _startup_bench(tool):
+    def bench(ws):
+        command = [sys.executable, "-m", "mypyhelpers", tool, "--help"]
+        env = dict(os.environ)
+        env.pop("MYPYHELPERS_TIMING", None)
+        def run():
+            subprocess.run(command, stdout=subprocess.DEVNULL, check=True, env=env, cwd=REPO)
+            return 1
+        run.budget = STARTUP_BUDGET_MS / 1000.0
+        return run
+    return bench
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "st_scan": bench_st_scan,
+    "fbd_scan": bench_fbd_scan,
+    "build_call_graph": bench_build_call_graph,
+    "build_call_graph_cached": bench_build_call_graph_cached,
+    "callgraph_diff": bench_callgraph_diff,
+    "rename_plan": bench_rename_plan,
+    "rename_apply": bench_rename_apply,
+    "qr_png": _qr_bench("png"),
+    "qr_svg": _qr_bench("svg"),
+    "qr_png_cached": _qr_bench("png", use_cache=True),
+    "social_cards": bench_social_cards,
+}
+for _tool in STARTUP_TOOLS:
+    BENCHMARKS["startup_" + _tool] = _startup_bench(_tool)
+
+# -----------------------------
+# Runner
+# -----------------------------
+def measure(run, repeat):
+    times = []
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = run()
+        times.append(time.perf_counter() - start)
+        teardown = getattr(run, "teardown", None)
+        if teardown is not None:
+            teardown()
+    best = min(times)
+    result = {"min": best, "median": statistics.median(times), "times": times,
+              "items": items, "rate": items / best if best else None}
+    if getattr(run, "budget", None):
+        result["budget"] = run.budget
+    return result
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "-C", REPO, "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "-C", REPO, "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return out, bool(dirty)
+
+def environment():
+    commit, dirty = git_commit()
+    from mypyhelpers import plcopen_xml
+    plcopen_xml.etree()
+    HAVE_LXML = plcopen_xml.HAVE_LXML
+    return {"commit": commit, "dirty": dirty, "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "platform": platform.platform(),
+            "machine": platform.machine(), "cpu_count": os.cpu_count(), "lxml": HAVE_LXML,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+def run_benchmarks(names, size="medium", repeat=3, workdir=None):
+    """Run the named benchmarks and return the results document (a dict)."""
+    root = workdir or tempfile.mkdtemp(prefix="mypyhelpers_bench_")
+    os.makedirs(root, exist_ok=True)
+    ws = Workspace(root, size)
+    results = {}
+    try:
+        for name in names:
+            print(f"{name:<26}", end="", flush=True)
+            try:
+                run = BENCHMARKS[name](ws)
+                result = measure(run, repeat)
+            except ImportError as e:
+                # e.g. Pillow/qrcode not installed: skip the image benchmarks
+                print(f"skipped ({e})")
+                continue
+            results[name] = result
+            print(f"{result['min'] * 1000:10.1f} ms  {result['rate'] or 0:12,.0f} items/s  "
+                  f"({result['items']} items)"
+                  + (f"  OVER BUDGET ({result['budget'] * 1000:.0f} ms)" if over_budget(result) else ""))
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    doc = {"version": RESULTS_VERSION, "size": size, "repeat": repeat, "fixtures": ws.size}
+    doc.update(environment())
+    doc["results"] = results
+    return doc
+
+def over_budget(result):
+    return "budget" in result and result["min"] > result["budget"]
+
+def compare(old, new, threshold=0.10):
+    """Print old vs new minimum times; returns the names that got slower than threshold."""
+    regressions = []
+    if old.get("size") != new.get("size"):
+        print(f"Warning: comparing size {old.get('size')} with size {new.get('size')}")
+    print(f"\n{'benchmark':<26}{'old ms':>10}{'new ms':>10}{'change':>9}   ({old.get('commit')} -> {new.get('commit')})")
+    for name, result in new["results"].items():
+        before = old.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<26}{'':>10}{result['min'] * 1000:10.1f}      new")
+            continue
+        ratio = result["min"] / before["min"] if before["min"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<26}{before['min'] * 1000:10.1f}{result['min'] * 1000:10.1f}{ratio - 1:+9.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MyPyHelpers on synthetic inputs.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="medium")
+    parser.add_argument("--only", help="Comma-separated benchmark names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="Compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression (default: 0.10)")
+    parser.add_argument("--workdir", help="Keep the generated fixtures in this folder (reused next time)")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    names = list(BENCHMARKS)
+    if args.only:
+        names = [n.strip() for n in args.only.split(",") if n.strip()]
+        unknown = [n for n in names if n not in BENCHMARKS]
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(unknown)} (see --list)")
+
+    doc = run_benchmarks(names, args.size, max(1, args.repeat), args.workdir)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Results written to {args.output}")
+    over = [name for name, result in doc["results"].items() if over_budget(result)]
+    if over:
+        print(f"Over the time budget: {', '.join(over)}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        if compare(old, doc, args.threshold):
+            return 1
+    return 1 if over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
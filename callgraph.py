@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# callgraph.py
+# `python callgraph.py` from a checkout. The code lives in mypyhelpers/callgraph.py.
+import sys
+
+from mypyhelpers.callgraph import * # noqa: F401,F403 (for scripts doing `from callgraph import ...`)
+from mypyhelpers.callgraph import main
+
+if __name__ == "__main__":
+    sys.exit(main())
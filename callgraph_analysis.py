@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# callgraph_analysis.py
+# `python callgraph_analysis.py` from a checkout. The code lives in mypyhelpers/callgraph_analysis.py.
+import sys
+
+from mypyhelpers.callgraph_analysis import * # noqa: F401,F403 (for scripts doing `from callgraph_analysis import ...`)
+from mypyhelpers.callgraph_analysis import main
+
+if __name__ == "__main__":
+    sys.exit(main())
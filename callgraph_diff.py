@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# callgraph_diff.py
+# `python callgraph_diff.py` from a checkout. The code lives in mypyhelpers/callgraph_diff.py.
+import sys
+
+from mypyhelpers.callgraph_diff import * # noqa: F401,F403 (for scripts doing `from callgraph_diff import ...`)
+from mypyhelpers.callgraph_diff import main
+
+if __name__ == "__main__":
+    sys.exit(main())
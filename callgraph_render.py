@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# callgraph_render.py
+# `python callgraph_render.py` from a checkout. The code lives in mypyhelpers/callgraph_render.py.
+import sys
+
+from mypyhelpers.callgraph_render import * # noqa: F401,F403 (for scripts doing `from callgraph_render import ...`)
+from mypyhelpers.callgraph_render import main
+
+if __name__ == "__main__":
+    sys.exit(main())
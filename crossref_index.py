@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+# crossref_index.py
+# `python crossref_index.py` from a checkout. The code lives in mypyhelpers/crossref_index.py.
+import sys
+
+from mypyhelpers.crossref_index import * # noqa: F401,F403 (for scripts doing `from crossref_index import ...`)
+from mypyhelpers.crossref_index import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,12 @@
 
 import csv
 import os
+import sys
+
+# The shared helpers are in the mypyhelpers package next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mypyhelpers.st_scanner import PouIndex, scan_references
+from mypyhelpers.crossref_export import export_cross_reference
 
 proj = projects.primary
 if proj is None:
@@ -24,18 +30,8 @@ if not os.path.exists(export_dir):
 crossref_path = os.path.join(export_dir, "cross_reference.csv")
 cross_ref = proj.get_cross_reference()
 
-with open(crossref_path, mode="w", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow(["Variable", "Location", "Type", "Access", "POU", "Line"])
-    for entry in cross_ref:
-        writer.writerow([
-            entry.name,
-            entry.location,
-            entry.type,
-            entry.access,
-            entry.pou,
-            entry.line
-        ])
+# Batched, buffered writes with progress output (see crossref_export.py)
+export_cross_reference(cross_ref, crossref_path)
 
 print("Cross reference exported to:", crossref_path)
 
@@ -47,17 +43,20 @@ callgraph_path = os.path.join(export_dir, "pou_call_graph.csv")
 # Helper: get all POUs
 pous = [pou for pou in proj.get_pous()]
 
+# Index all POU names once; each POU's text is then scanned in a single pass
+index = PouIndex(pou.name for pou in pous)
+
 # Build call relationships
 edges = []
 for pou in pous:
-    # Search for calls to other POUs in this POU's text
+    # Search for references to other POUs in this POU's text
     try:
         code = pou.text  # Works for ST; for FBD/CFC, you'd parse XML
     except:
         code = ""
-    for target in pous:
-        if target.name != pou.name and target.name in code:
-            edges.append((pou.name, target.name))
+    for target in scan_references(code or "", index):
+        if target != pou.name:
+            edges.append((pou.name, target))
 
 # Write CSV
 with open(callgraph_path, mode="w", newline="", encoding="utf-8") as f:
@@ -87,4 +86,4 @@ The POU Call Graph is basically a map of execution relationships:
 • 	 → gives the full path to the  file
 • 	 → built‑in CODESYS API for variable usage
 • 	 → returns all POUs in the project
-• 	Simple string search in  → finds calls to other POUs (works well for ST; for FBD/CFC, we’d parse the PLCopen XML if you want 100% accuracy)'''
\ No newline at end of file
+• 	Token scan of  (st_scanner.py, comments/strings skipped) → finds calls to other POUs (works well for ST; for FBD/CFC, we’d parse the PLCopen XML if you want 100% accuracy)'''
\ No newline at end of file
@@ -20,6 +20,8 @@ What you can do with the call graph
 - Spot dead code (POUs with no inbound edges).
 - Identify deep chains that are performance or complexity hotspots.
 - Feed it into Mermaid to produce shareable diagrams for your team.
+- Run callgraph_analysis.py on pou_call_graph.csv (or callgraph.py --analyse) to get the dead code,
+  call depth, recursion and fan-in/fan-out numbers computed for you (analysis.csv / analysis.json).
 
 How it works
 - Cross reference: uses the IDEs scripting API. If your SP build does not expose the cross reference programmatically, the script will skip it 
@@ -35,86 +37,30 @@ Comments and commented-out code are ignored by cross reference and wont pollute
 import os, re, csv, sys, time
 from datetime import datetime
 
-# .NET XML (works in IronPython inside CODESYS)
-import clr
-from System.Xml import XmlDocument, XmlNamespaceManager
-from System.IO import Directory, Path, File
+# The shared helpers are in the mypyhelpers package next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Call-graph engine (see mypyhelpers/callgraph.py; it also runs standalone on CPython)
+from mypyhelpers.callgraph import ensure_dir, find_latest_xml, export_call_graph
+from mypyhelpers.crossref_export import export_cross_reference
+from mypyhelpers import instrument
+
+# Set to True (or set the MYPYHELPERS_TIMING environment variable before starting
+# CODESYS) to get export_crossref_and_calls_timing.json in Exports: time per stage,
+# POU/edge/row counts and peak memory. "profile" instead of True also dumps a .prof file.
+TIMING = False
 
 # -----------------------------
 # Helpers
 # -----------------------------
-def ensure_dir(p):
-    if not os.path.exists(p):
-        os.makedirs(p)
-
 def now_stamp():
     return datetime.now().strftime("%Y-%m-%d %H.%M.%S")
 
-def find_latest_xml(search_dirs):
-    # Find the most recently modified .xml file likely to be a PLCopen export
-    candidates = []
-    for d in search_dirs:
-        if not os.path.isdir(d):
-            continue
-        for fname in os.listdir(d):
-            if fname.lower().endswith(".xml"):
-                full = os.path.join(d, fname)
-                try:
-                    candidates.append((os.path.getmtime(full), full))
-                except:
-                    pass
-    if not candidates:
-        return None
-    candidates.sort(reverse=True)
-    return candidates[0][1]
-
-def read_xml(path):
-    doc = XmlDocument()
-    doc.Load(path)
-    return doc
-
-def ns_manager(doc):
-    # PLCopen namespaces commonly used
-    nsm = XmlNamespaceManager(doc.NameTable)
-     # Detect the default namespace from the root element
-    root_ns = doc.DocumentElement.NamespaceURI
-    nsm.AddNamespace("plc", root_ns) # Prefix 'plc' maps to PLCopen root namespace as per .xml file
-    # Sometimes ST bodies are wrapped in XHTML
-    nsm.AddNamespace("xhtml", "http://www.w3.org/1999/xhtml") # Prefix 'xhtml' maps to XHTML namespace
-    return nsm
-
-def sanitize_identifier(s):
-    # basic Mermaid-safe node label
-    return re.sub(r"[^A-Za-z0-9_:.]+", "_", s)
-
-# Simple ST call detector: looks for identifiers followed by '(' that match known POUs
-def detect_calls_in_st(st_text, pou_names):
-    calls = set()
-    # Remove comments (// ... EOL) and (* ... *)
-    no_line = re.sub(r"//.*?$", "", st_text, flags=re.MULTILINE)
-    no_block = re.sub(r"\(\*.*?\*\)", "", no_line, flags=re.DOTALL)
-    # Find tokens that look like a call: Name(   but avoid IF(, AND( etc by later filtering against pou_names
-    for m in re.finditer(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(", no_block):
-        name = m.group(1)
-        if name in pou_names:
-            calls.add(name)
-    return calls
-
-# Extract calls from FBD/CFC blocks: <block><typeName>Target</typeName>...
-def detect_calls_in_fbd(fbd_node, nsm):
-    callees = set()
-    blocks = fbd_node.SelectNodes(".//plc:block", nsm)
-    if blocks is None: 
-        return callees
-    for b in blocks:
-        t = b.SelectSingleNode("./plc:typeName", nsm)
-        if t is not None and t.InnerText:
-            callees.add(t.InnerText.strip())
-    return callees
-
 # -----------------------------
 # Entry
 # -----------------------------
+instrument.setup("export_crossref_and_calls", timing=bool(TIMING), profile=TIMING == "profile")
+
 proj = projects.primary
 if proj is None:
     raise Exception("No project open.")
@@ -130,23 +76,16 @@ print("Exports folder:", export_dir)
 # -----------------------------
 # 1) Cross reference CSV (best-effort)
 # -----------------------------
+# Use "cross_reference.csv.gz" for multi-million-row projects (see crossref_export.py)
 crossref_csv = os.path.join(export_dir, "cross_reference.csv")
 crossref_ok = False
 try:
     cross_ref = proj.get_cross_reference()
-    import codecs
-    with codecs.open(crossref_csv, "w", encoding="utf-8") as f:
-        w = csv.writer(f, lineterminator="\n")
-        w.writerow(["Variable", "Location", "Type", "Access", "POU", "Line"])
-        for e in cross_ref:
-            # Some builds expose different attribute names; try safely
-            name  = getattr(e, "name", "")
-            loc   = getattr(e, "location", "")
-            typ   = getattr(e, "type", "")
-            acc   = getattr(e, "access", "")
-            pou   = getattr(e, "pou", "")
-            line  = getattr(e, "line", "")
-            w.writerow([name, loc, typ, acc, pou, line])
+    # Streams in batches; some builds expose different attribute names, which
+    # are resolved once per entry type
+    with instrument.stage("cross_reference"):
+        rows = export_cross_reference(cross_ref, crossref_csv)
+    instrument.count("crossref_rows", rows)
     crossref_ok = True
     print("Cross reference exported:", crossref_csv)
 except Exception as ex:
@@ -157,10 +96,10 @@ except Exception as ex:
 # -----------------------------
 # Strategy:
 #  - Auto-discover the newest .xml in project root or Exports
-#  - Parse <project>/<types>/<pous>/<pou name=...>
-#  - For each POU:
+#  - Hand it to callgraph.export_call_graph(), which streams
+#    <project>/<types>/<pous>/<pou name=...> and for each POU:
 #      ST: parse <body><ST> text -> detect calls to other POUs
-#      FBD/CFC: parse <body><FBD|CFC> blocks' <typeName> as callees
+#      FBD/CFC: parse <body><FBD|CFC> blocks' typeName as callees
 
 search_dirs = [proj_dir, export_dir]
 PLCOPEN_XML_HINT = None  # You can hard-set e.g.: r"C:\...\your_export.xml"
@@ -171,75 +110,9 @@ if xml_path is None:
 
 print("Using PLCopen XML:", xml_path)
 
-doc = read_xml(xml_path)
-nsm = ns_manager(doc)
-
-# Gather POU names
-pou_nodes = doc.SelectNodes("//plc:pou", nsm)
-if pou_nodes is None or pou_nodes.Count == 0:
-    # Some exports nest differently; try a more general lookup
-    pou_nodes = doc.SelectNodes("//pou")
-
-pou_names = set()
-for pn in pou_nodes:
-    nm = pn.GetAttribute("name")
-    if nm:
-        pou_names.add(nm)
-
-edges = set()
-
-for pn in pou_nodes:
-    caller = pn.GetAttribute("name")
-    if not caller:
-        continue
-
-    # ST bodies
-    st_nodes = pn.SelectNodes(".//plc:ST", nsm)
-    if st_nodes is None or st_nodes.Count == 0: # for robustness, change the POU node lookup
-        st_nodes = pn.SelectNodes(".//ST")
-
-    for st in st_nodes or []:
-        # ST may embed XHTML. Gather all text
-        st_text = st.InnerText or ""
-        # Detect calls to known POUs
-        callees = detect_calls_in_st(st_text, pou_names)
-        for c in callees:
-            if c != caller:
-                edges.add((caller, c))
-
-    # FBD/CFC bodies
-    for lang in ("FBD", "CFC"):
-        body_nodes = pn.SelectNodes(".//plc:%s" % lang, nsm)
-        if body_nodes is None or body_nodes.Count == 0: # for robustness, change the POU node lookup
-            body_nodes = pn.SelectNodes(".//%s" % lang)
-
-        for body in body_nodes or []:
-            callees = detect_calls_in_fbd(body, nsm)
-            for c in callees:
-                if c != caller:
-                    edges.add((caller, c))
-
-# Write CSV
-callgraph_csv = os.path.join(export_dir, "pou_call_graph.csv")
-import codecs
-with codecs.open(callgraph_csv, "w", encoding="utf-8") as f:
-    w = csv.writer(f, lineterminator="\n")
-    w.writerow(["Caller", "Callee"])
-    for a, b in sorted(edges):
-        w.writerow([a, b])
-
-print("POU call graph exported:", callgraph_csv)
-
-# Also write Mermaid
-mermaid_path = os.path.join(export_dir, "call_graph.mmd")
-import codecs
-with codecs.open(mermaid_path, "w", encoding="utf-8") as f:
-    f.write("graph TD\n")
-    for a, b in sorted(edges):
-        f.write("    %s --> %s\n" % (sanitize_identifier(a), sanitize_identifier(b)))
-
-print("Mermaid call graph exported:", mermaid_path)
+export_call_graph(xml_path, export_dir)
 
+instrument.finish(export_dir)
 print("All done. Outputs are in:", export_dir)
 
 #Usage notes
@@ -0,0 +1,394 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+
+# Pillow is imported by the functions that draw, so --help and the prompts start quickly
+from . import instrument
+from .archive_output import ArchiveWriter, archive_format, encode_image
+from .output_cache import OutputManifest, atomic_save, file_digest, render_key
+from .render_cache import get_font, resolve_font, text_bbox
+
+LAYOUT_VERSION = 2 # Bump when the card layout changes, so cached cards are redrawn
+
+# GitHub recommended dimensions
+WIDTH, HEIGHT = 1280, 640
+BORDER = 40  # Safe area in pixels
+BACKGROUND = '#ffeef0' # Light pink color matching GitHub template
+
+CHUNK_ROWS = 4 # Cards sent to a worker process at a time (each one decodes a photo)
+
+def card_key(repo_name, image_path, subtext, draft=True):
+    """Hash of everything the card's pixels depend on (the image by content, not by name)."""
+    try:
+        image = file_digest(image_path)
+    except OSError:
+        image = None
+    import PIL
+    return render_key(repo_name=repo_name, image=image, subtext=subtext, font=resolve_font("arial.ttf"),
+                      draft=draft, layout=LAYOUT_VERSION, pillow=PIL.__version__)
+
+@lru_cache(maxsize=16)
+def _title_layer(repo_name):
+    # Background + title are the same for every card of a repo: draw them once, copy per card
+    from PIL import Image, ImageDraw
+    card = Image.new('RGB', (WIDTH, HEIGHT), color=BACKGROUND)
+    draw = ImageDraw.Draw(card)
+
+    # Fonts are looked up once per process (Arial, or a similar system font)
+    title_font = get_font("arial.ttf", 60)
+
+    # Calculate text dimensions (cached per text and font)
+    title_bbox = text_bbox(repo_name, title_font)
+    title_w = title_bbox[2] - title_bbox[0]
+    title_h = title_bbox[3] - title_bbox[1]
+
+    # Draw repo name at the top, centered
+    title_x = (WIDTH - title_w) // 2
+    draw.text((title_x, BORDER), repo_name, font=title_font, fill='#24292e')
+    return card, BORDER + title_h # Layer and the y where the title ends
+
+def load_picture(image_path, max_size, draft=True):
+    """Open image_path as RGB, shrunk to fit max_size (keeping the aspect ratio).
+
+    With draft, JPEGs are decoded straight at 1/2, 1/4 or 1/8 scale (never smaller than
+    max_size), so a 24-megapixel photo is never decoded at full size.
+    """
+    from PIL import Image
+    img = Image.open(image_path)
+    if draft:
+        img.draft('RGB', max_size)
+
+    # Convert to RGB if necessary
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Resize image to fit while maintaining aspect ratio
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return img
+
+def render_social_card(repo_name, image_path, subtext, draft=True, strict=False):
+    """Return the card as a 1280x640 RGB image (see create_social_card).
+
+    If the picture can't be loaded the card is drawn without it, or with strict
+    (batch mode) the error is raised so the card is reported as failed.
+    """
+    from PIL import ImageDraw
+    base, title_bottom = _title_layer(repo_name)
+    card = base.copy()
+    draw = ImageDraw.Draw(card)
+    subtext_font = get_font("arial.ttf", 32)
+
+    # Load and process the center image
+    try:
+        # Calculate available space for image
+        available_width = WIDTH - 2 * BORDER
+        available_height = HEIGHT - title_bottom - BORDER * 3 - 60  # Space for subtext
+        img = load_picture(image_path, (available_width, available_height), draft)
+
+        # Center the image
+        img_x = (WIDTH - img.width) // 2
+        img_y = title_bottom + BORDER
+
+        # Paste image
+        card.paste(img, (img_x, img_y))
+
+        # Calculate subtext position
+        subtext_y = img_y + img.height + BORDER // 2
+
+    except Exception as e:
+        if strict:
+            raise
+        print(f"Error loading image: {e}")
+        # If image fails to load, just place subtext in center
+        subtext_y = HEIGHT // 2 + 50
+
+    # Draw subtext, centered
+    subtext_bbox = text_bbox(subtext, subtext_font)
+    subtext_w = subtext_bbox[2] - subtext_bbox[0]
+    subtext_x = (WIDTH - subtext_w) // 2
+
+    # Make sure subtext doesn't go below safe area
+    if subtext_y + subtext_bbox[3] > HEIGHT - BORDER:
+        subtext_y = HEIGHT - BORDER - subtext_bbox[3]
+
+    draw.text((subtext_x, subtext_y), subtext, font=subtext_font, fill='#586069')
+    return card
+
+def create_social_card(repo_name, image_path, subtext, output_path="social_preview.png", use_cache=True, archive=None,
+                       optimize=True, compress_level=None):
+    """
+    Create a GitHub social card with repo name, image, and subtext
+
+    Args:
+        repo_name (str): Repository name for the heading
+        image_path (str): Path to the image file
+        subtext (str): Description text below the image
+        output_path (str): Output file path
+        use_cache (bool): Skip the card if render_manifest.json says it is up to date
+        archive (ArchiveWriter): Append the card to this zip/tar/pdf as output_path's
+            file name instead of writing a file
+        optimize (bool), compress_level (int 0-9): PNG settings; optimize=True is the
+            smallest and slowest, compress_level=1 the fastest
+    """
+    manifest = None
+    if use_cache and archive is None:
+        manifest = OutputManifest(os.path.dirname(os.path.abspath(output_path)))
+        filename, key = os.path.basename(output_path), card_key(repo_name, image_path, subtext, draft=False)
+        if manifest.is_current(filename, key):
+            print(f"✅ Social card is up to date: {output_path}")
+            return output_path
+        src = manifest.find(key)
+        if src is not None:
+            manifest.link(src, filename, key) # Same card under another name: no need to draw it again
+            manifest.save()
+            print(f"✅ Social card saved to: {output_path}")
+            return output_path
+
+    card = render_social_card(repo_name, image_path, subtext, draft=False) # One card: full-quality decode
+    png_args = png_options(optimize, compress_level)
+
+    # Save the card
+    if archive is not None:
+        archive.add_image(os.path.basename(output_path), card, **png_args)
+        print(f"✅ Social card added to: {archive.path}")
+        return archive.path
+    atomic_save(card, output_path, format='PNG', **png_args)
+    if manifest is not None:
+        manifest.record(filename, key)
+        manifest.save()
+    print(f"✅ Social card saved to: {output_path}")
+    return output_path
+
+def png_options(optimize=True, compress_level=None):
+    if optimize:
+        return {"optimize": True}
+    return {"compress_level": 6 if compress_level is None else compress_level}
+
+# -----------------------------
+# Batch mode
+# -----------------------------
+def iter_card_rows(path, errors=None):
+    """Stream (output, repo_name, image, subtext) rows from a .csv or .jsonl manifest.
+
+    Columns / keys: repo_name, image, subtext and optionally output (the file name;
+    by default derived from repo_name). Relative image paths are relative to the
+    manifest file. JSONL lines that are not valid JSON objects are skipped and
+    described in errors ("cards.jsonl:7: ..."), if a list is given.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    name = os.path.basename(path)
+
+    def bad(line, reason):
+        if errors is not None:
+            errors.append(f"{name}:{line}: {reason}")
+
+    def json_rows(f):
+        for i, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                bad(i, f"not valid JSON ({e})")
+                continue
+            if not isinstance(row, dict):
+                bad(i, "expected a JSON object")
+                continue
+            yield row
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = json_rows(f)
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            repo_name = row.get("repo_name") or row.get("name") or ""
+            output = row.get("output") or re.sub(r'[<>:"/\\|?*\s]+', "_", repo_name).strip("._") + ".png"
+            yield output, repo_name, os.path.join(base, row.get("image") or ""), row.get("subtext") or ""
+
+def _render_cards(chunk, target, png_args, draft):
+    # Runs in a worker process: the card is saved (or encoded for the archive) right there
+    done, errors = [], []
+    for output, repo_name, image_path, subtext, key in chunk:
+        try:
+            with instrument.stage("render"):
+                card = render_social_card(repo_name, image_path, subtext, draft, strict=True)
+            with instrument.stage("encode"):
+                if isinstance(target, tuple): # ("archive", fmt)
+                    done.append((output, encode_image(card, target[1], **png_args)))
+                else:
+                    atomic_save(card, os.path.join(target, output), format='PNG', **png_args)
+                    done.append((output, key))
+        except Exception as e:
+            errors.append(f"{output}: {e}")
+    return done, errors
+
+def batch_social_cards(manifest_path, out_dir=".", workers=None, optimize=False, compress_level=6,
+                       archive=None, use_cache=True, draft=True):
+    """Render every card listed in a CSV/JSONL manifest. Returns a summary dict.
+
+    Cards are rendered by a pool of worker processes, a few at a time, and written to
+    out_dir (or streamed into one archive, in manifest order). Cards that are up to date
+    according to out_dir/render_manifest.json are skipped.
+    """
+    workers = workers or os.cpu_count() or 1
+    png_args = png_options(optimize, compress_level)
+    writer = manifest = None
+    if archive:
+        writer = ArchiveWriter(archive)
+        target = ("archive", writer.fmt)
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+        target = out_dir
+        if use_cache:
+            manifest = OutputManifest(out_dir)
+    summary = {"cards": 0, "skipped": 0, "errors": []}
+    start = time.perf_counter()
+
+    def plan():
+        planned = {} # output -> row that writes it; a later row with other contents is an error
+        for output, repo_name, image_path, subtext in iter_card_rows(manifest_path, summary["errors"]):
+            if output in planned:
+                if planned[output] != (repo_name, image_path, subtext):
+                    summary["errors"].append(f"{output}: an earlier row already writes this card")
+                continue
+            planned[output] = (repo_name, image_path, subtext)
+            key = None
+            if manifest is not None:
+                key = card_key(repo_name, image_path, subtext, draft)
+                if manifest.is_current(output, key):
+                    continue
+            yield output, repo_name, image_path, subtext, key
+
+    def chunks():
+        chunk = []
+        for row in plan():
+            chunk.append(row)
+            if len(chunk) >= CHUNK_ROWS:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def collect(result):
+        done, errors = result
+        summary["cards"] += len(done)
+        summary["errors"].extend(errors)
+        with instrument.stage("archive_write" if writer is not None else "manifest_record"):
+            for output, value in done:
+                if writer is not None:
+                    writer.add(output, value)
+                elif manifest is not None:
+                    manifest.record(output, value)
+
+    try:
+        if workers == 1:
+            for chunk in chunks():
+                collect(_render_cards(chunk, target, png_args, draft))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in chunks():
+                    pending.append(pool.submit(_render_cards, chunk, target, png_args, draft))
+                    # Bounded read-ahead; results in manifest order for archives
+                    if len(pending) >= workers * 2:
+                        with instrument.stage("wait_for_workers"):
+                            result = pending.popleft().result()
+                        collect(result)
+                while pending:
+                    with instrument.stage("wait_for_workers"):
+                        result = pending.popleft().result()
+                    collect(result)
+    finally:
+        if writer is not None:
+            writer.close()
+        if manifest is not None:
+            with instrument.stage("manifest_save"):
+                manifest.save()
+            summary["skipped"] = manifest.hits
+
+    instrument.count("cards", summary["cards"])
+    instrument.count("skipped", summary["skipped"])
+    instrument.count("errors", len(summary["errors"]))
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+def batch_main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many GitHub social cards from a CSV/JSONL manifest.")
+    parser.add_argument("manifest", help="CSV or JSONL with repo_name, image, subtext and optional output columns")
+    parser.add_argument("-o", "--output", default=".", help="Folder for the cards (default: current folder)")
+    parser.add_argument("-a", "--archive", help="Write all cards into one .zip/.tar/.tar.gz file or a multi-page .pdf")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Worker processes (default: one per core)")
+    parser.add_argument("--compress-level", type=int, default=6, choices=range(10), metavar="0-9",
+                        help="PNG zlib level; 1 is fastest (default: 6)")
+    parser.add_argument("--optimize", action="store_true", help="Smallest PNGs, several times slower to write")
+    parser.add_argument("--no-draft", action="store_true", help="Decode JPEGs at full size before shrinking")
+    parser.add_argument("--no-cache", action="store_true", help="Redraw every card, ignoring render_manifest.json")
+    parser.add_argument("--timing", action="store_true",
+                        help="Write Create_social_card_timing.json (stage times, counts, peak memory) beside the output")
+    parser.add_argument("--profile", action="store_true", help="Like --timing, plus a cProfile dump Create_social_card.prof")
+    args = parser.parse_args(argv)
+    if args.archive:
+        try:
+            archive_format(args.archive)
+        except ValueError as e:
+            parser.error(str(e))
+    instrument.setup("Create_social_card", args.timing, args.profile)
+
+    summary = batch_social_cards(args.manifest, args.output, args.workers or None, args.optimize,
+                                 args.compress_level, args.archive, not args.no_cache, not args.no_draft)
+    rate = summary["cards"] / summary["seconds"] if summary["seconds"] else 0
+    print(f"✅ {summary['cards']} social cards saved to {os.path.abspath(args.archive or args.output)} "
+          f"in {summary['seconds']:.1f}s ({rate:.1f} cards/s)")
+    if summary["skipped"]:
+        print(f"  {summary['skipped']} unchanged cards skipped")
+    for error in summary["errors"][:20]:
+        print(f"  ❌ {error}")
+    instrument.finish(os.path.dirname(os.path.abspath(args.archive)) if args.archive else args.output)
+    return 1 if summary["errors"] else 0
+
+def main():
+    """Interactive command-line interface"""
+    print("🎨 GitHub Social Card Creator")
+    print("=" * 40)
+
+    repo_name = input("Enter repository name: ").strip()
+    if not repo_name:
+        repo_name = "My Awesome Repo"
+
+    image_path = input("Enter image file path: ").strip()
+    if not os.path.exists(image_path):
+        print(f"❌ Image file not found: {image_path}")
+        return
+
+    subtext = input("Enter description text: ").strip()
+    if not subtext:
+        subtext = "An awesome project!"
+
+    output_path = input("Enter output filename (or press Enter for 'social_preview.png'): ").strip()
+    if not output_path:
+        output_path = "social_preview.png"
+
+    try:
+        create_social_card(repo_name, image_path, subtext, output_path)
+    except Exception as e:
+        print(f"❌ Error creating card: {e}")
+
+if __name__ == "__main__":
+    # Check if PIL is installed (without importing it yet)
+    import importlib.util
+    if importlib.util.find_spec("PIL") is None:
+        print("❌ Pillow library not found!")
+        print("Install it with: pip install Pillow")
+        sys.exit(1)
+
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
+    main()
@@ -0,0 +1,600 @@
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from . import instrument
+
+DEFAULT_WORKERS = 8
+JOURNAL_BATCH = 256 # Renames written to the journal (and flushed) before they are applied
+PARKED = re.compile(r"^\.(.+)\.renaming-\d+$") # Temporary name of a file moved aside to break a cycle
+
+# Renames happen in two phases: plan_renames() works out every new name in memory and
+# checks it for collisions, then apply_plan() renames on disk and records each step in an
+# append-only journal, which undo_journal() can play backwards.
+# The four helpers below keep their original behaviour and write no journal unless
+# given a journal_path.
+
+def remove_prefix(directory, text, file_ext, journal_path=False):
+    run_rule(directory, make_rule("remove", "prefix", text, file_ext), journal_path=journal_path)
+
+def remove_postfix(directory, text, file_ext, journal_path=False):
+    run_rule(directory, make_rule("remove", "postfix", text, file_ext), journal_path=journal_path)
+
+def add_prefix(directory, text, file_ext, journal_path=False):
+    run_rule(directory, make_rule("add", "prefix", text, file_ext), journal_path=journal_path)
+
+def add_postfix(directory, text, file_ext, journal_path=False):
+    run_rule(directory, make_rule("add", "postfix", text, file_ext), journal_path=journal_path)
+
+def make_rule(action, position, text, file_ext):
+    """Return a function mapping a filename to its new name, or None if it doesn't match."""
+    if action == "remove" and position == "prefix":
+        def rule(filename, entry=None):
+            if filename.endswith(file_ext) and filename.startswith(text): # Check if the filename starts with the specified text
+                return filename[len(text):] # Remove the prefix text
+    elif action == "remove" and position == "postfix":
+        def rule(filename, entry=None):
+            if filename.endswith(file_ext) and filename[:-len(file_ext)].endswith(text): # Check if the filename ends with the specified text before the file extension
+                return filename[:-len(text + file_ext)] + file_ext # Remove the postfix text
+    elif action == "add" and position == "prefix":
+        def rule(filename, entry=None):
+            if filename.endswith(file_ext): # Check if the file has the specified extension
+                return text + filename # Add the prefix text to the filename
+    elif action == "add" and position == "postfix":
+        def rule(filename, entry=None):
+            name, ext = os.path.splitext(filename) # Split the filename into name and extension
+            if ext == file_ext: # Ensure the extension matches the specified one
+                return name + text + ext # Add the postfix text before the file extension
+    else:
+        raise ValueError(f"Unknown rule: {action} {position}")
+    return rule
+
+# -----------------------------
+# Rule pipeline
+# -----------------------------
+# A pipeline is a list of steps, e.g. from a JSON config:
+#   [{"op": "remove_prefix", "text": "IMG_"},
+#    {"op": "regex", "pattern": "\\s+", "replace": "_"},
+#    {"op": "case", "mode": "lower"},
+#    {"op": "date", "format": "%Y-%m-%d_"},
+#    {"op": "template", "format": "{stem}_{counter:04}{ext}"}]
+# Steps work on the name without its extension ("stem") and are compiled once, so each
+# file costs a few string operations in memory and a single rename on disk.
+CASES = {"lower": str.lower, "upper": str.upper, "title": str.title}
+
+class _Context:
+    # What a step may look at besides the name; mtime is only stat'ed if a step asks for it
+    __slots__ = ("entry", "name", "counter", "parent", "_mtime")
+
+    def __init__(self, entry, name, counter, parent):
+        self.entry, self.name, self.counter, self.parent = entry, name, counter, parent
+        self._mtime = None
+
+    @property
+    def mtime(self):
+        if self._mtime is None:
+            st = self.entry.stat() if self.entry is not None else None
+            self._mtime = datetime.fromtimestamp(st.st_mtime) if st else datetime.now()
+        return self._mtime
+
+    def fields(self, stem, ext):
+        return {"stem": stem, "ext": ext, "name": self.name, "counter": self.counter,
+                "parent": self.parent, "mtime": self.mtime}
+
+class RulePipeline:
+    """Rename steps compiled once and applied to each filename in memory.
+
+    file_ext and match (a regex searched in the whole name) pick the files; {counter}
+    counts matching files per folder, in name order, from counter_start.
+    """
+
+    def __init__(self, steps, file_ext="", match=None, counter_start=1):
+        self.file_ext = file_ext
+        self.match = re.compile(match) if match else None
+        self.counter_start = counter_start
+        self.steps = [self._compile(step) for step in steps]
+
+    def _split(self, name):
+        if self.file_ext and name.endswith(self.file_ext):
+            return name[:len(name) - len(self.file_ext)], self.file_ext
+        return os.path.splitext(name)
+
+    def _compile(self, step):
+        op = step.get("op")
+        text = step.get("text", "")
+        if op == "add_prefix":
+            return lambda stem, ext, ctx: (text + stem, ext)
+        if op == "remove_prefix":
+            return lambda stem, ext, ctx: (stem[len(text):] if text and stem.startswith(text) else stem, ext)
+        if op == "add_postfix":
+            return lambda stem, ext, ctx: (stem + text, ext)
+        if op == "remove_postfix":
+            return lambda stem, ext, ctx: (stem[:-len(text)] if text and stem.endswith(text) else stem, ext)
+        if op == "regex":
+            pattern = re.compile(step["pattern"], re.IGNORECASE if step.get("ignore_case") else 0)
+            replace, count = step.get("replace", ""), step.get("count", 0)
+            return lambda stem, ext, ctx: (pattern.sub(replace, stem, count), ext)
+        if op == "case":
+            change = CASES[step.get("mode", "lower")]
+            with_ext = step.get("ext", False)
+            return lambda stem, ext, ctx: (change(stem), change(ext) if with_ext else ext)
+        if op == "date":
+            fmt, position = step.get("format", "%Y%m%d_"), step.get("position", "prefix")
+            if position == "prefix":
+                return lambda stem, ext, ctx: (ctx.mtime.strftime(fmt) + stem, ext)
+            return lambda stem, ext, ctx: (stem + ctx.mtime.strftime(fmt), ext)
+        if op == "template":
+            fmt = step["format"]
+            # Fail on typos now, not halfway through a batch
+            try:
+                fmt.format(stem="", ext="", name="", counter=0, parent="", mtime=datetime.now())
+            except (KeyError, IndexError, ValueError) as e:
+                raise ValueError(f"Bad template {fmt!r}: {e!r}")
+            return lambda stem, ext, ctx: self._split(fmt.format(**ctx.fields(stem, ext)))
+        raise ValueError(f"Unknown rename step: {step!r}")
+
+    def for_directory(self, path):
+        """A rule function for one folder, with its own {counter}."""
+        parent = os.path.basename(os.path.normpath(path))
+        counter = [self.counter_start]
+
+        def rule(filename, entry=None):
+            if not filename.endswith(self.file_ext):
+                return None
+            if self.match is not None and not self.match.search(filename):
+                return None
+            ctx = _Context(entry, filename, counter[0], parent)
+            counter[0] += 1
+            stem, ext = self._split(filename)
+            for step in self.steps:
+                stem, ext = step(stem, ext, ctx)
+            return stem + ext
+        return rule
+
+    def __call__(self, filename, entry=None):
+        return self.for_directory(".")(filename, entry)
+
+# -----------------------------
+# Phase 1: plan
+# -----------------------------
+class RenamePlan:
+    """Ordered (src, dst) renames plus the ones refused because of collisions."""
+
+    def __init__(self):
+        self.ops = []
+        self.conflicts = [] # (src, dst, reason)
+        self.errors = [] # Folders that could not be read
+        self.directories = 0
+        self.entries = 0
+        self.seconds = 0.0
+
+def _order_renames(moves, taken):
+    """Order one directory's {src_name: dst_name} moves so no step overwrites a file.
+
+    A move can only run once its target is free, so chains (A->B, B->C) run back to
+    front, and cycles (A->B, B->A) are broken by parking one file under a temporary name.
+    """
+    key = os.path.normcase # Case-insensitive file systems treat File.txt and file.txt as one name
+    pending = dict(moves)
+    by_target = {key(dst): src for src, dst in moves.items()}
+    ordered = []
+
+    def release(name):
+        # name is no longer occupied, so a move waiting for it can run (and so on down the chain)
+        while True:
+            src = by_target.get(key(name))
+            if src is None or src not in pending:
+                return
+            ordered.append((src, pending.pop(src)))
+            name = src
+
+    pending_keys = {key(src) for src in moves}
+    for src, dst in moves.items():
+        if src in pending and key(dst) not in pending_keys:
+            ordered.append((src, pending.pop(src)))
+            release(src)
+
+    # Whatever is left is made of cycles
+    counter = 0
+    while pending:
+        src, dst = next(iter(pending.items()))
+        del pending[src]
+        tmp = f".{src}.renaming-{counter}" # Matches PARKED
+        while key(tmp) in taken:
+            counter += 1
+            tmp = f".{src}.renaming-{counter}"
+        taken.add(key(tmp))
+        ordered.append((src, tmp))
+        release(src)
+        ordered.append((tmp, dst))
+    return ordered
+
+def _plan_directory(path, rule):
+    # Scan one directory with scandir and plan its renames. Renames never leave their
+    # directory, so each directory can be planned (and later applied) on its own.
+    with os.scandir(path) as it:
+        entries = list(it) # The whole listing is read before anything is renamed
+    if hasattr(rule, "for_directory"):
+        rule = rule.for_directory(path) # Fresh {counter} per folder
+        entries.sort(key=lambda e: e.name) # ... numbered in name order
+    key = os.path.normcase
+    subdirs, moves, taken = [], {}, set()
+    for entry in entries:
+        taken.add(key(entry.name))
+        if entry.is_dir(follow_symlinks=False): # d_type from the directory listing, no stat
+            subdirs.append(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            new_name = rule(entry.name, entry)
+            if new_name and new_name != entry.name:
+                moves[entry.name] = new_name
+
+    # Collision check with hash sets: two files may not get the same name, and a new name
+    # may only exist already if that file is itself being renamed away
+    conflicts = []
+    changed = True
+    while changed:
+        changed = False
+        sources = {key(src) for src in moves}
+        targets = {}
+        for src, dst in moves.items():
+            targets.setdefault(key(dst), []).append(src)
+        for dst_key, srcs in targets.items():
+            if len(srcs) > 1:
+                reason = "several files would get this name"
+            elif dst_key in taken and dst_key not in sources:
+                reason = "target already exists"
+            else:
+                continue
+            for src in srcs:
+                conflicts.append((os.path.join(path, src), os.path.join(path, moves.pop(src)), reason))
+            changed = True # A refused move keeps its file, which may block another move
+
+    ops = [(os.path.join(path, src), os.path.join(path, dst)) for src, dst in _order_renames(moves, taken)]
+    return subdirs, len(entries), ops, conflicts
+
+def plan_renames(directory, rule, recursive=False, workers=DEFAULT_WORKERS):
+    """Work out every rename in memory without touching the disk."""
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait # Not needed for --help or the prompts
+    plan = RenamePlan()
+    start = time.perf_counter()
+    todo = deque([directory])
+    pending = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while todo or pending:
+            # Keep at most a few directories per worker in flight
+            while todo and len(pending) < workers * 4:
+                pending.add(pool.submit(_plan_directory, todo.popleft(), rule))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    subdirs, entries, ops, conflicts = f.result()
+                except OSError as e:
+                    plan.errors.append(str(e))
+                    continue
+                if recursive:
+                    todo.extend(subdirs)
+                plan.directories += 1
+                plan.entries += entries
+                plan.ops.extend(ops)
+                plan.conflicts.extend(conflicts)
+    plan.seconds = time.perf_counter() - start
+    return plan
+
+# -----------------------------
+# Phase 2: apply (and undo)
+# -----------------------------
+def _user_step(src, dst):
+    # The rename the user asked for, as (original name, new name), or None for the step that
+    # only parks a file under its temporary name; the step out of it counts as the rename
+    if PARKED.match(os.path.basename(dst)):
+        return None
+    parked = PARKED.match(os.path.basename(src))
+    return (parked.group(1) if parked else os.path.basename(src)), os.path.basename(dst)
+
+def default_journal_path():
+    # The random part keeps two runs started in the same second out of each other's journal
+    return os.path.abspath(time.strftime("rename_journal_%Y%m%d-%H%M%S_") + os.urandom(3).hex() + ".jsonl")
+
+def _apply_group(ops, journal, lock, verbose):
+    # Apply one directory's renames in order; each batch is journaled before it runs
+    renamed, errors = 0, []
+    for i in range(0, len(ops), JOURNAL_BATCH):
+        batch = ops[i:i + JOURNAL_BATCH]
+        with lock:
+            journal.write("".join(json.dumps(op) + "\n" for op in batch))
+            journal.flush()
+        for src, dst in batch:
+            try:
+                os.rename(src, dst)
+                step = _user_step(src, dst)
+                if step is None:
+                    continue
+                renamed += 1
+                if verbose:
+                    print(f"Renamed: {step[0]} -> {step[1]}")
+            except OSError as e:
+                errors.append(f"{src}: {e}")
+    return renamed, errors
+
+def apply_plan(plan, journal_path=None, workers=DEFAULT_WORKERS, verbose=False):
+    """Rename files as planned, writing every step to an append-only journal first.
+
+    Returns a summary dict; summary["journal"] is the file to pass to undo_journal().
+    journal_path=None picks a new rename_journal_*.jsonl, False writes no journal.
+    """
+    if journal_path is None and plan.ops:
+        journal_path = default_journal_path()
+    groups = {}
+    for src, dst in plan.ops:
+        groups.setdefault(os.path.dirname(src), []).append((src, dst))
+    summary = {"directories": plan.directories, "entries": plan.entries, "renamed": 0,
+               "conflicts": len(plan.conflicts), "errors": list(plan.errors), "journal": journal_path or None}
+    start = time.perf_counter()
+    if not plan.ops:
+        summary["seconds"] = plan.seconds
+        return summary
+    from concurrent.futures import ThreadPoolExecutor
+    lock = threading.Lock()
+    with open(journal_path or os.devnull, "a", encoding="utf-8") as journal:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for renamed, errors in pool.map(lambda ops: _apply_group(ops, journal, lock, verbose), groups.values()):
+                summary["renamed"] += renamed
+                summary["errors"].extend(errors)
+    summary["seconds"] = plan.seconds + time.perf_counter() - start
+    return summary
+
+def undo_journal(journal_path):
+    """Roll back a rename batch by playing its journal backwards. Returns the number undone.
+
+    Steps that never ran (or were already undone) are skipped, so this is safe after a
+    crash halfway through a batch and safe to run twice.
+    """
+    with open(journal_path, encoding="utf-8") as f:
+        ops = [json.loads(line) for line in f if line.strip()]
+    undone = 0
+    for src, dst in reversed(ops):
+        if os.path.lexists(dst) and not os.path.lexists(src):
+            os.rename(dst, src)
+            undone += 1
+    return undone
+
+def run_rule(directory, rule, recursive=False, dry_run=False, journal_path=None, workers=DEFAULT_WORKERS, verbose=None,
+             on_applied=None):
+    """Plan, report collisions, then apply (or only print, with dry_run).
+
+    Per-file output is printed for a single folder unless verbose says otherwise;
+    whole trees only get a summary. on_applied, if given, is called with the planned
+    (src, dst) steps once they have been applied.
+    """
+    with instrument.stage("plan"):
+        plan = plan_renames(directory, rule, recursive, workers)
+    instrument.count("directories", plan.directories)
+    instrument.count("files", plan.entries)
+    for src, dst, reason in plan.conflicts:
+        print(f"Skipped: {src} -> {os.path.basename(dst)} ({reason})")
+    if dry_run:
+        print_plan(plan)
+        return None
+    verbose = not recursive if verbose is None else verbose
+    with instrument.stage("apply"):
+        summary = apply_plan(plan, journal_path, workers, verbose=verbose)
+    instrument.count("renamed", summary["renamed"])
+    if on_applied is not None:
+        on_applied(plan.ops)
+    if not verbose:
+        print_summary(summary)
+    elif summary["journal"]:
+        print(f"Undo journal: {summary['journal']}")
+    return summary
+
+def rename_tree(directory, action, position, text, file_ext, workers=DEFAULT_WORKERS, dry_run=False, journal_path=None):
+    """Apply a prefix/postfix rule to every matching file below directory."""
+    return run_rule(directory, make_rule(action, position, text, file_ext), True, dry_run, journal_path, workers)
+
+def watch_folder(directory, rule, recursive=False, journal_path=None, settle=2.0,
+                 poll_interval=5.0, max_queue=1000, force_polling=False):
+    """Keep renaming new matching files as they land, until Ctrl+C.
+
+    Files already in the folder are renamed once first. After that only new files are
+    looked at (inotify on Linux, otherwise polling), each once it has stopped growing
+    for `settle` seconds. Every rename goes to the same undo journal.
+    """
+    import pathlib
+    from .folder_watch import FolderWatcher
+    journal_path = journal_path or default_journal_path()
+    watcher = FolderWatcher(directory, recursive, settle, poll_interval, max_queue, force_polling)
+    # Snapshot first: files landing during the first pass are then picked up by the watch,
+    # while the names that pass produced are marked as seen
+    watcher.snapshot()
+    run_rule(directory, rule, recursive, journal_path=journal_path, verbose=False,
+             on_applied=lambda ops: watcher.seen(dst for _, dst in ops))
+    rules = {} # One rule per folder, so {counter} keeps counting between events
+    lock = threading.Lock()
+    renamed = [0]
+
+    def handle(path):
+        folder, name = os.path.split(path)
+        rule_for = rules.get(folder)
+        if rule_for is None:
+            rule_for = rules[folder] = rule.for_directory(folder) if hasattr(rule, "for_directory") else rule
+        entry = pathlib.Path(path)
+        new_name = rule_for(name, entry)
+        if not new_name or new_name == name:
+            return
+        dst = os.path.join(folder, new_name)
+        for _ in range(1000): # A {counter} template moves on to the next free number
+            if not os.path.lexists(dst):
+                break
+            retry = rule_for(name, entry)
+            if retry == new_name:
+                break
+            new_name, dst = retry, os.path.join(folder, retry)
+        if os.path.lexists(dst):
+            print(f"Skipped: {path} -> {new_name} (target exists)")
+            return
+        watcher.ignore(dst) # Our own rename shows up as a new file; don't rename it again
+        with open(journal_path, "a", encoding="utf-8") as journal:
+            done, errors = _apply_group([(path, dst)], journal, lock, verbose=True)
+        renamed[0] += done
+        if not done:
+            watcher.ignored.pop(dst, None) # No rename happened, so no event to swallow
+        for error in errors:
+            print(f"  Error: {error}")
+
+    print(f"Watching {watcher.directory} ({watcher.mode}), press Ctrl+C to stop")
+    watcher.run(handle)
+    print(f"Stopped watching: renamed {renamed[0]} new files")
+    if renamed[0]:
+        print(f"Undo journal: {journal_path}")
+    return renamed[0]
+
+def print_plan(plan):
+    planned = 0
+    for src, dst in plan.ops:
+        step = _user_step(src, dst)
+        if step is not None:
+            planned += 1
+            print(f"Would rename: {os.path.join(os.path.dirname(src), step[0])} -> {step[1]}")
+    print(f"Dry run: {planned} renames planned, {len(plan.conflicts)} skipped, "
+          f"{plan.entries} entries in {plan.directories} folders scanned in {plan.seconds:.1f}s")
+
+def print_summary(summary):
+    seconds = summary["seconds"]
+    rate = summary["entries"] / seconds if seconds else 0
+    print(f"Scanned {summary['entries']} entries in {summary['directories']} folders, "
+          f"renamed {summary['renamed']} files in {seconds:.1f}s ({rate:,.0f} entries/s)")
+    if summary["conflicts"]:
+        print(f"Skipped {summary['conflicts']} files because of name collisions")
+    for error in summary["errors"][:20]:
+        print(f"  Error: {error}")
+    if len(summary["errors"]) > 20:
+        print(f"  ... and {len(summary['errors']) - 20} more errors")
+    if summary["journal"]:
+        print(f"Undo journal: {summary['journal']}")
+
+class _StepAction(argparse.Action):
+    # Keeps rename steps in the order they were given on the command line
+    def __call__(self, parser, namespace, values, option_string=None):
+        steps = getattr(namespace, "steps", None) or []
+        op = self.dest
+        if op == "regex":
+            steps.append({"op": "regex", "pattern": values[0], "replace": values[1]})
+        elif op == "case":
+            steps.append({"op": "case", "mode": values})
+        elif op == "date":
+            steps.append({"op": "date", "format": values})
+        elif op == "template":
+            steps.append({"op": "template", "format": values})
+        else:
+            steps.append({"op": op, "text": values})
+        namespace.steps = steps
+
+def main(argv=None):
+    """Non-interactive form of the prompts, for cron jobs and scripts."""
+    parser = argparse.ArgumentParser(
+        description="Batch rename files. Steps run in the order given and each file is renamed once.",
+        epilog="Example: FileRenamer.py /data --ext .jpg -r --remove-prefix IMG_ --case lower "
+               "--template '{stem}_{counter:04}{ext}'")
+    parser.add_argument("directory", nargs="?", help="Folder to rename files in")
+    parser.add_argument("--ext", default="", help="Only rename files ending with this extension (e.g. .txt)")
+    parser.add_argument("--match", help="Only rename files whose name matches this regex")
+    for op in ("add_prefix", "remove_prefix", "add_postfix", "remove_postfix"):
+        parser.add_argument("--" + op.replace("_", "-"), dest=op, metavar="TEXT", action=_StepAction, default=None)
+    parser.add_argument("--regex", nargs=2, metavar=("PATTERN", "REPLACE"), action=_StepAction, default=None)
+    parser.add_argument("--case", choices=sorted(CASES), action=_StepAction, default=None)
+    parser.add_argument("--date", metavar="FORMAT", action=_StepAction, default=None,
+                        help="Prefix the file's modification date, e.g. %%Y-%%m-%%d_")
+    parser.add_argument("--template", metavar="FORMAT", action=_StepAction, default=None,
+                        help="New name from {stem} {ext} {name} {counter:04} {parent} {mtime:%%Y%%m%%d}")
+    parser.add_argument("--counter-start", type=int, default=None, help="First {counter} value (default: 1)")
+    parser.add_argument("--config", help="JSON file with directory/ext/match/recursive/steps")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Include subfolders")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Only show what would be renamed")
+    parser.add_argument("--journal", help="Undo journal path (default: rename_journal_<time>.jsonl)")
+    parser.add_argument("--undo", metavar="JOURNAL", help="Roll back a previous batch and exit")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Print a summary instead of every file")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--watch", action="store_true", help="Keep running and rename new files as they arrive")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds a new file must stay unchanged before it is renamed (default: 2)")
+    parser.add_argument("--poll", action="store_true", help="Watch by re-scanning instead of inotify")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between scans with --poll")
+    parser.add_argument("--queue-size", type=int, default=1000, help="Settled files waiting to be renamed")
+    parser.add_argument("--timing", action="store_true",
+                        help="Write FileRenamer_timing.json (stage times, counts, peak memory) beside the journal")
+    parser.add_argument("--profile", action="store_true", help="Like --timing, plus a cProfile dump FileRenamer.prof")
+    args = parser.parse_args(argv)
+
+    if args.undo:
+        print(f"Undone {undo_journal(args.undo)} renames.")
+        return 0
+
+    config = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    directory = args.directory or config.get("directory")
+    steps = getattr(args, "steps", None) or config.get("steps", [])
+    if not directory or not steps:
+        parser.error("a directory and at least one rename step (or --config) are needed")
+    file_ext = args.ext or config.get("ext", "")
+    if file_ext and not file_ext.startswith('.'):
+        file_ext = '.' + file_ext  # Ensure dot is present
+
+    counter_start = args.counter_start if args.counter_start is not None else config.get("counter_start", 1)
+    try:
+        pipeline = RulePipeline(steps, file_ext, args.match or config.get("match"), counter_start)
+    except (ValueError, KeyError, re.error) as e:
+        parser.error(str(e))
+    recursive = args.recursive or config.get("recursive", False)
+    if args.watch and args.dry_run:
+        parser.error("--watch cannot be combined with --dry-run")
+    instrument.setup("FileRenamer", args.timing, args.profile)
+    if args.watch:
+        journal_path = args.journal or default_journal_path()
+        watch_folder(directory, pipeline, recursive, journal_path, args.settle,
+                     args.poll_interval, args.queue_size, args.poll)
+        instrument.finish(os.path.dirname(os.path.abspath(journal_path)))
+        return 0
+    summary = run_rule(directory, pipeline, recursive, args.dry_run, args.journal, args.workers,
+                       verbose=False if args.quiet else None)
+    # The report goes beside the undo journal, never into the folder being renamed
+    journal = summary and summary["journal"] or args.journal
+    instrument.finish(os.path.dirname(os.path.abspath(journal)) if journal else os.getcwd())
+    return 1 if summary and summary["errors"] else 0
+
+def interactive():
+    directory = input("Enter the directory path (or 'undo' to roll back a journal): ").strip() # Get the directory path from the user
+    if directory.lower() == "undo":
+        journal_path = input("Enter the journal file path: ").strip()
+        print(f"Undone {undo_journal(journal_path)} renames.")
+        return
+
+    action = input("Do you want to 'add' or 'remove' text from filenames? ").strip().lower() # Ask user for action
+    position = input("Should it be a 'prefix' or 'postfix'? ").strip().lower() # Ask user for position of text
+    text = input("Enter the text to add/remove: ").strip() # Get the text to add or remove from filenames
+    file_ext = input("Enter the file extension to match (e.g. .txt, .jpg): ").strip().lower() # Get the file extension from the user
+
+    recursive = input("Include subfolders? (y/n): ").strip().lower() == "y" # Ask whether to walk the whole tree
+    dry_run = input("Dry run (only show what would be renamed)? (y/n): ").strip().lower() == "y"
+
+    if not file_ext.startswith('.'):
+        file_ext = '.' + file_ext  # Ensure dot is present
+
+    if action not in ("add", "remove"):
+        print("Invalid action choice. Use 'add' or 'remove'.")
+    elif position not in ("prefix", "postfix"):
+        print("Invalid position choice. Use 'prefix' or 'postfix'.")
+    else:
+        run_rule(directory, make_rule(action, position, text, file_ext), recursive, dry_run)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    interactive()
@@ -0,0 +1,400 @@
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+
+# qrcode and Pillow are imported inside the functions that draw, so --help and the
+# first prompt don't wait for them (see "Fast startup" in the README)
+from . import instrument
+from .archive_output import ArchiveWriter, archive_format, encode_image, vector_pdf
+from .output_cache import OutputManifest, atomic_write, render_key
+from .qr_vector import qr_pdf_page, qr_svg
+from .render_cache import CanvasPool, get_font, resolve_font, text_size
+
+CHUNK_ROWS = 64 # Rows sent to a worker process at a time
+PROGRESS_EVERY = 1000
+
+FONT = "arial.ttf" # Resolved once per process by render_cache (with Linux/macOS stand-ins)
+FONT_SIZE = 24
+LAYOUT_VERSION = 1 # Bump when make_labeled_qr() draws differently, so cached images are redrawn
+OUTPUT_KINDS = ("png", "svg", "pdf") # svg/pdf are vector output, drawn without any raster image
+HEADER_COLUMNS = {"name", "data", "label"} # A first CSV row with any of these is a header
+
+_canvases = CanvasPool() # Reused label canvases for save_labeled_qr()
+
+def qr_matrix(data, border=4):
+    """Module matrix (rows of booleans, True = black) for data, including the quiet zone."""
+    import qrcode
+
+    # Create QR code instance
+    qr = qrcode.QRCode(
+        version=1, # Version of the QR code, 1 is the smallest size
+        error_correction=qrcode.constants.ERROR_CORRECT_L, # Set error correction level
+        border=border,
+    )
+    qr.add_data(data) # Add data to the QR code
+    qr.make(fit=True) # Generate the QR code
+    return qr.get_matrix()
+
+def matrix_image(matrix, box_size=10):
+    # One byte per module, scaled up with NEAREST: much faster than drawing every module as a rectangle
+    from PIL import Image
+    n = len(matrix)
+    pixels = bytes(0 if dark else 255 for row in matrix for dark in row)
+    return Image.frombytes("L", (n, n), pixels).resize((n * box_size, n * box_size), Image.Resampling.NEAREST)
+
+def make_labeled_qr(data, label, box_size=10, border=4, font=None, canvases=None, mode="RGB"):
+    """Return a PIL image of the QR code for data with label centered above it.
+
+    The label is drawn in grayscale; mode="L" returns that image as it is (the tool
+    saves it like this), any other mode converts it to a new image in that mode.
+    With a render_cache.CanvasPool and mode="L" the image is drawn on a reused canvas,
+    which is overwritten by the next call: save it before rendering the next one.
+    """
+    from PIL import Image, ImageDraw
+    img = matrix_image(qr_matrix(data, border), box_size) # Grayscale is all a black/white label needs
+    font = font or get_font(FONT, FONT_SIZE)
+
+    # Measure text size (cached per label and font)
+    text_width, text_height = text_size(label, font)
+
+    # Create a new image with extra space for the text label
+    total_width = img.width
+    total_height = img.height + text_height + 10  # 10px padding
+    if canvases is not None:
+        labeled_img = canvases.get("L", (total_width, total_height), 255)
+    else:
+        labeled_img = Image.new("L", (total_width, total_height), "white")
+
+    # Draw the text on the new image
+    draw = ImageDraw.Draw(labeled_img)
+    text_x = (total_width - text_width) // 2
+    draw.text((text_x, 5), label, fill="black", font=font)
+
+    # Paste the QR code below the text
+    labeled_img.paste(img, (0, text_height + 10)) # 10px padding below the text
+    return labeled_img if mode == "L" else labeled_img.convert(mode)
+
+def safe_filename(name):
+    # Labels like "LM324 In/Out" must not turn into folders or invalid Windows names
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name).strip(" .") or "qrcode"
+
+def save_labeled_qr(name, data, out_dir=".", label=None):
+    """Render one labeled QR code and save it as <name>.png. Returns the file path."""
+    img_filename = os.path.join(out_dir, safe_filename(name) + ".png")
+    make_labeled_qr(data, name if label is None else label, canvases=_canvases, mode="L").save(img_filename)
+    return img_filename
+
+def render_label(data, label, kind="png"):
+    """File contents (bytes) of one labeled QR code as png, or as vector svg / pdf."""
+    if kind == "png":
+        buf = io.BytesIO()
+        make_labeled_qr(data, label, canvases=_canvases, mode="L").save(buf, format="PNG")
+        return buf.getvalue()
+    matrix, font = qr_matrix(data), get_font(FONT, FONT_SIZE)
+    if kind == "svg":
+        return qr_svg(matrix, label, font).encode("utf-8")
+    if kind == "pdf":
+        return vector_pdf(*qr_pdf_page(matrix, label, font))
+    raise ValueError(f"Unknown output kind {kind!r} (use one of {', '.join(OUTPUT_KINDS)})")
+
+# -----------------------------
+# Batch mode
+# -----------------------------
+def iter_rows(path, errors=None):
+    """Stream (name, data, label) rows from a .csv or .jsonl file.
+
+    CSV rows are name,data[,label]; a header row naming those columns is optional.
+    JSONL lines are objects with "name", "data" and optionally "label".
+
+    Rows that can't be used (too few columns, bad JSON, no name or data) are skipped
+    and described in errors, if a list is given. A CSV header without a name or data
+    column raises ValueError before any row is read.
+    """
+    def bad(line, reason):
+        if errors is not None:
+            errors.append(f"{os.path.basename(path)} line {line}: {reason}")
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for i, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    bad(i, f"not valid JSON ({e})")
+                    continue
+                if not isinstance(row, dict) or "name" not in row or "data" not in row:
+                    bad(i, 'needs an object with "name" and "data"')
+                    continue
+                yield str(row["name"]), str(row["data"]), row.get("label")
+            return
+        columns = (0, 1, 2)
+        reader = csv.reader(f)
+        for row in reader:
+            header = [c.strip().lower() for c in row] if reader.line_num == 1 else ()
+            if HEADER_COLUMNS.intersection(header):
+                columns = tuple(header.index(c) if c in header else None for c in ("name", "data", "label"))
+                if columns[0] is None or columns[1] is None:
+                    raise ValueError(f"{path}: the header needs 'name' and 'data' columns (found: {', '.join(row)})")
+                continue
+            if len(row) <= max(columns[0], columns[1]):
+                if any(c.strip() for c in row): # Blank lines are fine
+                    bad(reader.line_num, f"expected at least {max(columns[0], columns[1]) + 1} columns, got {len(row)}")
+                continue
+            label = row[columns[2]] if columns[2] is not None and columns[2] < len(row) else None
+            yield row[columns[0]], row[columns[1]], label or None
+
+def iter_chunks(rows, size=CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+@lru_cache(maxsize=1)
+def _render_settings():
+    # Everything besides data and label that changes the pixels of a batch image
+    from importlib.metadata import version
+    import PIL
+    return {"box_size": 10, "border": 4, "error_correction": "L", "font": resolve_font(FONT),
+            "font_size": FONT_SIZE, "layout": LAYOUT_VERSION,
+            "qrcode": version("qrcode"), "pillow": PIL.__version__}
+
+def label_key(data, label, kind="png"):
+    return render_key(data=data, label=label, kind=kind, **_render_settings())
+
+def _render_chunk(chunk, out_dir, kind):
+    # Runs in a worker process: images are saved there and never sent back
+    saved, errors = [], []
+    for filename, data, label, key in chunk:
+        try:
+            with instrument.stage("render"):
+                payload = render_label(data, label, kind)
+            with instrument.stage("write"):
+                atomic_write(os.path.join(out_dir, filename), payload)
+            saved.append((filename, key))
+        except Exception as e:
+            errors.append(f"{filename}: {e}")
+    return saved, errors
+
+def _encode_chunk(chunk, fmt, kind):
+    # Archive mode: workers encode in memory and send the bytes back to the single writer
+    encoded, errors = [], []
+    for filename, data, label, _ in chunk:
+        try:
+            with instrument.stage("render"):
+                payload = _archive_payload(data, label, fmt, kind)
+            encoded.append((filename, payload))
+        except Exception as e:
+            errors.append(f"{filename}: {e}")
+    return encoded, errors
+
+def _archive_payload(data, label, fmt, kind):
+    if fmt != "pdf":
+        return render_label(data, label, kind)
+    if kind == "pdf":
+        return ("vector",) + qr_pdf_page(qr_matrix(data), label, get_font(FONT, FONT_SIZE))
+    return encode_image(make_labeled_qr(data, label, canvases=_canvases, mode="L"), fmt)
+
+def _plan_rows(rows, kind, manifest, in_flight, duplicates, errors):
+    # Drop rows whose image is already up to date and link duplicates of rendered images;
+    # yields (filename, data, label, key) for the rows that really need rendering.
+    # Only the first row for a file name is used; a later one with other contents is an error
+    planned = {} # filename -> (data, label) of the row that writes it in this run
+    for name, data, label in rows:
+        label = name if label is None else label
+        filename = safe_filename(name) + "." + kind
+        if filename in planned:
+            if planned[filename] != (data, label):
+                errors.append(f"{filename}: an earlier row already writes this file with other data or label")
+            continue
+        planned[filename] = (data, label)
+        if manifest is None:
+            yield filename, data, label, None
+            continue
+        key = label_key(data, label, kind)
+        if manifest.is_current(filename, key):
+            continue
+        if key in in_flight:
+            duplicates.append((filename, key)) # Linked once the first copy has been written
+            continue
+        src = manifest.find(key)
+        if src is not None:
+            manifest.link(src, filename, key)
+            continue
+        in_flight.add(key)
+        yield filename, data, label, key
+
+def batch_generate(input_path, out_dir=".", workers=None, chunk_rows=CHUNK_ROWS, progress_every=PROGRESS_EVERY,
+                   use_cache=True, archive=None, kind="png"):
+    """Render every row of a CSV/JSONL file to <out_dir>/<name>.<kind>. Returns a summary dict.
+
+    kind is png, or svg / pdf for vector files drawn straight from the QR matrix.
+
+    Rows are streamed and only a bounded number of chunks is in flight, so memory use
+    does not grow with the input size. workers=1 renders in this process.
+
+    With use_cache, <out_dir>/render_manifest.json remembers what each image was drawn
+    from: images that are still up to date are skipped, and rows with the same data and
+    label as another row are rendered once and hard-linked (or copied).
+
+    With archive (a .zip, .tar, .tar.gz or .pdf path) nothing is written to out_dir:
+    images are encoded in memory and appended to that one file in input order. A .pdf
+    archive gets vector pages with kind="pdf" and image pages with kind="png".
+    """
+    if kind not in OUTPUT_KINDS:
+        raise ValueError(f"Unknown output kind {kind!r} (use one of {', '.join(OUTPUT_KINDS)})")
+    workers = workers or os.cpu_count() or 1
+    writer = None
+    if archive:
+        writer = ArchiveWriter(archive)
+        if writer.fmt == "pdf" and kind == "svg":
+            writer.close()
+            raise ValueError("SVG labels can't be PDF pages; use --format pdf for a vector PDF")
+        task, arg = _encode_chunk, writer.fmt
+        use_cache = False # The archive is rewritten as a whole
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+        task, arg = _render_chunk, out_dir
+    manifest = OutputManifest(out_dir) if use_cache else None
+    in_flight, duplicates = set(), []
+    summary = {"images": 0, "skipped": 0, "linked": 0, "errors": []}
+    start = time.perf_counter()
+    next_report = progress_every
+
+    def collect(result):
+        nonlocal next_report
+        saved, errors = result
+        summary["images"] += len(saved)
+        summary["errors"].extend(errors)
+        if writer is not None:
+            with instrument.stage("archive_write"):
+                for filename, payload in saved:
+                    writer.add(filename, payload)
+        elif manifest is not None:
+            for filename, key in saved:
+                manifest.record(filename, key)
+                in_flight.discard(key)
+        if progress_every and summary["images"] >= next_report:
+            rate = summary["images"] / max(time.perf_counter() - start, 1e-6)
+            print(f"  ... {summary['images']} images ({rate:,.0f} images/s)")
+            next_report += progress_every
+
+    rows = iter_rows(input_path, summary["errors"])
+    chunks = iter_chunks(_plan_rows(rows, kind, manifest, in_flight, duplicates, summary["errors"]), chunk_rows)
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                collect(task(chunk, arg, kind))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for chunk in chunks:
+                    pending.append(pool.submit(task, chunk, arg, kind))
+                    # Keep reading ahead of the workers, but only by a bounded amount;
+                    # results are taken in input order so archives keep the row order
+                    if len(pending) >= workers * 2:
+                        with instrument.stage("wait_for_workers"):
+                            result = pending.popleft().result()
+                        collect(result)
+                while pending:
+                    with instrument.stage("wait_for_workers"):
+                        result = pending.popleft().result()
+                    collect(result)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if manifest is not None:
+        for filename, key in duplicates:
+            src = manifest.find(key)
+            if src is None:
+                summary["errors"].append(f"{filename}: its duplicate could not be rendered")
+            elif src != filename:
+                manifest.link(src, filename, key)
+        with instrument.stage("manifest_save"):
+            manifest.save()
+        summary["skipped"], summary["linked"] = manifest.hits, manifest.linked
+
+    for name in ("images", "skipped", "linked"):
+        instrument.count(name, summary[name])
+    instrument.count("errors", len(summary["errors"]))
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["rate"] = summary["images"] / summary["seconds"] if summary["seconds"] else 0
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate labeled QR code images in bulk from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV (name,data[,label]) or JSONL ({\"name\", \"data\", \"label\"}) file")
+    parser.add_argument("-o", "--output", default=".", help="Folder for the image files (default: current folder)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_KINDS, default="png",
+                        help="png, or vector svg / pdf (default: png)")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="Worker processes (default: one per core)")
+    parser.add_argument("--no-cache", action="store_true", help="Redraw every image, ignoring render_manifest.json")
+    parser.add_argument("-a", "--archive", help="Write all images into one .zip/.tar/.tar.gz file or a multi-page .pdf")
+    parser.add_argument("--timing", action="store_true",
+                        help="Write QRcodeMaker_timing.json (stage times, counts, peak memory) beside the output")
+    parser.add_argument("--profile", action="store_true", help="Like --timing, plus a cProfile dump QRcodeMaker.prof")
+    args = parser.parse_args(argv)
+    if args.archive:
+        try:
+            if archive_format(args.archive) == "pdf" and args.format == "svg":
+                raise ValueError("SVG labels can't be PDF pages; use --format pdf for a vector PDF")
+        except ValueError as e:
+            parser.error(str(e))
+    instrument.setup("QRcodeMaker", args.timing, args.profile)
+
+    try:
+        summary = batch_generate(args.input, args.output, args.workers or None, use_cache=not args.no_cache,
+                                 archive=args.archive, kind=args.format)
+    except ValueError as e: # A CSV header without name/data columns
+        parser.error(str(e))
+    print(f"Saved {summary['images']} QR codes to {os.path.abspath(args.archive or args.output)} "
+          f"in {summary['seconds']:.1f}s ({summary['rate']:,.0f} images/s)")
+    if summary["skipped"] or summary["linked"]:
+        print(f"  {summary['skipped']} unchanged images skipped, {summary['linked']} duplicates linked")
+    for error in summary["errors"][:20]:
+        print(f"  Error: {error}")
+    instrument.finish(os.path.dirname(os.path.abspath(args.archive)) if args.archive else args.output)
+    return 1 if summary["errors"] else 0
+
+def interactive():
+    print ("QR Code Generator (type'exit' to quit)")
+
+    while True:
+        # Ask user for output filename
+        name = input("Enter name for QR code image without .png (or 'exit' to quit): ").strip()
+
+        # Exit condition
+        if name.lower() == 'exit':
+            print("Exiting QR Code Generator.")
+            break
+
+        # Ask user for URL or data to encode
+        data = input("Enter URL or data to encode in QR code: ").strip()
+
+        if data.lower () == 'exit' or data == "":
+            print("Exiting QR Code Generator.")
+            break
+
+        # Save the QR code image with the specified name
+        img_filename = save_labeled_qr(name, data)
+        print(f"QR code saved as {img_filename}")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    interactive()
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+# mypyhelpers
+# The helper tools as one package: mypyhelpers.FileRenamer, mypyhelpers.QRcodeMaker,
+# mypyhelpers.callgraph, ... Run them with `mypyhelpers <tool>` (python -m mypyhelpers)
+# or through the scripts of the same name in the repository root.
+#
+# Kept empty (and Python 2.7 compatible) so the CODESYS scripting host can import the
+# call-graph modules from here without loading anything else.
+__version__ = "0.1.0"
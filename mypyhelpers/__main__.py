@@ -0,0 +1,64 @@
+"""One command for all the helper tools: mypyhelpers <tool> [arguments].
+
+    mypyhelpers qr components.csv -o labels/
+    mypyhelpers rename /data/photos --ext .jpg --add-prefix old_
+    mypyhelpers callgraph export.xml --analyse
+    mypyhelpers card                      # no arguments: the tool's prompts
+
+Only the module of the chosen tool is imported, and the tools themselves import
+Pillow, qrcode and lxml when they first draw or parse, so `mypyhelpers <tool> --help`
+and the interactive prompts start without loading them. Installed by pyproject.toml
+as a console script; `python -m mypyhelpers <tool>` works from a checkout too.
+"""
+import importlib
+import sys
+
+# tool -> (module, CLI function taking argv, function for no arguments or None, summary)
+TOOLS = {
+    "rename": ("FileRenamer", "main", "interactive", "Batch rename files (undo journal, rules, --watch)"),
+    "qr": ("QRcodeMaker", "main", "interactive", "Labeled QR codes, one at a time or from a CSV/JSONL file"),
+    "card": ("Create_social_card", "batch_main", "main", "GitHub social preview cards"),
+    "callgraph": ("callgraph", "main", None, "POU call graph from a PLCopen XML export"),
+    "analyse": ("callgraph_analysis", "main", None, "Dead code, call depth, recursion, fan-in/out"),
+    "render": ("callgraph_render", "main", None, "Split call graphs into Mermaid/Graphviz diagrams"),
+    "diff": ("callgraph_diff", "main", None, "What changed between two pou_call_graph.csv snapshots"),
+    "crossref": ("crossref_index", "main", None, "Build and query the SQLite cross-reference index"),
+}
+
+# Optional third-party modules, and what to install when one is missing
+PACKAGES = {"PIL": "pillow", "qrcode": "qrcode", "lxml": "lxml", "pyarrow": "pyarrow"}
+
+def usage():
+    lines = ["usage: mypyhelpers <tool> [arguments]   (mypyhelpers <tool> --help for details)", "", "tools:"]
+    lines += [f"  {name:<10} {spec[3]}" for name, spec in TOOLS.items()]
+    return "\n".join(lines)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    tool, args = argv[0], argv[1:]
+    spec = TOOLS.get(tool)
+    if spec is None:
+        print(f"mypyhelpers: unknown tool {tool!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module_name, cli, no_args, _ = spec
+
+    sys.argv = [f"mypyhelpers {tool}"] + args # argparse takes the program name from here
+    try:
+        module = importlib.import_module("mypyhelpers." + module_name)
+        if not args and no_args:
+            result = getattr(module, no_args)()
+        else:
+            result = getattr(module, cli)(args)
+    except ModuleNotFoundError as e:
+        package = PACKAGES.get((e.name or "").split(".")[0])
+        if package is None:
+            raise
+        print(f"mypyhelpers {tool} needs {package}: pip install {package}", file=sys.stderr)
+        return 1
+    return result or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Stream generated images straight into one ZIP, TAR or multi-page PDF file.
+
+Used by QRcodeMaker.py and Create_social_card.py instead of writing one small PNG per
+image, which is slow on network shares. Each image is encoded in memory and appended to
+the archive right away, so no intermediate files are created, writes are sequential
+(a tar can even go to a pipe), and memory use does not depend on the number of images.
+
+    with ArchiveWriter("labels.zip") as archive:
+        archive.add_image("QRcode_LM324OpAmp.png", img)
+
+Worker processes can do the expensive part themselves with encode_image(img, fmt) and
+send only the encoded bytes to the process that owns the ArchiveWriter.
+
+PDFs get one image per page, sized so the image prints at `dpi`, or vector pages from
+qr_vector. Pillow's own PDF writer needs every page in memory at once, so pages are
+written here as they arrive and the page tree is added at the end.
+"""
+import io
+import time
+import zlib
+
+FORMATS = ("zip", "tar", "tar.gz", "pdf")
+DEFAULT_DPI = 150
+
+def archive_format(path):
+    lower = path.lower()
+    if lower.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    for fmt in ("zip", "tar", "pdf"):
+        if lower.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Unknown archive type for {path!r} (use .zip, .tar, .tar.gz or .pdf)")
+
+def encode_image(img, fmt, **png_args):
+    """Encoded form of img for an archive of type fmt (picklable, for worker processes).
+
+    png_args (compress_level, optimize) are passed to PNG encoding for zip/tar members.
+    """
+    if fmt == "pdf":
+        if img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        return "image", img.width, img.height, img.mode, zlib.compress(img.tobytes(), 6)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", **png_args)
+    return buf.getvalue()
+
+class _PdfStream:
+    # Minimal PDF writer: image XObjects are written page by page, the page tree and
+    # the cross-reference table at the end
+    def __init__(self, f, dpi):
+        self.f = f
+        self.scale = 72.0 / dpi
+        self.offsets = [0, 0, 0] # Objects 1 (catalog) and 2 (page tree) are fixed
+        self.pages = []
+        self.font = None
+        self.pos = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _write(self, data):
+        self.f.write(data)
+        self.pos += len(data)
+
+    def _object(self, num, body, stream=None):
+        self.offsets[num] = self.pos
+        self._write(b"%d 0 obj\n" % num + body)
+        if stream is not None:
+            self._write(b"\nstream\n" + stream + b"\nendstream")
+        self._write(b"\nendobj\n")
+
+    def _new_id(self):
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def add_vector_page(self, width, height, content):
+        # content is drawn in pixel units with y pointing down (see qr_vector.qr_pdf_page)
+        if self.font is None:
+            self.font = self._new_id()
+            self._object(self.font, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                    b"/Encoding /WinAnsiEncoding >>")
+        content_id, page = self._new_id(), self._new_id()
+        w, h = width * self.scale, height * self.scale
+        data = zlib.compress(b"%.4f 0 0 %.4f 0 %.2f cm\n" % (self.scale, -self.scale, h) + content, 9)
+        self._object(content_id, b"<< /Length %d /Filter /FlateDecode >>" % len(data), data)
+        self._object(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                           b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                     % (w, h, self.font, content_id))
+        self.pages.append(page)
+
+    def add_image_page(self, width, height, mode, data):
+        image, content, page = self._new_id(), self._new_id(), self._new_id()
+        space = b"/DeviceGray" if mode == "L" else b"/DeviceRGB"
+        self._object(image, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s "
+                            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>"
+                     % (width, height, space, len(data)), data)
+        w, h = width * self.scale, height * self.scale
+        draw = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (w, h)
+        self._object(content, b"<< /Length %d >>" % len(draw), draw)
+        self._object(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                           b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+                     % (w, h, image, content))
+        self.pages.append(page)
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % p for p in self.pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.pages)))
+        xref = self.pos
+        lines = [b"xref\n0 %d\n" % len(self.offsets), b"0000000000 65535 f \n"]
+        lines += [b"%010d 00000 n \n" % off for off in self.offsets[1:]]
+        self._write(b"".join(lines))
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(self.offsets), xref))
+
+def vector_pdf(width, height, content, dpi=DEFAULT_DPI):
+    """A one-page PDF document (bytes) from a vector page, see qr_vector.qr_pdf_page."""
+    buf = io.BytesIO()
+    pdf = _PdfStream(buf, dpi)
+    pdf.add_vector_page(width, height, content)
+    pdf.close()
+    return buf.getvalue()
+
+class ArchiveWriter:
+    """Appends encoded images to a .zip, .tar, .tar.gz or .pdf file, one after another."""
+
+    def __init__(self, path, fmt=None, dpi=DEFAULT_DPI):
+        self.path = path
+        self.fmt = fmt or archive_format(path)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown archive format {self.fmt!r} (use one of {', '.join(FORMATS)})")
+        self.count = 0
+        # zipfile/tarfile are imported here rather than at the top: the image tools
+        # import this module on every start, but most runs never write an archive
+        if self.fmt == "zip":
+            import zipfile
+            # PNGs are already compressed; deflating them again costs time for nothing
+            self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+        elif self.fmt == "pdf":
+            self.file = open(path, "wb")
+            self.archive = _PdfStream(self.file, dpi)
+        else:
+            import tarfile
+            self.archive = tarfile.open(path, "w|gz" if self.fmt == "tar.gz" else "w|")
+
+    def add(self, name, payload):
+        """Append an image encoded with encode_image(img, self.fmt).
+
+        For .pdf, ("vector", width, height, content) adds a vector page instead
+        (see qr_vector.qr_pdf_page); zip/tar members can be any file bytes.
+        """
+        if self.fmt == "zip":
+            import zipfile
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            self.archive.writestr(info, payload)
+        elif self.fmt == "pdf":
+            kind, args = payload[0], payload[1:]
+            if kind == "vector":
+                self.archive.add_vector_page(*args)
+            else:
+                self.archive.add_image_page(*args)
+        else:
+            import tarfile
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime = len(payload), int(time.time())
+            self.archive.addfile(info, io.BytesIO(payload))
+        self.count += 1
+
+    def add_image(self, name, img, **png_args):
+        self.add(name, encode_image(img, self.fmt, **png_args))
+
+    def close(self):
+        self.archive.close()
+        if self.fmt == "pdf":
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
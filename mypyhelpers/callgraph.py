@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+# callgraph.py
+# Standalone POU call-graph engine for PLCopen XML exports.
+#
+# Runs on plain CPython (e.g. a Linux build server) as well as inside the
+# CODESYS IronPython host, where export_crossref_and_calls_full.py is a thin
+# wrapper around it. Produces the same outputs as the IDE script:
+#  - pou_call_graph.csv (Caller, Callee)
+#  - call_graph.mmd     (Mermaid graph TD)
+#
+# Usage:
+#   python callgraph.py path/to/export.xml
+#   python callgraph.py path/to/project_folder -o path/to/Exports
+#   python callgraph.py export.xml -j 0        # analyse POUs on all CPU cores
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+from __future__ import print_function
+
+import argparse
+import codecs
+import csv
+import os
+import re
+import sys
+
+from . import instrument
+from .plcopen_xml import read_pou_names, iter_pous
+from .st_scanner import PouIndex, as_index, scan_calls
+from .callgraph_cache import CACHE_FILE, CallGraphCache, pou_digest
+
+CALLGRAPH_CSV = "pou_call_graph.csv"
+MERMAID_FILE = "call_graph.mmd"
+
+# Parallel mode: roughly this many characters of ST text per work item
+CHUNK_CHARS = 1 << 20
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def ensure_dir(p):
+    if not os.path.exists(p):
+        os.makedirs(p)
+
+def find_latest_xml(search_dirs):
+    # Find the most recently modified .xml file likely to be a PLCopen export
+    candidates = []
+    for d in search_dirs:
+        if not os.path.isdir(d):
+            continue
+        for fname in os.listdir(d):
+            if fname.lower().endswith(".xml"):
+                full = os.path.join(d, fname)
+                try:
+                    candidates.append((os.path.getmtime(full), full))
+                except OSError:
+                    pass
+    if not candidates:
+        return None
+    candidates.sort(reverse=True)
+    return candidates[0][1]
+
+_UNSAFE_ID = re.compile(r"[^A-Za-z0-9_:.]+")
+
+def sanitize_identifier(s):
+    # basic Mermaid-safe node id; the writers go through MermaidIds, which remembers
+    # each node's id for one file only, so the CODESYS host does not keep every name
+    return _UNSAFE_ID.sub("_", s)
+
+def mermaid_label(s):
+    # Text for a ["..."] label; Mermaid has no backslash escapes, only entity codes
+    return s.replace('"', "#quot;")
+
+class MermaidIds(object):
+    """Node ids for one Mermaid file: sanitize_identifier(name), with _2, _3, ...
+    appended when two different names sanitize to the same id."""
+
+    def __init__(self):
+        self.ids = {}
+        self.used = set()
+
+    def __call__(self, name):
+        nid = self.ids.get(name)
+        if nid is None:
+            base = nid = sanitize_identifier(name)
+            n = 2
+            while nid in self.used:
+                nid = "%s_%d" % (base, n)
+                n += 1
+            self.used.add(nid)
+            self.ids[name] = nid
+        return nid
+
+    def node(self, name):
+        # Node declaration; names that are not usable as ids keep them as the label
+        nid = self(name)
+        return nid if nid == name else '%s["%s"]' % (nid, mermaid_label(name))
+
+# ST call detector: identifiers followed by '(' that match known POUs, skipping
+# comments, strings and pragmas (see st_scanner.py). Pass a PouIndex built once
+# per project; a plain set of names works but is re-indexed on every call.
+def detect_calls_in_st(st_text, pou_names):
+    return scan_calls(st_text, as_index(pou_names))
+
+# Extract calls from FBD/CFC blocks: <block typeName="Target"> (already pulled out by iter_pous)
+def detect_calls_in_fbd(block_types):
+    callees = set()
+    for t in block_types:
+        if t:
+            callees.add(t.strip())
+    return callees
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+def pou_callees(pou, index):
+    """Return the set of callees of one PouBody (self-calls excluded)."""
+    callees = set()
+    # ST bodies (main body, actions, transitions)
+    for st_text in pou.st_texts:
+        callees |= scan_calls(st_text or "", index)
+    # FBD/CFC bodies
+    callees |= detect_calls_in_fbd(pou.block_types)
+    callees.discard(pou.name)
+    return callees
+
+def resolve_workers(workers):
+    # 0 or None means "one per CPU core"; hosts without multiprocessing
+    # (IronPython inside CODESYS) always run serially
+    try:
+        import multiprocessing
+    except ImportError:
+        return 1
+    if not workers:
+        return multiprocessing.cpu_count()
+    return max(1, workers)
+
+def iter_chunks(pous, chunk_chars=CHUNK_CHARS):
+    """Group streamed PouBody records into lists of about chunk_chars of ST text."""
+    chunk, size = [], 0
+    for pou in pous:
+        chunk.append(pou)
+        size += sum(len(t or "") for t in pou.st_texts) + len(pou.block_types)
+        if size >= chunk_chars:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+# Per-process state for pool workers: the POU index is shipped once per worker
+_worker_index = None
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+def _analyse_chunk(chunk):
+    # Compact (caller, [callees]) list for one chunk; merged by the parent
+    return [(pou.name, sorted(pou_callees(pou, _worker_index))) for pou in chunk]
+
+def _analyse_serial(pous, index):
+    # With instrumentation on, "scan" is the ST/FBD part of "analyse"; the rest is XML streaming
+    for pou in pous:
+        with instrument.stage("scan"):
+            callees = pou_callees(pou, index)
+        yield pou.name, callees
+
+def _analyse_parallel(pous, index, workers, chunk_chars):
+    # Only reached on CPython; IronPython has no concurrent.futures
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(index,)) as pool:
+        for chunk in iter_chunks(pous, chunk_chars):
+            pending.add(pool.submit(_analyse_chunk, chunk))
+            # Keep parsing ahead of the workers, but only by a bounded amount
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    for result in f.result():
+                        yield result
+        for f in pending:
+            for result in f.result():
+                yield result
+
+def _skip_cached(pous, cache, edges, digests):
+    # Unchanged POUs contribute their cached callees; only the rest are analysed
+    for pou in pous:
+        digest = pou_digest(pou)
+        callees = cache.lookup(pou.name, digest)
+        if callees is None:
+            digests[pou.name] = digest
+            yield pou
+        else:
+            for c in callees:
+                edges.add((pou.name, c))
+
+def build_call_graph(xml_path, workers=1, chunk_chars=CHUNK_CHARS, cache=None):
+    """Build the set of (caller, callee) edges for a PLCopen XML export.
+
+    With workers > 1 (0 = one per core) the XML is still streamed by this
+    process, but ST/FBD analysis of POU chunks runs in a process pool. The
+    result is a set, so output does not depend on the worker count.
+
+    If a CallGraphCache is given, POUs whose content hash is unchanged since
+    the last run reuse their cached callees and the cache is saved afterwards.
+    """
+    # Pass 1: gather POU names (stops reading at the end of <pous>)
+    # and index them once for the ST scanner
+    with instrument.stage("read_pou_names"):
+        names = read_pou_names(xml_path)
+        index = PouIndex(names)
+    instrument.count("pous", len(names))
+
+    # Pass 2: stream one <pou> at a time; each subtree is freed once analysed
+    pous = (pou for pou in iter_pous(xml_path) if pou.name)
+    edges = set()
+    digests = {}
+    if cache is not None:
+        cache.begin(names)
+        pous = _skip_cached(pous, cache, edges, digests)
+
+    workers = resolve_workers(workers)
+    if workers > 1:
+        results = _analyse_parallel(pous, index, workers, chunk_chars)
+    else:
+        results = _analyse_serial(pous, index)
+
+    with instrument.stage("analyse"):
+        for caller, callees in results:
+            for c in callees:
+                edges.add((caller, c))
+            digest = digests.pop(caller, None)
+            if digest is not None:
+                cache.store(caller, digest, callees)
+
+    if cache is not None:
+        with instrument.stage("cache_save"):
+            cache.save()
+        instrument.count("cache_hits", cache.hits)
+    instrument.count("edges", len(edges))
+    return edges
+
+def write_call_graph_csv(edges, path):
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["Caller", "Callee"])
+        for a, b in sorted(edges):
+            w.writerow([a, b])
+
+def write_mermaid(edges, path):
+    ids = MermaidIds()
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        f.write("graph TD\n")
+        for a, b in sorted(edges):
+            # The first mention of a node carries its label
+            a = ids(a) if a in ids.ids else ids.node(a)
+            b = ids(b) if b in ids.ids else ids.node(b)
+            f.write("    %s --> %s\n" % (a, b))
+
+def export_call_graph(xml_path, export_dir, workers=1, use_cache=True):
+    """Build the call graph and write both output files. Returns the edges."""
+    ensure_dir(export_dir)
+    cache = CallGraphCache(os.path.join(export_dir, CACHE_FILE)) if use_cache else None
+    edges = build_call_graph(xml_path, workers=workers, cache=cache)
+    if cache is not None:
+        print("Incremental cache: %d unchanged POUs reused, %d analysed" % (cache.hits, cache.misses))
+
+    callgraph_csv = os.path.join(export_dir, CALLGRAPH_CSV)
+    with instrument.stage("write_csv"):
+        write_call_graph_csv(edges, callgraph_csv)
+    print("POU call graph exported:", callgraph_csv)
+
+    mermaid_path = os.path.join(export_dir, MERMAID_FILE)
+    with instrument.stage("write_mermaid"):
+        write_mermaid(edges, mermaid_path)
+    print("Mermaid call graph exported:", mermaid_path)
+    return edges
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build a POU call graph (CSV + Mermaid) from a PLCopen XML export.")
+    parser.add_argument("xml", help="PLCopen XML file, or a folder to pick the newest .xml from")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output folder (default: Exports beside the XML)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes for POU analysis (0 = one per CPU core, default: 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-analyse every POU instead of reusing %s" % CACHE_FILE)
+    parser.add_argument("--analyse", action="store_true",
+                        help="Also write analysis.csv/json: dead code, call depth, recursion, fan-in/out")
+    parser.add_argument("--roots", help="Comma-separated root POUs for --analyse (default: all Programs)")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Also write an indexed crossref.db (see crossref_index.py)")
+    parser.add_argument("--timing", action="store_true",
+                        help="Write callgraph_timing.json (stage times, counts, peak memory) to the output folder")
+    parser.add_argument("--profile", action="store_true",
+                        help="Like --timing, plus a cProfile dump callgraph.prof")
+    args = parser.parse_args(argv)
+    instrument.setup("callgraph", args.timing, args.profile)
+
+    xml_path = args.xml
+    if os.path.isdir(xml_path):
+        xml_path = find_latest_xml([xml_path, os.path.join(xml_path, "Exports")])
+        if xml_path is None:
+            print("No PLCopen XML export was found in:", args.xml)
+            return 1
+
+    export_dir = args.output or os.path.join(os.path.dirname(os.path.abspath(xml_path)), "Exports")
+    print("Using PLCopen XML:", xml_path)
+    edges = export_call_graph(xml_path, export_dir, workers=args.workers, use_cache=not args.no_cache)
+    if args.analyse:
+        from .callgraph_analysis import export_analysis
+        from .plcopen_xml import read_pou_types
+        roots = [r.strip() for r in args.roots.split(",") if r.strip()] if args.roots else None
+        with instrument.stage("analysis"):
+            export_analysis(edges, export_dir, read_pou_types(xml_path), roots)
+    if args.sqlite:
+        # sqlite3 is not available inside CODESYS, so only import it on request
+        from .crossref_index import INDEX_FILE, build_index, find_crossref
+        db_path = os.path.join(export_dir, INDEX_FILE)
+        with instrument.stage("sqlite"):
+            build_index(db_path, crossref_csv=find_crossref(export_dir), edges=edges)
+        print("SQLite index exported:", db_path)
+    instrument.finish(export_dir)
+    print("All done. Outputs are in:", export_dir)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+# callgraph_analysis.py
+# Graph analytics on top of the POU call graph (the `edges` set / pou_call_graph.csv).
+#
+# Computes, in time linear in the number of POUs + edges:
+#  - dead code: POUs not reachable from the roots (and POUs nobody calls)
+#  - longest call depth per root (recursion cycles count as one step)
+#  - strongly connected components, i.e. direct or mutual recursion
+#  - fan-in / fan-out per POU and the top-N rankings
+#
+# The graph is stored as compact arrays: node names are interned to integer
+# IDs and outgoing edges are kept in CSR form (offsets + targets), so 50k+
+# edges fit in a few hundred KB and every pass is a tight loop over ints.
+#
+# Usage:
+#   python callgraph_analysis.py Exports/pou_call_graph.csv --xml export.xml
+#   python callgraph_analysis.py Exports/pou_call_graph.csv --roots PLC_PRG,VISU_PRG
+# Writes analysis.csv (one row per POU) and analysis.json (summary) next to the CSV.
+from __future__ import print_function
+
+import argparse
+import codecs
+import csv
+import heapq
+import io
+import json
+import os
+import sys
+from array import array
+
+ANALYSIS_CSV = "analysis.csv"
+ANALYSIS_JSON = "analysis.json"
+
+TOP_N = 20
+
+
+class CallGraph(object):
+    """Integer-interned, CSR-backed directed graph built from (caller, callee) pairs."""
+
+    def __init__(self, edges, nodes=()):
+        names = set(nodes)
+        for a, b in edges:
+            names.add(a)
+            names.add(b)
+        self.names = sorted(names)
+        self.ids = dict((n, i) for i, n in enumerate(self.names))
+        n = len(self.names)
+
+        # Counting sort of edges by caller gives the CSR arrays directly
+        ids = self.ids
+        pairs = set((ids[a], ids[b]) for a, b in edges)
+        self.offsets = array("i", [0]) * (n + 1)
+        self.targets = array("i", [0]) * len(pairs)
+        self.fan_in = array("i", [0]) * n
+        for a, b in pairs:
+            self.offsets[a + 1] += 1
+            self.fan_in[b] += 1
+        for i in range(n):
+            self.offsets[i + 1] += self.offsets[i]
+        cursor = self.offsets[:-1]
+        for a, b in pairs:
+            self.targets[cursor[a]] = b
+            cursor[a] += 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def fan_out(self, v):
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def successors(self, v):
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+
+def match_roots(roots, names):
+    """Resolve root POU names case-insensitively, as CODESYS does.
+
+    Returns (sorted names as spelled in names, given roots that matched nothing).
+    """
+    by_lower = {}
+    for n in names:
+        by_lower.setdefault(n.lower(), n)
+    matched, unknown = set(), []
+    for r in roots:
+        name = r if r in names else by_lower.get(r.lower())
+        if name is None:
+            unknown.append(r)
+        else:
+            matched.add(name)
+    return sorted(matched), unknown
+
+
+def reachable(graph, roots):
+    """Return a bytearray marking every node reachable from the root IDs."""
+    seen = bytearray(len(graph))
+    stack = list(roots)
+    for r in roots:
+        seen[r] = 1
+    offsets, targets = graph.offsets, graph.targets
+    while stack:
+        v = stack.pop()
+        for k in range(offsets[v], offsets[v + 1]):
+            w = targets[k]
+            if not seen[w]:
+                seen[w] = 1
+                stack.append(w)
+    return seen
+
+
+def strongly_connected(graph):
+    """Iterative Tarjan. Returns (comp, sccs): comp[v] is the SCC index of v.
+
+    SCCs come out in reverse topological order: every SCC appears after all
+    SCCs it can reach, which is what longest_depths() relies on.
+    """
+    n = len(graph)
+    offsets, targets = graph.offsets, graph.targets
+    index = array("i", [-1]) * n
+    low = array("i", [0]) * n
+    comp = array("i", [-1]) * n
+    on_stack = bytearray(n)
+    stack, sccs = [], []
+    counter = 0
+    for s in range(n):
+        if index[s] != -1:
+            continue
+        index[s] = low[s] = counter
+        counter += 1
+        stack.append(s)
+        on_stack[s] = 1
+        work = [[s, offsets[s]]]
+        while work:
+            frame = work[-1]
+            v, k = frame
+            if k < offsets[v + 1]:
+                frame[1] = k + 1
+                w = targets[k]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append([w, offsets[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                if low[v] < low[u]:
+                    low[u] = low[v]
+            if low[v] == index[v]:
+                c = len(sccs)
+                members = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    comp[w] = c
+                    members.append(w)
+                    if w == v:
+                        break
+                sccs.append(members)
+    return comp, sccs
+
+
+def longest_depths(graph, comp, sccs):
+    """Longest call chain below each node, measured on the SCC condensation."""
+    depth = array("i", [0]) * len(sccs)
+    offsets, targets = graph.offsets, graph.targets
+    for c, members in enumerate(sccs):
+        best = 0
+        for v in members:
+            for k in range(offsets[v], offsets[v + 1]):
+                d = comp[targets[k]]
+                if d != c and depth[d] + 1 > best:
+                    best = depth[d] + 1
+        depth[c] = best
+    return array("i", [depth[comp[v]] for v in range(len(graph))])
+
+
+def analyse(edges, pou_types=None, roots=None, top_n=TOP_N):
+    """Run every analysis over an edge set.
+
+    Returns the per-node arrays used by write_analysis() plus a JSON-ready
+    "summary" dict.
+
+    pou_types ({name: pouType}, see plcopen_xml.read_pou_types) adds POUs that
+    have no edges at all and lets Programs act as the default roots. Without
+    either, POUs nobody calls are used as roots.
+    """
+    pou_types = pou_types or {}
+    graph = CallGraph(edges, pou_types)
+    names = graph.names
+
+    unknown_roots = []
+    if roots:
+        root_names, unknown_roots = match_roots(roots, graph.ids)
+    elif pou_types:
+        root_names = sorted(n for n, t in pou_types.items() if t.lower() == "program")
+    else:
+        root_names = [n for i, n in enumerate(names) if graph.fan_in[i] == 0]
+    root_ids = [graph.ids[r] for r in root_names]
+    root_set = set(root_ids)
+
+    seen = reachable(graph, root_ids)
+    comp, sccs = strongly_connected(graph)
+    depth = longest_depths(graph, comp, sccs)
+
+    # Only POUs from the export can be dead; library blocks (TON, ...) are leaves
+    candidates = range(len(graph))
+    if pou_types:
+        candidates = [graph.ids[n] for n in pou_types]
+    unreachable = sorted(names[v] for v in candidates if not seen[v])
+    unreferenced = sorted(names[v] for v in candidates
+                          if graph.fan_in[v] == 0 and v not in root_set)
+
+    recursion = []
+    for members in sccs:
+        v = members[0]
+        if len(members) > 1 or v in graph.successors(v):
+            recursion.append(sorted(names[m] for m in members))
+    recursion.sort(key=lambda g: (-len(g), g))
+
+    by_in = heapq.nsmallest(top_n, range(len(graph)), key=lambda v: (-graph.fan_in[v], names[v]))
+    by_out = heapq.nsmallest(top_n, range(len(graph)), key=lambda v: (-graph.fan_out(v), names[v]))
+
+    return {
+        "graph": graph,
+        "comp": comp,
+        "depth": depth,
+        "reachable": seen,
+        "roots": root_names,
+        "recursive": set(n for g in recursion for n in g),
+        "summary": {
+            "pous": len(graph),
+            "edges": len(graph.targets),
+            "roots": root_names,
+            "unknown_roots": unknown_roots,
+            "root_depth": dict((r, depth[graph.ids[r]]) for r in root_names),
+            "unreachable": unreachable,
+            "unreferenced": unreferenced,
+            "recursion": recursion,
+            "top_fan_in": [[names[v], graph.fan_in[v]] for v in by_in],
+            "top_fan_out": [[names[v], graph.fan_out(v)] for v in by_out],
+        },
+    }
+
+
+def write_analysis(result, csv_path, json_path):
+    graph = result["graph"]
+    roots = set(result["roots"])
+    recursive = result["recursive"]
+    with codecs.open(csv_path, "w", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(["POU", "FanIn", "FanOut", "Depth", "Root", "Reachable", "Recursive", "SCC"])
+        for v, name in enumerate(graph.names):
+            w.writerow([name, graph.fan_in[v], graph.fan_out(v), result["depth"][v],
+                        int(name in roots), result["reachable"][v], int(name in recursive),
+                        result["comp"][v]])
+    with codecs.open(json_path, "w", encoding="utf-8") as f:
+        json.dump(result["summary"], f, indent=2, sort_keys=True)
+
+
+def read_edges_csv(path):
+    with io.open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Caller,Callee header
+        return set((r[0], r[1]) for r in reader if len(r) >= 2)
+
+
+def export_analysis(edges, export_dir, pou_types=None, roots=None):
+    """Analyse an edge set and write analysis.csv / analysis.json. Returns the summary."""
+    result = analyse(edges, pou_types, roots)
+    csv_path = os.path.join(export_dir, ANALYSIS_CSV)
+    json_path = os.path.join(export_dir, ANALYSIS_JSON)
+    write_analysis(result, csv_path, json_path)
+    s = result["summary"]
+    print("Call graph analysis exported:", csv_path)
+    if s["unknown_roots"]:
+        print("  Warning: roots not in the call graph: %s" % ", ".join(s["unknown_roots"]))
+    if not s["roots"]:
+        print("  Note: no root POUs found; pass --roots to get meaningful dead-code results")
+    print("  %d POUs, %d edges, %d roots, %d unreachable, %d recursion groups"
+          % (s["pous"], s["edges"], len(s["roots"]), len(s["unreachable"]), len(s["recursion"])))
+    return s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dead code, call depth, recursion and fan-in/out for a POU call graph.")
+    parser.add_argument("callgraph", help="pou_call_graph.csv")
+    parser.add_argument("--xml", help="PLCopen XML export: adds edge-less POUs and uses Programs as roots")
+    parser.add_argument("--roots", help="Comma-separated root POUs (e.g. task-assigned Programs)")
+    parser.add_argument("-o", "--output", help="Output folder (default: beside the CSV)")
+    args = parser.parse_args(argv)
+
+    pou_types = None
+    if args.xml:
+        from .plcopen_xml import read_pou_types
+        pou_types = read_pou_types(args.xml)
+    roots = [r.strip() for r in args.roots.split(",") if r.strip()] if args.roots else None
+    export_dir = args.output or os.path.dirname(os.path.abspath(args.callgraph))
+    export_analysis(read_edges_csv(args.callgraph), export_dir, pou_types, roots)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
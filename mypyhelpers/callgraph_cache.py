@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# callgraph_cache.py
+# Persistent per-POU cache for incremental call-graph builds.
+#
+# Stored as JSON next to the outputs (Exports/callgraph_cache.json):
+#   {"version": 1,
+#    "names": "<sha1 of the sorted POU name set>",
+#    "pous": {"FB_Motor": ["<sha1 of ST text + block types>", ["FC_Scale", ...]], ...}}
+#
+# A POU whose content hash matches its cached entry is not re-tokenized; its
+# cached callees are reused. ST call detection depends on which POU names
+# exist, so the whole cache is dropped when the name set changes. Entries are
+# rewritten from the POUs seen in the current run only, so deleted POUs (and
+# their outgoing edges) disappear on the next save.
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+import hashlib
+import json
+import os
+
+CACHE_FILE = "callgraph_cache.json"
+
+# Bump when call detection changes so stale callee lists are not reused
+CACHE_VERSION = 1
+
+
+def names_fingerprint(names):
+    h = hashlib.sha1()
+    for n in sorted(names):
+        h.update(n.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def pou_digest(pou):
+    """Content hash of one PouBody: every ST body and FBD/CFC block type."""
+    h = hashlib.sha1()
+    for t in pou.st_texts:
+        h.update((t or "").encode("utf-8"))
+        h.update(b"\0")
+    h.update(b"\1")
+    for t in pou.block_types:
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class CallGraphCache(object):
+    """Content-hash cache of per-POU callees, loaded from and saved to one JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fingerprint = None
+        self.old = {}
+        self.new = {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self, names):
+        # Load the previous run's entries, unless the POU name set has changed
+        self.fingerprint = names_fingerprint(names)
+        self.old, self.new = {}, {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION and data.get("names") == self.fingerprint:
+            self.old = data.get("pous", {})
+
+    def lookup(self, name, digest):
+        """Return the cached callees for an unchanged POU, else None."""
+        entry = self.old.get(name)
+        if entry is not None and entry[0] == digest:
+            self.hits += 1
+            self.new[name] = entry
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, name, digest, callees):
+        self.new[name] = [digest, sorted(callees)]
+
+    def save(self):
+        data = {"version": CACHE_VERSION, "names": self.fingerprint, "pous": self.new}
+        tmp = "%s.%d.tmp" % (self.path, os.getpid()) # Two exports into one folder don't share it
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"), sort_keys=True)
+        # Replace atomically so an interrupted run never leaves a torn cache
+        if hasattr(os, "replace"):
+            os.replace(tmp, self.path)
+        else:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmp, self.path)
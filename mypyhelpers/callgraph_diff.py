@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# callgraph_diff.py
+# What changed between two call-graph snapshots (pou_call_graph.csv of two releases).
+#
+# Both snapshots are loaded into hashed (caller, callee) sets, so added/removed
+# edges and POUs are plain set differences, and reachability from the roots is one
+# depth-first pass over each graph's adjacency dict. Everything is linear in the
+# number of POUs + edges; only the report is sorted. Reports:
+#  - added / removed edges and POUs
+#  - POUs that became unreachable from the roots (newly dead) or reachable again
+#  - new and removed callers of watched POUs (e.g. safety FBs, --watch FB_EStop)
+#
+# Roots are --roots, the Programs of --xml, or by default every POU nobody called
+# in the old snapshot plus new POUs nobody calls. A POU that loses its last caller
+# therefore shows up as newly dead.
+#
+# Usage:
+#   python callgraph_diff.py R1/pou_call_graph.csv R2/pou_call_graph.csv -o diff/
+#   python callgraph_diff.py old.csv new.csv --roots PLC_PRG --watch FB_EStop,FB_SafetyDoor
+# Writes callgraph_diff.json (change report) and callgraph_diff.mmd (Mermaid view of
+# the changed part: added in green, removed in red, newly dead in grey).
+from __future__ import print_function
+
+import argparse
+import codecs
+import json
+import os
+import sys
+
+from .callgraph import MermaidIds, ensure_dir
+from .callgraph_analysis import match_roots, read_edges_csv
+
+DIFF_JSON = "callgraph_diff.json"
+DIFF_MERMAID = "callgraph_diff.mmd"
+
+# Edges drawn in the Mermaid view before it is cut short (renderers choke on more)
+DEFAULT_MAX_EDGES = 500
+
+
+# -----------------------------
+# Diff
+# -----------------------------
+class Snapshot(object):
+    """One call graph: its edge set, callees per caller, called POUs and all POU names."""
+
+    def __init__(self, edges, pou_types=None):
+        self.edges = set(edges)
+        self.adj = {}
+        for a, b in self.edges:
+            callees = self.adj.get(a)
+            if callees is None:
+                self.adj[a] = [b]
+            else:
+                callees.append(b)
+        self.called = set(b for _, b in self.edges)
+        self.pous = set(self.adj) | self.called | set(pou_types or ())
+
+    def reachable(self, roots):
+        """Set of POUs reachable from the roots (roots not in this graph are ignored)."""
+        seen = set(r for r in roots if r in self.pous)
+        stack = list(seen)
+        adj = self.adj
+        while stack:
+            for w in adj.get(stack.pop(), ()):
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        return seen
+
+
+def default_roots(old, new):
+    # POUs nobody called before, plus new POUs nobody calls now
+    return (old.pous - old.called) | ((new.pous - old.pous) - new.called)
+
+
+def _callers(edges, targets):
+    callers = dict((t, set()) for t in targets)
+    for a, b in edges:
+        if b in callers:
+            callers[b].add(a)
+    return callers
+
+
+def diff_call_graphs(old_edges, new_edges, old_types=None, new_types=None, roots=None, watch=()):
+    """Compare two edge sets. Returns a JSON-ready change report (a dict).
+
+    old_types / new_types ({name: pouType}, see plcopen_xml.read_pou_types) add POUs
+    without edges and make the Programs the roots, unless roots is given.
+    """
+    old, new = Snapshot(old_edges, old_types), Snapshot(new_edges, new_types)
+
+    unknown_roots = []
+    if roots:
+        root_names, unknown_roots = match_roots(roots, old.pous | new.pous)
+        root_names = set(root_names)
+    elif old_types or new_types:
+        root_names = set(n for types in (old_types or {}, new_types or {})
+                         for n, t in types.items() if t.lower() == "program")
+    else:
+        root_names = default_roots(old, new)
+
+    old_live, new_live = old.reachable(root_names), new.reachable(root_names)
+    kept = old.pous & new.pous
+
+    watched = {}
+    if watch:
+        old_callers, new_callers = _callers(old.edges, watch), _callers(new.edges, watch)
+        for name in watch:
+            watched[name] = {
+                "callers_added": sorted(new_callers[name] - old_callers[name]),
+                "callers_removed": sorted(old_callers[name] - new_callers[name]),
+                "callers": len(new_callers[name]),
+                "reachable": [name in old_live, name in new_live],
+            }
+
+    report = {
+        "roots": sorted(root_names),
+        "unknown_roots": unknown_roots,
+        "edges_added": sorted(new.edges - old.edges),
+        "edges_removed": sorted(old.edges - new.edges),
+        "pous_added": sorted(new.pous - old.pous),
+        "pous_removed": sorted(old.pous - new.pous),
+        "became_unreachable": sorted(n for n in kept if n in old_live and n not in new_live),
+        "became_reachable": sorted(n for n in kept if n not in old_live and n in new_live),
+        "added_unreachable": sorted(n for n in new.pous - old.pous if n not in new_live),
+        "watched": watched,
+    }
+    report["summary"] = dict((key, len(report[key])) for key in (
+        "edges_added", "edges_removed", "pous_added", "pous_removed",
+        "became_unreachable", "became_reachable", "added_unreachable"))
+    report["summary"].update({"old_pous": len(old.pous), "new_pous": len(new.pous),
+                              "old_edges": len(old.edges), "new_edges": len(new.edges)})
+    return report
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+def write_diff_json(report, path):
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def write_diff_mermaid(report, path, max_edges=DEFAULT_MAX_EDGES):
+    """Mermaid graph of the changed edges and POUs only.
+
+    Added edges are green, removed edges red and dashed; added POUs green, removed
+    POUs red, POUs that became unreachable grey and those reachable again blue.
+    """
+    changed = [(a, b, "added") for a, b in report["edges_added"]]
+    changed += [(a, b, "removed") for a, b in report["edges_removed"]]
+    note = None
+    if len(changed) > max_edges:
+        note = "%d of %d changed edges shown, see %s for all" % (max_edges, len(changed), DIFF_JSON)
+        changed = changed[:max_edges]
+
+    classes = (("added", report["pous_added"]), ("removed", report["pous_removed"]),
+               ("dead", report["became_unreachable"] + report["added_unreachable"]),
+               ("revived", report["became_reachable"]))
+    nodes = set()
+    for a, b, _ in changed:
+        nodes.add(a)
+        nodes.add(b)
+    # Changed POUs without a changed edge (e.g. newly dead ones) share the same budget
+    hidden = set()
+    for _, names in classes:
+        for n in names:
+            if n in nodes:
+                continue
+            if len(nodes) < max_edges:
+                nodes.add(n)
+            else:
+                hidden.add(n)
+    if hidden:
+        note = (note + "; " if note else "") + "%d changed POUs not shown" % len(hidden)
+
+    ids = MermaidIds()
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        f.write("graph TD\n")
+        if note:
+            f.write("    %%%% %s\n" % note)
+        for n in sorted(nodes):
+            f.write("    %s\n" % ids.node(n))
+        styles = {"added": [], "removed": []}
+        for i, (a, b, kind) in enumerate(changed):
+            arrow = "-->" if kind == "added" else "-.->"
+            f.write("    %s %s %s\n" % (ids(a), arrow, ids(b)))
+            styles[kind].append(str(i))
+        if styles["added"]:
+            f.write("    linkStyle %s stroke:#2da44e,stroke-width:2px\n" % ",".join(styles["added"]))
+        if styles["removed"]:
+            f.write("    linkStyle %s stroke:#cf222e,stroke-width:2px\n" % ",".join(styles["removed"]))
+        f.write("    classDef added fill:#dafbe1,stroke:#2da44e\n")
+        f.write("    classDef removed fill:#ffebe9,stroke:#cf222e,stroke-dasharray: 5 5\n")
+        f.write("    classDef dead fill:#eaeef2,stroke:#6e7781,color:#6e7781\n")
+        f.write("    classDef revived fill:#ddf4ff,stroke:#0969da\n")
+        for cls, names in classes:
+            shown = [n for n in names if n in nodes]
+            if shown:
+                f.write("    class %s %s\n" % (",".join(ids(n) for n in shown), cls))
+
+
+def export_diff(old_csv, new_csv, export_dir, old_types=None, new_types=None, roots=None, watch=(),
+                max_edges=DEFAULT_MAX_EDGES):
+    """Diff two pou_call_graph.csv files and write the JSON report and Mermaid view."""
+    report = diff_call_graphs(read_edges_csv(old_csv), read_edges_csv(new_csv),
+                              old_types, new_types, roots, watch)
+    report["old"], report["new"] = os.path.abspath(old_csv), os.path.abspath(new_csv)
+    ensure_dir(export_dir)
+    json_path = os.path.join(export_dir, DIFF_JSON)
+    write_diff_json(report, json_path)
+    mermaid_path = os.path.join(export_dir, DIFF_MERMAID)
+    write_diff_mermaid(report, mermaid_path, max_edges)
+    s = report["summary"]
+    print("Call graph diff exported:", json_path)
+    if report["unknown_roots"]:
+        print("  Warning: roots in neither snapshot: %s" % ", ".join(report["unknown_roots"]))
+    print("  edges +%d -%d, POUs +%d -%d, newly unreachable %d, reachable again %d"
+          % (s["edges_added"], s["edges_removed"], s["pous_added"], s["pous_removed"],
+             s["became_unreachable"], s["became_reachable"]))
+    for name, w in sorted(report["watched"].items()):
+        if w["callers_added"] or w["callers_removed"]:
+            print("  %s: new callers %s, removed callers %s"
+                  % (name, ", ".join(w["callers_added"]) or "-", ", ".join(w["callers_removed"]) or "-"))
+    print("Mermaid diff exported:", mermaid_path)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two POU call graph snapshots (pou_call_graph.csv).")
+    parser.add_argument("old", help="Older pou_call_graph.csv")
+    parser.add_argument("new", help="Newer pou_call_graph.csv")
+    parser.add_argument("-o", "--output", help="Output folder (default: beside the new CSV)")
+    parser.add_argument("--roots", help="Comma-separated root POUs (default: POUs nobody calls)")
+    parser.add_argument("--old-xml", help="PLCopen XML export of the old snapshot (edge-less POUs, Programs as roots)")
+    parser.add_argument("--xml", help="PLCopen XML export of the new snapshot")
+    parser.add_argument("--watch", help="Comma-separated POUs whose callers are reported (e.g. safety FBs)")
+    parser.add_argument("--max-edges", type=int, default=DEFAULT_MAX_EDGES,
+                        help="Changed edges drawn in the Mermaid view (default: %d)" % DEFAULT_MAX_EDGES)
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if any edge or POU was added or removed")
+    args = parser.parse_args(argv)
+
+    old_types = new_types = None
+    if args.old_xml or args.xml:
+        from .plcopen_xml import read_pou_types
+        old_types = read_pou_types(args.old_xml) if args.old_xml else None
+        new_types = read_pou_types(args.xml) if args.xml else None
+    roots = [r.strip() for r in args.roots.split(",") if r.strip()] if args.roots else None
+    watch = [w.strip() for w in args.watch.split(",") if w.strip()] if args.watch else ()
+    export_dir = args.output or os.path.dirname(os.path.abspath(args.new))
+    report = export_diff(args.old, args.new, export_dir, old_types, new_types, roots, watch, args.max_edges)
+    s = report["summary"]
+    if args.check and (s["edges_added"] or s["edges_removed"] or s["pous_added"] or s["pous_removed"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
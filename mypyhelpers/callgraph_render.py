@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+# callgraph_render.py
+# Mermaid / Graphviz rendering for call graphs too big for one flat diagram.
+#
+# A flat `graph TD` with thousands of edges freezes Mermaid renderers, so this
+# module can:
+#  - extract per-root subgraphs, limited to N call levels
+#  - cluster nodes by CODESYS project folder or by namespace into subgraphs
+#  - drop transitive edges (A->C when A->B->C is already drawn)
+#  - write Graphviz DOT as well as Mermaid
+#  - cap every output file at a node budget, splitting the graph into several
+#    renderable files instead of one that cannot be rendered
+#
+# Usage:
+#   python callgraph_render.py Exports/pou_call_graph.csv --max-nodes 200 --cluster folder --xml export.xml
+#   python callgraph_render.py Exports/pou_call_graph.csv --root PLC_PRG --depth 3 --format dot
+#   python callgraph_render.py Exports/pou_call_graph.csv --per-root --xml export.xml --reduce
+from __future__ import print_function
+
+import argparse
+import codecs
+import os
+import sys
+from collections import deque
+
+from .callgraph import MermaidIds, ensure_dir, mermaid_label
+from .callgraph_analysis import match_roots, read_edges_csv
+
+DEFAULT_MAX_NODES = 300
+CLUSTER_MODES = ("none", "folder", "namespace")
+FORMATS = {"mermaid": ".mmd", "dot": ".dot"}
+
+
+# -----------------------------
+# Graph shaping
+# -----------------------------
+def adjacency(edges):
+    adj = {}
+    for a, b in edges:
+        adj.setdefault(a, []).append(b)
+        adj.setdefault(b, [])
+    for targets in adj.values():
+        targets.sort()
+    return adj
+
+
+def cluster_of(name, mode, folders=None):
+    """Cluster label for a node ("" = not clustered)."""
+    if mode == "folder":
+        return (folders or {}).get(name, "")
+    if mode == "namespace" and "." in name:
+        return name.rsplit(".", 1)[0]
+    return ""
+
+
+def extract_subgraph(adj, root, depth=None, max_nodes=DEFAULT_MAX_NODES):
+    """Breadth-first nodes below root, at most depth levels and max_nodes nodes.
+
+    Returns (nodes, truncated): truncated holds nodes whose callees were not
+    all included because of the depth limit or the node budget.
+    """
+    nodes = [root]
+    seen = set(nodes)
+    truncated = set()
+    level = {root: 0}
+    queue = deque(nodes)
+    while queue:
+        v = queue.popleft()
+        if depth is not None and level[v] >= depth:
+            if adj.get(v):
+                truncated.add(v)
+            continue
+        for w in adj.get(v, ()):
+            if w in seen:
+                continue
+            if len(nodes) >= max_nodes:
+                truncated.add(v)
+                break
+            seen.add(w)
+            nodes.append(w)
+            level[w] = level[v] + 1
+            queue.append(w)
+    return nodes, truncated
+
+
+def induced_edges(adj, nodes):
+    keep = set(nodes)
+    return [(a, b) for a in nodes for b in adj.get(a, ()) if b in keep]
+
+
+def reduce_transitive(edges):
+    """Drop edges whose target is still reachable without them.
+
+    Edges are removed one at a time, so reachability is preserved even
+    through recursion cycles. Quadratic, so only used on budget-sized pieces.
+    """
+    adj = adjacency(edges)
+    kept = []
+    for a, b in sorted(edges):
+        adj[a].remove(b)
+        stack, seen = list(adj[a]), set(adj[a])
+        found = False
+        while stack:
+            v = stack.pop()
+            if v == b:
+                found = True
+                break
+            for w in adj.get(v, ()):
+                if w not in seen:
+                    seen.add(w)
+                    stack.append(w)
+        if found:
+            continue  # Still reachable: the direct edge is redundant
+        adj[a].append(b)
+        kept.append((a, b))
+    return kept
+
+
+def partition(nodes, key, max_nodes):
+    """Pack nodes into parts of at most max_nodes, keeping clusters together where possible."""
+    groups = {}
+    for n in nodes:
+        groups.setdefault(key(n), []).append(n)
+    parts, current = [], []
+    for label in sorted(groups):
+        members = sorted(groups[label])
+        if current and len(current) + len(members) > max_nodes:
+            parts.append(current)
+            current = []
+        # Clusters larger than the budget are split across parts
+        while len(members) > max_nodes:
+            parts.append(members[:max_nodes])
+            members = members[max_nodes:]
+        current.extend(members)
+    if current:
+        parts.append(current)
+    return parts
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+def _grouped(nodes, key):
+    groups = {}
+    for n in nodes:
+        groups.setdefault(key(n), []).append(n)
+    return sorted(groups.items())
+
+
+def write_mermaid_graph(path, nodes, edges, key, truncated=(), note=None):
+    ids, cluster_ids = MermaidIds(), MermaidIds()
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        f.write("graph TD\n")
+        if note:
+            f.write("    %%%% %s\n" % note)
+        for label, members in _grouped(nodes, key):
+            indent = "    "
+            if label:
+                f.write('    subgraph cluster_%s["%s"]\n' % (cluster_ids(label), mermaid_label(label)))
+                indent = "        "
+            for n in members:
+                f.write("%s%s\n" % (indent, ids.node(n)))
+            if label:
+                f.write("    end\n")
+        for a, b in edges:
+            f.write("    %s --> %s\n" % (ids(a), ids(b)))
+        if truncated:
+            f.write("    classDef more stroke-dasharray: 5 5\n")
+            f.write("    class %s more\n" % ",".join(ids(n) for n in sorted(truncated)))
+
+
+def _dot_quote(s):
+    return '"%s"' % s.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_dot(path, nodes, edges, key, truncated=(), note=None):
+    with codecs.open(path, "w", encoding="utf-8") as f:
+        f.write("digraph callgraph {\n")
+        if note:
+            f.write("    // %s\n" % note)
+        f.write("    rankdir=TB;\n    node [shape=box];\n")
+        for i, (label, members) in enumerate(_grouped(nodes, key)):
+            indent = "    "
+            if label:
+                f.write("    subgraph cluster_%d {\n        label=%s;\n" % (i, _dot_quote(label)))
+                indent = "        "
+            for n in members:
+                style = " [style=dashed]" if n in truncated else ""
+                f.write("%s%s%s;\n" % (indent, _dot_quote(n), style))
+            if label:
+                f.write("    }\n")
+        for a, b in edges:
+            f.write("    %s -> %s;\n" % (_dot_quote(a), _dot_quote(b)))
+        f.write("}\n")
+
+
+WRITERS = {"mermaid": write_mermaid_graph, "dot": write_dot}
+
+
+# -----------------------------
+# Entry points
+# -----------------------------
+def render(edges, export_dir, fmt="mermaid", roots=None, depth=None, cluster="none",
+           folders=None, reduce=False, max_nodes=DEFAULT_MAX_NODES, basename="call_graph"):
+    """Write one or more diagram files for an edge set. Returns the written paths.
+
+    With roots, one file per root holds the subgraph below it. Otherwise the
+    whole graph is split into parts of at most max_nodes nodes.
+    """
+    ensure_dir(export_dir)
+    adj = adjacency(edges)
+    key = lambda n: cluster_of(n, cluster, folders)
+    writer, ext = WRITERS[fmt], FORMATS[fmt]
+
+    pieces = []  # (filename, nodes, truncated, note)
+    if roots:
+        roots, unknown = match_roots(roots, adj)
+        for root in unknown:
+            print("Skipping unknown root:", root)
+        file_ids = MermaidIds()  # Roots whose names sanitize alike still get a file each
+        for root in roots:
+            nodes, truncated = extract_subgraph(adj, root, depth, max_nodes)
+            note = "calls below %s%s" % (root, "" if depth is None else ", depth %d" % depth)
+            pieces.append(("%s_%s%s" % (basename, file_ids(root), ext), nodes, truncated, note))
+    else:
+        parts = partition(sorted(adj), key, max_nodes)
+        for i, nodes in enumerate(parts):
+            name = "%s%s" % (basename, ext) if len(parts) == 1 else "%s_part%02d%s" % (basename, i + 1, ext)
+            pieces.append((name, nodes, (), "part %d of %d" % (i + 1, len(parts)) if len(parts) > 1 else ""))
+
+    written = []
+    for name, nodes, truncated, note in pieces:
+        piece_edges = induced_edges(adj, nodes)
+        if reduce:
+            piece_edges = reduce_transitive(piece_edges)
+        if not roots:
+            # Edges between parts cannot be drawn; count them so nobody is surprised
+            inside = set(nodes)
+            dropped = sum(1 for a in nodes for b in adj[a] if b not in inside)
+            if dropped:
+                note += ", %d edges to other parts omitted" % dropped
+        path = os.path.join(export_dir, name)
+        writer(path, nodes, piece_edges, key, truncated, note)
+        written.append(path)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a POU call graph to budget-sized Mermaid/Graphviz files.")
+    parser.add_argument("callgraph", help="pou_call_graph.csv")
+    parser.add_argument("-o", "--output", help="Output folder (default: beside the CSV)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="mermaid")
+    parser.add_argument("--root", action="append", help="Render the subgraph below this POU (repeatable)")
+    parser.add_argument("--per-root", action="store_true",
+                        help="One file per Program (needs --xml) or per POU nobody calls")
+    parser.add_argument("--depth", type=int, help="Call levels to include below each root")
+    parser.add_argument("--cluster", choices=CLUSTER_MODES, default="none",
+                        help="Group nodes into subgraphs by project folder (needs --xml) or by namespace")
+    parser.add_argument("--xml", help="PLCopen XML export, for folders and Program roots")
+    parser.add_argument("--reduce", action="store_true", help="Drop transitive edges")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_MAX_NODES,
+                        help="Node budget per output file (default: %d)" % DEFAULT_MAX_NODES)
+    args = parser.parse_args(argv)
+
+    edges = read_edges_csv(args.callgraph)
+    folders = None
+    roots = args.root
+    if args.xml:
+        from .plcopen_xml import read_pou_folders, read_pou_types
+        if args.cluster == "folder":
+            folders = read_pou_folders(args.xml)
+        if args.per_root and not roots:
+            roots = sorted(n for n, t in read_pou_types(args.xml).items() if t.lower() == "program")
+    if args.per_root and not roots:
+        callees = set(b for _, b in edges)
+        roots = sorted(set(a for a, _ in edges) - callees)
+
+    export_dir = args.output or os.path.dirname(os.path.abspath(args.callgraph))
+    for path in render(edges, export_dir, args.format, roots, args.depth, args.cluster,
+                       folders, args.reduce, args.max_nodes):
+        print("Call graph diagram exported:", path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
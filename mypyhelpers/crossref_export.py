@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# crossref_export.py
+# Streaming cross-reference exporter shared by the CODESYS scripts.
+#
+# proj.get_cross_reference() can return millions of entries. Instead of six
+# getattr() probes and one csv write per entry, this module:
+#  - resolves the attribute accessors once per entry type
+#  - collects rows into batches and writes them with writerows()
+#  - writes through a large buffered stream (optionally gzip-compressed)
+#  - prints progress and throughput every N rows, so big projects don't look hung
+#  - can write columnar Parquet instead of CSV when pyarrow is available (CPython only)
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+from __future__ import print_function
+
+import csv
+import gzip
+import io
+import time
+from operator import attrgetter
+
+# Output columns and the attribute names different CODESYS builds use for them
+COLUMNS = (
+    ("Variable", ("name", "variable", "Name")),
+    ("Location", ("location", "Location")),
+    ("Type", ("type", "Type", "datatype")),
+    ("Access", ("access", "Access", "accesstype")),
+    ("POU", ("pou", "POU", "pou_name")),
+    ("Line", ("line", "Line", "linenumber")),
+)
+
+BATCH_ROWS = 10000
+PROGRESS_EVERY = 100000
+BUFFER_SIZE = 1 << 20  # 1 MB write buffer
+GZIP_LEVEL = 6  # zlib default; level 9 is ~2x slower for a few % smaller files
+
+FORMATS = ("csv", "csv.gz", "parquet")
+
+
+def _constant(value):
+    return lambda e: value
+
+
+def _resolve_getters(entry):
+    # First attribute name that exists on this entry type wins; missing columns stay empty
+    getters = []
+    for _, candidates in COLUMNS:
+        for attr in candidates:
+            if hasattr(entry, attr):
+                getters.append(attrgetter(attr))
+                break
+        else:
+            getters.append(_constant(""))
+    return getters
+
+
+def iter_rows(entries):
+    """Yield one tuple per cross-reference entry, resolving accessors once per type."""
+    getters_by_type = {}
+    for e in entries:
+        t = type(e)
+        getters = getters_by_type.get(t)
+        if getters is None:
+            getters = getters_by_type[t] = _resolve_getters(e)
+        yield tuple(g(e) for g in getters)
+
+
+def iter_batches(rows, size=BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def format_for(path):
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        return "csv.gz"
+    if lower.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+class _Progress(object):
+    def __init__(self, every):
+        self.every = every
+        self.start = time.time()
+        self.next_report = every
+
+    def update(self, rows):
+        if not self.every or rows < self.next_report:
+            return
+        elapsed = max(time.time() - self.start, 1e-6)
+        print("  ... %d rows (%.0f rows/s)" % (rows, rows / elapsed))
+        while self.next_report <= rows:
+            self.next_report += self.every
+
+
+def _open_text(path, fmt):
+    # A text layer over one large binary buffer (with gzip in between for .csv.gz).
+    # Returns the text stream and the binary file, which gzip does not close itself
+    raw = io.open(path, "wb", buffering=BUFFER_SIZE)
+    stream = raw
+    if fmt == "csv.gz":
+        stream = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL)
+    return io.TextIOWrapper(stream, encoding="utf-8", newline=""), raw
+
+
+def _text(value):
+    if value is None:
+        return u""
+    try:
+        return unicode(value)  # noqa: F821  (IronPython / Python 2)
+    except NameError:
+        return str(value)
+
+
+def _write_csv(rows, path, fmt, batch_rows, progress):
+    count = 0
+    f, raw = _open_text(path, fmt)
+    try:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow([c[0] for c in COLUMNS])
+        for batch in iter_batches(rows, batch_rows):
+            w.writerows(batch)
+            count += len(batch)
+            progress.update(count)
+    finally:
+        f.close()
+        raw.close()
+    return count
+
+
+def _write_parquet(rows, path, batch_rows, progress):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use .csv or .csv.gz instead")
+
+    schema = pa.schema([(c[0], pa.string()) for c in COLUMNS])
+    count = 0
+    writer = pq.ParquetWriter(path, schema, compression="zstd")
+    try:
+        # Each batch becomes one row group: transpose rows into columns
+        for batch in iter_batches(rows, batch_rows):
+            columns = [pa.array([_text(v) for v in col], type=pa.string()) for col in zip(*batch)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            count += len(batch)
+            progress.update(count)
+    finally:
+        writer.close()
+    return count
+
+
+def export_cross_reference(entries, path, fmt=None, batch_rows=BATCH_ROWS, progress_every=PROGRESS_EVERY):
+    """Write cross-reference entries to CSV, gzip CSV or Parquet. Returns the row count.
+
+    fmt is one of FORMATS; by default it follows the file extension
+    (.csv, .csv.gz / .gz, .parquet).
+    """
+    fmt = fmt or format_for(path)
+    if fmt not in FORMATS:
+        raise ValueError("Unknown cross reference format %r (use one of %s)" % (fmt, ", ".join(FORMATS)))
+    progress = _Progress(progress_every)
+    rows = iter_rows(entries)
+    if fmt == "parquet":
+        count = _write_parquet(rows, path, batch_rows, progress)
+    else:
+        count = _write_csv(rows, path, fmt, batch_rows, progress)
+    elapsed = max(time.time() - progress.start, 1e-6)
+    print("Cross reference: %d rows in %.1f s (%.0f rows/s)" % (count, elapsed, count / elapsed))
+    return count
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# crossref_index.py
+# Indexed SQLite store for the cross reference and POU call graph.
+#
+# Loads cross_reference.csv and pou_call_graph.csv (as written by the CODESYS
+# scripts / callgraph.py) into one SQLite file so questions like
+# "who writes gMotorSpeed?" or "what transitively calls FC_Scale?" are index
+# lookups instead of a full scan of the CSVs.
+#
+# Usage:
+#   python crossref_index.py build Exports/crossref.db --callgraph Exports/pou_call_graph.csv --crossref Exports/cross_reference.csv
+#   python crossref_index.py query Exports/crossref.db callers FC_Scale
+#   python crossref_index.py query Exports/crossref.db reach-up FC_Scale     (transitive callers)
+#   python crossref_index.py query Exports/crossref.db writers gMotorSpeed
+#
+# Names are compared case-insensitively, like IEC 61131-3 identifiers.
+from __future__ import print_function
+
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import sys
+
+INDEX_FILE = "crossref.db"
+CROSSREF_FILES = ("cross_reference.csv", "cross_reference.csv.gz")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pous (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS edges (
+    caller_id INTEGER NOT NULL,
+    callee_id INTEGER NOT NULL,
+    PRIMARY KEY (caller_id, callee_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS var_access (
+    variable TEXT COLLATE NOCASE,
+    location TEXT,
+    type     TEXT,
+    access   TEXT COLLATE NOCASE,
+    pou      TEXT COLLATE NOCASE,
+    line     TEXT,
+    is_read  INTEGER NOT NULL,
+    is_write INTEGER NOT NULL
+);
+"""
+
+# Created after bulk loading (build_index always loads into a fresh file); building
+# an index once is much cheaper than maintaining it row by row
+INDEXES = """
+CREATE INDEX IF NOT EXISTS edges_callee ON edges (callee_id, caller_id);
+CREATE INDEX IF NOT EXISTS var_access_variable ON var_access (variable, is_write, is_read);
+CREATE INDEX IF NOT EXISTS var_access_pou ON var_access (pou);
+CREATE INDEX IF NOT EXISTS var_access_access ON var_access (access);
+"""
+
+BATCH_ROWS = 50000
+
+
+def access_flags(access):
+    """Map a cross-reference access string (Read, Write, Read/Write, R, W...) to (is_read, is_write)."""
+    a = (access or "").strip().lower()
+    is_read = "read" in a or a in ("r", "rw", "r/w")
+    is_write = "write" in a or a in ("w", "rw", "r/w", ":=")
+    return int(is_read), int(is_write)
+
+
+def _batches(rows, size=BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _open_csv(path):
+    # cross_reference.csv.gz (crossref_export's gzip output) is read as it streams in
+    if path.lower().endswith(".gz"):
+        import gzip
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return io.open(path, "r", encoding="utf-8", newline="")
+
+
+def find_crossref(export_dir):
+    """cross_reference.csv or cross_reference.csv.gz in export_dir (the newer one), or None."""
+    found = [p for p in (os.path.join(export_dir, name) for name in CROSSREF_FILES) if os.path.exists(p)]
+    return max(found, key=os.path.getmtime) if found else None
+
+
+def _read_csv(path):
+    # Skip the header row; files are written as UTF-8 by the export scripts
+    with _open_csv(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            yield row
+
+
+# -----------------------------
+# Building
+# -----------------------------
+def connect(db_path):
+    con = sqlite3.connect(db_path)
+    con.executescript(SCHEMA)
+    return con
+
+
+def _pou_ids(con, names):
+    con.executemany("INSERT OR IGNORE INTO pous (name) VALUES (?)", ((n,) for n in names))
+    return dict(con.execute("SELECT name, id FROM pous"))
+
+
+def load_edges(con, edges):
+    """Replace the call graph (edges and POU names) with an iterable of (caller, callee) pairs."""
+    edges = list(edges)
+    names = set()
+    for a, b in edges:
+        names.add(a)
+        names.add(b)
+    con.execute("DELETE FROM edges")
+    con.execute("DELETE FROM pous") # POUs removed from the project must not linger
+    ids = _pou_ids(con, sorted(names))
+    # pous.name is NOCASE-unique, so map spellings through the stored name
+    lower_ids = dict((k.lower(), v) for k, v in ids.items())
+    con.executemany("INSERT OR IGNORE INTO edges (caller_id, callee_id) VALUES (?, ?)",
+                    ((lower_ids[a.lower()], lower_ids[b.lower()]) for a, b in edges))
+    return len(edges)
+
+
+def load_crossref(con, rows):
+    """Replace the variable accesses with rows of (Variable, Location, Type, Access, POU, Line)."""
+    con.execute("DELETE FROM var_access")
+    count = 0
+    for batch in _batches(rows):
+        con.executemany("INSERT INTO var_access VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [tuple((list(r) + [""] * 6)[:6]) + access_flags(r[3] if len(r) > 3 else "")
+                         for r in batch])
+        count += len(batch)
+    return count
+
+
+def _replace(src, dst):
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def build_index(db_path, callgraph_csv=None, crossref_csv=None, edges=None):
+    """Create or refresh an index from the CSV exports (or an in-memory edge set).
+
+    The index is built into a new file next to db_path and swapped in when complete,
+    so the indexes are created once after loading and a crashed build never leaves a
+    half-written index behind. A part that is not given (call graph or cross
+    reference) is copied over from the existing index.
+    """
+    tmp = "%s.%d.tmp" % (db_path, os.getpid())
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if edges is None and callgraph_csv:
+        edges = (tuple(r[:2]) for r in _read_csv(callgraph_csv) if len(r) >= 2)
+    # The existing index, when one of the two parts has to be carried over from it
+    old = db_path if os.path.exists(db_path) and (edges is None or not crossref_csv) else None
+    con = connect(tmp)
+    try:
+        # Bulk load into a private file: no journal, no fsync
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        counts = {}
+        if old:
+            con.execute("ATTACH DATABASE ? AS old", (old,))
+        with con:
+            if edges is not None:
+                counts["edges"] = load_edges(con, edges)
+            elif old:
+                con.execute("INSERT INTO pous SELECT * FROM old.pous")
+                con.execute("INSERT INTO edges SELECT * FROM old.edges")
+            if crossref_csv:
+                counts["var_access"] = load_crossref(con, _read_csv(crossref_csv))
+            elif old:
+                con.execute("INSERT INTO var_access SELECT * FROM old.var_access")
+            con.executescript(INDEXES)
+        if old:
+            con.execute("DETACH DATABASE old")
+        con.execute("ANALYZE")
+        con.close()
+        _replace(tmp, db_path)
+    except BaseException:
+        con.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return counts
+
+
+# -----------------------------
+# Query API
+# -----------------------------
+class CrossRefIndex(object):
+    """Read-only queries against an index built by build_index()."""
+
+    def __init__(self, db_path):
+        if not os.path.exists(db_path):
+            raise IOError("No index at %s; run 'crossref_index.py build' first" % db_path)
+        self.con = sqlite3.connect(db_path)
+
+    def close(self):
+        self.con.close()
+
+    def _names(self, sql, *args):
+        return [r[0] for r in self.con.execute(sql, args)]
+
+    def callers(self, pou):
+        return self._names(
+            "SELECT c.name FROM pous t JOIN edges e ON e.callee_id = t.id "
+            "JOIN pous c ON c.id = e.caller_id WHERE t.name = ? ORDER BY c.name", pou)
+
+    def callees(self, pou):
+        return self._names(
+            "SELECT c.name FROM pous t JOIN edges e ON e.caller_id = t.id "
+            "JOIN pous c ON c.id = e.callee_id WHERE t.name = ? ORDER BY c.name", pou)
+
+    def transitive_callers(self, pou):
+        """Every POU that reaches pou through one or more calls (recursion-safe)."""
+        return self._names(
+            "WITH RECURSIVE reach(id) AS ("
+            "  SELECT e.caller_id FROM pous t JOIN edges e ON e.callee_id = t.id WHERE t.name = ?"
+            "  UNION SELECT e.caller_id FROM edges e JOIN reach r ON e.callee_id = r.id)"
+            " SELECT p.name FROM reach JOIN pous p ON p.id = reach.id ORDER BY p.name", pou)
+
+    def transitive_callees(self, pou):
+        """Every POU reachable from pou through one or more calls (recursion-safe)."""
+        return self._names(
+            "WITH RECURSIVE reach(id) AS ("
+            "  SELECT e.callee_id FROM pous t JOIN edges e ON e.caller_id = t.id WHERE t.name = ?"
+            "  UNION SELECT e.callee_id FROM edges e JOIN reach r ON e.caller_id = r.id)"
+            " SELECT p.name FROM reach JOIN pous p ON p.id = reach.id ORDER BY p.name", pou)
+
+    def accesses(self, variable):
+        """All cross-reference rows for a variable as (location, type, access, pou, line)."""
+        return list(self.con.execute(
+            "SELECT location, type, access, pou, line FROM var_access WHERE variable = ?",
+            (variable,)))
+
+    def readers(self, variable):
+        return self._names(
+            "SELECT DISTINCT pou FROM var_access WHERE variable = ? AND is_read = 1 ORDER BY pou",
+            variable)
+
+    def writers(self, variable):
+        return self._names(
+            "SELECT DISTINCT pou FROM var_access WHERE variable = ? AND is_write = 1 ORDER BY pou",
+            variable)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+QUERIES = {
+    "callers": CrossRefIndex.callers,
+    "callees": CrossRefIndex.callees,
+    "reach-up": CrossRefIndex.transitive_callers,
+    "reach-down": CrossRefIndex.transitive_callees,
+    "readers": CrossRefIndex.readers,
+    "writers": CrossRefIndex.writers,
+    "accesses": CrossRefIndex.accesses,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query a SQLite cross-reference/call-graph index.")
+    sub = parser.add_subparsers(dest="command")
+
+    b = sub.add_parser("build", help="Load CSV exports into an index")
+    b.add_argument("db")
+    b.add_argument("--callgraph", help="pou_call_graph.csv")
+    b.add_argument("--crossref", help="cross_reference.csv or cross_reference.csv.gz")
+
+    q = sub.add_parser("query", help="Ask the index a question")
+    q.add_argument("db")
+    q.add_argument("question", choices=sorted(QUERIES))
+    q.add_argument("name", help="POU name (callers/callees/reach-*) or variable name")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        if not (args.callgraph or args.crossref):
+            parser.error("give --callgraph and/or --crossref")
+        counts = build_index(args.db, args.callgraph, args.crossref)
+        for table, n in sorted(counts.items()):
+            print("%s: %d rows" % (table, n))
+        print("Index written:", args.db)
+    elif args.command == "query":
+        idx = CrossRefIndex(args.db)
+        try:
+            for row in QUERIES[args.question](idx, args.name):
+                print(",".join(row) if isinstance(row, tuple) else row)
+        finally:
+            idx.close()
+    else:
+        parser.print_help()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+"""Watch a folder for new files and hand each one over once it has finished landing.
+
+Used by FileRenamer's --watch mode. On Linux the kernel's inotify API is used directly
+(through ctypes, no extra packages), so the cost is proportional to the number of new
+files rather than the size of the folder. Elsewhere, or with force_polling, the folder
+is re-scanned with os.scandir every poll_interval seconds.
+
+A file is "ready" once it has stopped changing (same size and mtime) for `settle`
+seconds, so partially written or still-copying files are not touched. Ready files go
+through a bounded queue to a single worker thread; when the worker falls behind, the
+watcher waits instead of piling up memory.
+"""
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FolderWatcher:
+    """Calls handle(path) from a worker thread for every new file that has settled."""
+
+    def __init__(self, directory, recursive=False, settle=2.0, poll_interval=5.0,
+                 max_queue=1000, force_polling=False):
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.ready = queue.Queue(maxsize=max_queue)
+        self.libc = None if force_polling else _load_inotify()
+        self.pending = {}  # path -> (due time, size, mtime) while waiting for it to settle
+        self.ignored = OrderedDict()  # Files we produced ourselves (e.g. rename targets)
+        self.known = {}  # path -> (size, mtime) of files already seen (last scan + handed over)
+        self.snapshot_taken = False
+        self.stopped = threading.Event()
+        self.handled = 0
+
+    @property
+    def mode(self):
+        return "inotify" if self.libc is not None else "polling"
+
+    def ignore(self, path):
+        """Don't report the next event for path (call it for files the handler creates or renames).
+
+        Only that one event is swallowed: a file arriving later under the same name is new.
+        """
+        self.ignored[path] = True
+        while len(self.ignored) > 10000:
+            self.ignored.popitem(last=False)
+
+    def snapshot(self):
+        """Remember the files present now; run() then reports every file new or changed since.
+
+        Call it before processing the files already in the folder, so files landing
+        while that runs are not missed. Without it, run() starts from what is there.
+        """
+        self.known = self._scan(self.directory)
+        self.snapshot_taken = True
+
+    def seen(self, paths):
+        """Mark files the caller produced itself (e.g. rename targets) as already handled."""
+        for path in paths:
+            self._seen(os.path.abspath(path))
+
+    def stop(self):
+        self.stopped.set()
+
+    # -----------------------------
+    # Debouncing
+    # -----------------------------
+    def _seen(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self.known[path] = (st.st_size, st.st_mtime)
+
+    def _touch(self, path):
+        if self.ignored.pop(path, None):
+            self._seen(path)  # Our own rename target: remember it so a rescan skips it too
+            return
+        self.pending[path] = (time.monotonic() + self.settle, None, None)
+
+    def _check_pending(self):
+        # Hand over files that have not changed for `settle` seconds
+        now = time.monotonic()
+        for path, (due, size, mtime) in list(self.pending.items()):
+            if due > now:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self.pending[path]  # Gone (moved away or deleted) before it settled
+                continue
+            if (st.st_size, st.st_mtime) != (size, mtime):
+                self.pending[path] = (now + self.settle, st.st_size, st.st_mtime)
+                continue
+            del self.pending[path]
+            self.known[path] = (size, mtime)
+            self.ready.put(path)  # Blocks when the worker is behind (bounded queue)
+
+    def _next_timeout(self, default):
+        if not self.pending:
+            return default
+        return max(0.05, min(due for due, _, _ in self.pending.values()) - time.monotonic())
+
+    # -----------------------------
+    # Event sources
+    # -----------------------------
+    def _scan(self, top):
+        # Snapshot of files below top: {path: (size, mtime)}
+        found = {}
+        stack = [top]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat()
+                            found[entry.path] = (st.st_size, st.st_mtime)
+            except OSError:
+                continue
+        return found
+
+    def _rescan(self):
+        # Touch every file that is new or changed since the last scan or hand-over
+        current = self._scan(self.directory)
+        known = self.known
+        self.known = current
+        for path, sig in current.items():
+            if known.get(path) != sig:
+                self._touch(path)
+
+    def _start_scan(self):
+        # Baseline for rescans: the snapshot (and whatever is new since it), or the folder as it is
+        if self.snapshot_taken:
+            self._rescan()
+        else:
+            self.known = self._scan(self.directory)
+
+    def _run_polling(self):
+        self._start_scan()
+        next_scan = time.monotonic() + self.poll_interval
+        while not self.stopped.is_set():
+            self.stopped.wait(self._next_timeout(max(0.05, next_scan - time.monotonic())))
+            if time.monotonic() >= next_scan:
+                self._rescan()
+                next_scan = time.monotonic() + self.poll_interval
+            self._check_pending()
+
+    def _add_watch(self, fd, wds, path):
+        wd = self.libc.inotify_add_watch(fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed", path)
+        wds[wd] = path
+        if self.recursive:
+            try:
+                with os.scandir(path) as it:
+                    subdirs = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+            except OSError:
+                subdirs = []
+            for sub in subdirs:
+                self._add_watch(fd, wds, sub)
+
+    def _run_inotify(self):
+        fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wds = {}
+        try:
+            self._add_watch(fd, wds, self.directory)
+            self._start_scan()  # Once the watch is up, so nothing falls in between
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            while not self.stopped.is_set():
+                # Wake up for events, for the next settle deadline, or to notice stop()
+                if poller.poll(self._next_timeout(1.0) * 1000):
+                    try:
+                        data = os.read(fd, 65536)
+                    except BlockingIOError:
+                        data = b""
+                    self._handle_events(fd, wds, data)
+                self._check_pending()
+        finally:
+            os.close(fd)
+
+    def _handle_events(self, fd, wds, data):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            raw = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # The kernel dropped events: rescan, but only for files we have not seen yet
+                self._rescan()
+                continue
+            folder = wds.get(wd)
+            if folder is None or not raw:
+                continue
+            path = os.path.join(folder, os.fsdecode(raw))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_watch(fd, wds, path)
+                    for existing in self._scan(path):  # Files that landed before the watch
+                        self._touch(existing)
+                continue
+            self._touch(path)
+
+    # -----------------------------
+    # Main loop
+    # -----------------------------
+    def _worker(self, handle):
+        while True:
+            path = self.ready.get()
+            if path is None:
+                return
+            try:
+                handle(path)
+                self.handled += 1
+            except Exception as e:  # One bad file must not stop the daemon
+                print(f"Error handling {path}: {e}")
+
+    def run(self, handle):
+        """Watch until stop() or Ctrl+C. handle(path) runs on a single worker thread."""
+        worker = threading.Thread(target=self._worker, args=(handle,), daemon=True)
+        worker.start()
+        try:
+            if self.libc is not None:
+                self._run_inotify()
+            else:
+                self._run_polling()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.ready.put(None)
+            worker.join()
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# instrument.py
+# Optional stage timers, counters and peak-memory sampling for the helper scripts.
+#
+# Off by default. Switch it on with the --timing / --profile command line flags, or
+# with the MYPYHELPERS_TIMING environment variable (handy inside CODESYS, where
+# there is no command line):
+#   MYPYHELPERS_TIMING=1        stage timers, counters and peak memory
+#   MYPYHELPERS_TIMING=profile  the same, plus a cProfile dump (<tool>.prof)
+#
+# Code under measurement only does
+#   with instrument.stage("parse"): ...
+#   instrument.count("pous", n)
+# which costs one function call while instrumentation is off. At the end the entry
+# point calls instrument.finish(out_dir), which writes <tool>_timing.json next to
+# the outputs:
+#   {"tool": "callgraph", "seconds": 12.3,
+#    "stages": [{"name": "read_pou_names", "seconds": 0.8, "calls": 1, "peak_rss_mb": 41.2}, ...],
+#    "counters": {"pous": 20000, "edges": 81234}, "peak_rss_mb": 97.5, ...}
+#
+# Stages may nest (e.g. "scan" inside "analyse"), so their times can add up to more
+# than the total. Peak memory per stage comes from a background thread sampling the
+# resident set size every SAMPLE_INTERVAL seconds; stages shorter than that may
+# have no sample. Work done in worker processes (-j) is only seen as waiting time.
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+from __future__ import print_function
+
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "MYPYHELPERS_TIMING"
+REPORT_SUFFIX = "_timing.json"
+REPORT_VERSION = 1
+SAMPLE_INTERVAL = 0.05 # Seconds between memory samples
+
+_clock = getattr(time, "perf_counter", time.time)
+_MB = 1024.0 * 1024.0
+
+
+# -----------------------------
+# Memory readers
+# -----------------------------
+def _memory_readers():
+    # (current_rss, peak_rss): functions returning bytes, or None where unsupported
+    current = peak = None
+    if sys.platform == "cli":
+        # IronPython: .NET process information
+        from System.Diagnostics import Process
+        def current():
+            proc = Process.GetCurrentProcess()
+            return proc.WorkingSet64
+        def peak():
+            proc = Process.GetCurrentProcess()
+            return proc.PeakWorkingSet64
+        return current, peak
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        psapi = ctypes.WinDLL("psapi")
+        kernel32 = ctypes.WinDLL("kernel32")
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        handle = kernel32.GetCurrentProcess()
+        def counters():
+            c = _Counters()
+            c.cb = ctypes.sizeof(c)
+            psapi.GetProcessMemoryInfo(handle, ctypes.byref(c), c.cb)
+            return c
+        return (lambda: counters().WorkingSetSize), (lambda: counters().PeakWorkingSetSize)
+    if os.path.exists("/proc/self/statm"):
+        page = os.sysconf("SC_PAGE_SIZE")
+        def current():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * page
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        def peak():
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        pass
+    return current, peak
+
+def _children_peak():
+    # Largest worker process (process pools), where the platform reports it
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024
+    value = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return value or None
+
+def _mb(value):
+    return round(value / _MB, 1) if value else None
+
+
+# -----------------------------
+# Recorder
+# -----------------------------
+class _NoStage(object):
+    # Shared do-nothing context manager handed out while instrumentation is off
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_STAGE = _NoStage()
+
+class _Stage(object):
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.recorder._open(self.name)
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder._close(self.name, _clock() - self.start)
+        return False
+
+class Recorder(object):
+    """Stage times, counters and memory samples of one run."""
+
+    def __init__(self, tool, profile=False, interval=SAMPLE_INTERVAL):
+        self.tool = tool
+        self.stages = {} # name -> [seconds, calls, peak rss bytes]
+        self.order = []
+        self.counters = {}
+        self.active = {} # name -> nesting depth of stages currently running
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.start = _clock()
+        self.current_rss, self.peak_rss = _memory_readers()
+        self.stopped = threading.Event()
+        self.sampler = None
+        if self.current_rss is not None and interval:
+            self.sampler = threading.Thread(target=self._sample, args=(interval,), name="instrument-sampler")
+            self.sampler.daemon = True
+            self.sampler.start()
+        self.profiler = None
+        if profile:
+            try:
+                import cProfile
+            except ImportError:
+                print("Note: cProfile is not available here; timing report only.")
+            else:
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+
+    def _sample(self, interval):
+        while not self.stopped.wait(interval):
+            try:
+                rss = self.current_rss()
+            except Exception:
+                return
+            with self.lock:
+                for name in self.active:
+                    entry = self.stages[name]
+                    if rss > entry[2]:
+                        entry[2] = rss
+
+    def _open(self, name):
+        with self.lock:
+            if name not in self.stages:
+                self.stages[name] = [0.0, 0, 0]
+                self.order.append(name)
+            self.active[name] = self.active.get(name, 0) + 1
+
+    def _close(self, name, seconds):
+        with self.lock:
+            entry = self.stages[name]
+            entry[0] += seconds
+            entry[1] += 1
+            depth = self.active[name] - 1
+            if depth:
+                self.active[name] = depth
+            else:
+                del self.active[name]
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def stop(self):
+        self.stopped.set()
+        if self.sampler is not None:
+            self.sampler.join()
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def report(self):
+        stages = [{"name": name, "seconds": round(self.stages[name][0], 6), "calls": self.stages[name][1],
+                   "peak_rss_mb": _mb(self.stages[name][2])} for name in self.order]
+        peak = None
+        if self.peak_rss is not None:
+            try:
+                peak = self.peak_rss()
+            except Exception:
+                pass
+        return {"version": REPORT_VERSION, "tool": self.tool,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "seconds": round(_clock() - self.start, 6), "argv": sys.argv,
+                "python": sys.version.split()[0], "platform": sys.platform,
+                "stages": stages, "counters": dict(self.counters),
+                "peak_rss_mb": _mb(peak), "peak_rss_children_mb": _mb(_children_peak())}
+
+
+# -----------------------------
+# Module-level API
+# -----------------------------
+_recorder = None
+
+def enabled():
+    return _recorder is not None
+
+def stage(name):
+    """Context manager timing one stage (a shared no-op while instrumentation is off)."""
+    if _recorder is None:
+        return _NO_STAGE
+    return _Stage(_recorder, name)
+
+def count(name, n=1):
+    if _recorder is not None:
+        _recorder.count(name, n)
+
+def setup(tool, timing=False, profile=False):
+    """Start recording if asked to by the flags or by MYPYHELPERS_TIMING. Returns True if on."""
+    global _recorder
+    env = os.environ.get(ENV_VAR, "").strip().lower()
+    if env in ("", "0", "off", "false", "no"):
+        env = None
+    if not (timing or profile or env):
+        return False
+    _recorder = Recorder(tool, profile=profile or env == "profile")
+    return True
+
+def finish(out_dir):
+    """Stop recording and write <tool>_timing.json (and <tool>.prof) to out_dir.
+
+    Returns the report path, or None if instrumentation was off.
+    """
+    global _recorder
+    recorder = _recorder
+    if recorder is None:
+        return None
+    _recorder = None
+    recorder.stop()
+    report = recorder.report()
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    if recorder.profiler is not None:
+        prof_path = os.path.join(out_dir, recorder.tool + ".prof")
+        recorder.profiler.dump_stats(prof_path)
+        report["profile"] = prof_path
+    path = os.path.join(out_dir, recorder.tool + REPORT_SUFFIX)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Timing report:", path)
+    return path
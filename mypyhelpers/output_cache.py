@@ -0,0 +1,148 @@
+"""Content-addressed manifest of rendered images, so unchanged outputs are not redrawn.
+
+Used by QRcodeMaker.py (batch mode) and Create_social_card.py. Every output gets a key:
+a hash of everything that affects its pixels (data, label, sizes, error correction,
+font file, library versions, ...). The manifest, render_manifest.json next to the
+outputs, remembers the key plus size and mtime of each file written:
+
+    {"version": 1, "run": 7,
+     "files": {"QRcode_LM324OpAmp.png": ["<sha256 key>", 1843, 1717000000000000000, 7], ...}}
+
+- A file whose key, size and mtime all match is up to date and is skipped. A file that
+  was edited or deleted by hand is rendered again.
+- Outputs with the same key (same content, different file name) are rendered once and
+  hard-linked, or copied where the file system can't link.
+- The manifest is bounded: entries whose file is gone are dropped on save, and beyond
+  max_entries the ones not used for the most runs are evicted.
+"""
+import hashlib
+import itertools
+import json
+import os
+import shutil
+
+MANIFEST_FILE = "render_manifest.json"
+MANIFEST_VERSION = 1
+MAX_ENTRIES = 100000
+
+def render_key(**params):
+    """Stable hash of the render parameters (any JSON-serialisable values)."""
+    blob = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def file_digest(path, chunk=1 << 20):
+    # For inputs such as the social card picture: key on content, not on the name
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+_tmp_ids = itertools.count()
+
+def _tmp_path(path):
+    # Unique per process and call: two workers writing the same name never share a temp file
+    return "%s.%d-%d.tmp" % (path, os.getpid(), next(_tmp_ids))
+
+def _replace(tmp, path, write):
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+
+def atomic_save(img, path, **save_args):
+    # Write a new file and swap it in, so hard-linked copies of the old one stay untouched
+    _replace(_tmp_path(path), path, lambda tmp: img.save(tmp, **save_args))
+
+def atomic_write(path, data):
+    # Same as atomic_save, for contents that are already encoded
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            f.write(data)
+    _replace(_tmp_path(path), path, write)
+
+def link_or_copy(src, dst):
+    def link(tmp):
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp) # Different drive, FAT/exFAT, or no permission to link
+    _replace(_tmp_path(dst), dst, link)
+
+class OutputManifest:
+    """Keys of the files in one output folder, loaded from and saved to render_manifest.json."""
+
+    def __init__(self, out_dir, max_entries=MAX_ENTRIES):
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, MANIFEST_FILE)
+        self.max_entries = max_entries
+        self.files = {}
+        self.run = 1
+        self.hits = 0
+        self.misses = 0
+        self.linked = 0
+        self._by_key = None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.files = data.get("files", {})
+            self.run = data.get("run", 0) + 1
+
+    def _stat(self, filename):
+        try:
+            st = os.stat(os.path.join(self.out_dir, filename))
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def is_current(self, filename, key):
+        """True (and counted as a hit) if filename exists and was rendered with this key."""
+        entry = self.files.get(filename)
+        if entry is not None and entry[0] == key and self._stat(filename) == (entry[1], entry[2]):
+            entry[3] = self.run
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def find(self, key):
+        """An up-to-date file already rendered with this key, or None."""
+        if self._by_key is None:
+            self._by_key = dict((entry[0], name) for name, entry in self.files.items())
+        filename = self._by_key.get(key)
+        if filename is not None:
+            entry = self.files.get(filename)
+            if entry is not None and entry[0] == key and self._stat(filename) == (entry[1], entry[2]):
+                return filename
+        return None
+
+    def record(self, filename, key):
+        stat = self._stat(filename)
+        if stat is not None:
+            self.files[filename] = [key, stat[0], stat[1], self.run]
+            if self._by_key is not None:
+                self._by_key[key] = filename
+
+    def link(self, src, dst, key):
+        """Make dst a copy of the already rendered src (hard link if possible) and record it."""
+        link_or_copy(os.path.join(self.out_dir, src), os.path.join(self.out_dir, dst))
+        self.linked += 1
+        self.record(dst, key)
+
+    def save(self):
+        files = dict((name, entry) for name, entry in self.files.items() if self._stat(name) is not None)
+        if len(files) > self.max_entries:
+            # Keep the entries used in the most recent runs
+            keep = sorted(files, key=lambda name: files[name][3], reverse=True)[:self.max_entries]
+            files = dict((name, files[name]) for name in keep)
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "run": self.run, "files": files}, f,
+                          separators=(",", ":"), sort_keys=True)
+        _replace(_tmp_path(self.path), self.path, write)
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+# plcopen_xml.py
+# Streaming (pull-based) reader for PLCopen XML exports.
+#
+# The whole-document approach (XmlDocument + XPath per POU) needs the entire
+# export in memory at once. Full-plant exports are hundreds of MB, so this
+# module walks the file once and hands out one <pou> at a time:
+#   - IronPython (inside CODESYS): System.Xml.XmlReader
+#   - CPython: lxml.etree.iterparse when installed, else xml.etree.ElementTree
+# Each finished subtree is dropped before the next POU is read, so peak memory
+# is bounded by the largest POU rather than by the whole file.
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+from collections import namedtuple
+
+# One analysed POU: its name, pouType attribute, the raw text of every ST body
+# (main body, actions, transitions) and the typeName of every FBD/CFC block.
+PouBody = namedtuple("PouBody", ["name", "pou_type", "st_texts", "block_types"])
+
+# Graphical languages whose <block> elements are treated as calls
+GRAPHICAL_BODIES = ("FBD", "CFC")
+
+try:
+    import clr  # noqa: F401  (only present under IronPython)
+    clr.AddReference("System.Xml")
+    from System.Xml import XmlReader, XmlReaderSettings, XmlNodeType, DtdProcessing
+    HAVE_DOTNET = True
+except ImportError:
+    HAVE_DOTNET = False
+
+# The CPython parser is imported on first use (see etree()), so tools that only
+# import this module for its helpers don't pay for loading lxml
+ET = None
+HAVE_LXML = False
+
+
+def etree():
+    """The ElementTree module used for parsing: lxml.etree if installed."""
+    global ET, HAVE_LXML
+    if ET is None:
+        try:
+            from lxml import etree as ET
+            HAVE_LXML = True
+        except ImportError:
+            try:
+                import xml.etree.cElementTree as ET  # Python 2
+            except ImportError:
+                import xml.etree.ElementTree as ET
+    return ET
+
+
+def local_name(tag):
+    # "{namespace}pou" -> "pou"
+    if tag[:1] == "{":
+        return tag[tag.index("}") + 1:]
+    return tag
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def read_pou_names(path):
+    """Return the set of POU names declared in a PLCopen export.
+
+    Only <pou> start tags are inspected and reading stops at the end of the
+    <pous> section, so this pass is cheap compared to full analysis.
+    """
+    return set(read_pou_types(path))
+
+
+def read_pou_types(path):
+    """Return {name: pouType} (program, functionBlock, function) for every POU."""
+    if HAVE_DOTNET:
+        return _read_pou_types_dotnet(path)
+    return _read_pou_types_etree(path)
+
+
+def read_pou_folders(path):
+    """Return {name: "Folder/Sub"} from the CODESYS project-structure block.
+
+    CODESYS appends the device/application folder tree to the export as
+    <ProjectStructure> with nested <Folder Name=...> and <Object Name=...>
+    elements. Objects at the top level map to "". Exports from other tools
+    have no such block and give an empty dict.
+    """
+    if HAVE_DOTNET:
+        return _read_pou_folders_dotnet(path)
+    return _read_pou_folders_etree(path)
+
+
+def iter_pous(path):
+    """Yield a PouBody for every <pou> in the export, one at a time.
+
+    ST text and FBD/CFC block types are pulled out in a single pass. The
+    caller must not keep references to anything but the yielded record.
+    """
+    if HAVE_DOTNET:
+        return _iter_pous_dotnet(path)
+    return _iter_pous_etree(path)
+
+
+# -----------------------------
+# CPython backend (iterparse)
+# -----------------------------
+def _iterparse(path):
+    et = etree()
+    if HAVE_LXML:
+        # Comments/PIs would otherwise show up as children with non-string tags
+        return et.iterparse(path, events=("start", "end"), remove_comments=True,
+                            remove_pis=True, huge_tree=True)
+    return et.iterparse(path, events=("start", "end"))
+
+
+def _read_pou_types_etree(path):
+    types = {}
+    stack = []
+    for event, elem in _iterparse(path):
+        if event == "start":
+            stack.append(elem)
+            if local_name(elem.tag) == "pou":
+                nm = elem.get("name")
+                if nm:
+                    types[nm] = elem.get("pouType") or ""
+            continue
+        stack.pop()
+        if local_name(elem.tag) == "pous":
+            break  # Nothing after <pous> declares POUs
+        # Drop finished subtrees straight away
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    return types
+
+
+def _read_pou_folders_etree(path):
+    folders = {}
+    stack = []
+    path_names = []  # Folder names above the current element
+    in_structure = False
+    for event, elem in _iterparse(path):
+        ln = local_name(elem.tag)
+        if event == "start":
+            stack.append(elem)
+            if ln == "ProjectStructure":
+                in_structure = True
+            elif in_structure and ln == "Folder":
+                path_names.append(elem.get("Name") or "")
+            elif in_structure and ln == "Object":
+                nm = elem.get("Name")
+                if nm and nm not in folders:
+                    folders[nm] = "/".join(path_names)
+            continue
+        stack.pop()
+        if ln == "ProjectStructure":
+            break
+        if in_structure and ln == "Folder":
+            path_names.pop()
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    return folders
+
+
+def _pou_from_element(pou):
+    st_texts = []
+    block_types = []
+    for el in pou.iter():
+        ln = local_name(el.tag)
+        if ln == "ST":
+            # ST may embed XHTML. Gather all text
+            st_texts.append("".join(el.itertext()))
+        elif ln in GRAPHICAL_BODIES:
+            for b in el.iter():
+                if local_name(b.tag) != "block":
+                    continue
+                # PLCopen TC6 stores the callee as an attribute; some exporters
+                # write it as a <typeName> child element instead.
+                t = b.get("typeName")
+                if not t:
+                    for child in b:
+                        if local_name(child.tag) == "typeName":
+                            t = "".join(child.itertext())
+                            break
+                if t and t.strip():
+                    block_types.append(t.strip())
+    return PouBody(pou.get("name"), pou.get("pouType"), st_texts, block_types)
+
+
+def _iter_pous_etree(path):
+    stack = []
+    in_pou = 0
+    for event, elem in _iterparse(path):
+        if event == "start":
+            stack.append(elem)
+            if local_name(elem.tag) == "pou":
+                in_pou += 1
+            continue
+        stack.pop()
+        if local_name(elem.tag) == "pou":
+            in_pou -= 1
+            if in_pou == 0:
+                yield _pou_from_element(elem)
+        if in_pou:
+            continue  # Keep the POU subtree until the POU itself is done
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+# -----------------------------
+# IronPython backend (XmlReader)
+# -----------------------------
+def _open_reader(path):
+    settings = XmlReaderSettings()
+    settings.IgnoreComments = True
+    settings.IgnoreProcessingInstructions = True
+    settings.DtdProcessing = DtdProcessing.Ignore
+    return XmlReader.Create(path, settings)
+
+
+def _read_pou_types_dotnet(path):
+    types = {}
+    reader = _open_reader(path)
+    try:
+        while reader.Read():
+            nt = reader.NodeType
+            if nt == XmlNodeType.Element and reader.LocalName == "pou":
+                nm = reader.GetAttribute("name")
+                if nm:
+                    types[nm] = reader.GetAttribute("pouType") or ""
+            elif nt == XmlNodeType.EndElement and reader.LocalName == "pous":
+                break
+    finally:
+        reader.Close()
+    return types
+
+
+def _read_pou_folders_dotnet(path):
+    folders = {}
+    path_names = []
+    in_structure = False
+    reader = _open_reader(path)
+    try:
+        while reader.Read():
+            nt = reader.NodeType
+            if nt == XmlNodeType.Element:
+                ln = reader.LocalName
+                if ln == "ProjectStructure":
+                    in_structure = not reader.IsEmptyElement
+                elif in_structure and ln == "Folder" and not reader.IsEmptyElement:
+                    path_names.append(reader.GetAttribute("Name") or "")
+                elif in_structure and ln == "Object":
+                    nm = reader.GetAttribute("Name")
+                    if nm and nm not in folders:
+                        folders[nm] = "/".join(path_names)
+            elif nt == XmlNodeType.EndElement and in_structure:
+                ln = reader.LocalName
+                if ln == "ProjectStructure":
+                    break
+                if ln == "Folder":
+                    path_names.pop()
+    finally:
+        reader.Close()
+    return folders
+
+
+def _iter_pous_dotnet(path):
+    text_nodes = (XmlNodeType.Text, XmlNodeType.CDATA,
+                  XmlNodeType.Whitespace, XmlNodeType.SignificantWhitespace)
+    reader = _open_reader(path)
+    try:
+        pou_depth = st_depth = graph_depth = type_depth = -1
+        name = pou_type = None
+        st_texts = block_types = st_buf = type_buf = None
+        while reader.Read():
+            nt = reader.NodeType
+            if nt == XmlNodeType.Element:
+                ln = reader.LocalName
+                depth = reader.Depth
+                if pou_depth < 0:
+                    if ln == "pou":
+                        name = reader.GetAttribute("name")
+                        pou_type = reader.GetAttribute("pouType")
+                        st_texts, block_types = [], []
+                        if reader.IsEmptyElement:
+                            yield PouBody(name, pou_type, st_texts, block_types)
+                        else:
+                            pou_depth = depth
+                    continue
+                if ln == "ST" and st_depth < 0:
+                    if reader.IsEmptyElement:
+                        st_texts.append("")
+                    else:
+                        st_depth, st_buf = depth, []
+                elif ln in GRAPHICAL_BODIES and graph_depth < 0:
+                    if not reader.IsEmptyElement:
+                        graph_depth = depth
+                elif graph_depth >= 0 and ln == "block":
+                    t = reader.GetAttribute("typeName")
+                    if t and t.strip():
+                        block_types.append(t.strip())
+                elif graph_depth >= 0 and ln == "typeName" and not reader.IsEmptyElement:
+                    type_depth, type_buf = depth, []
+            elif nt in text_nodes:
+                if st_depth >= 0:
+                    st_buf.append(reader.Value)
+                if type_depth >= 0:
+                    type_buf.append(reader.Value)
+            elif nt == XmlNodeType.EndElement and pou_depth >= 0:
+                depth = reader.Depth
+                if depth == type_depth:
+                    t = "".join(type_buf).strip()
+                    if t:
+                        block_types.append(t)
+                    type_depth, type_buf = -1, None
+                elif depth == st_depth:
+                    st_texts.append("".join(st_buf))
+                    st_depth, st_buf = -1, None
+                elif depth == graph_depth:
+                    graph_depth = -1
+                elif depth == pou_depth:
+                    yield PouBody(name, pou_type, st_texts, block_types)
+                    pou_depth = -1
+                    st_texts = block_types = None
+    finally:
+        reader.Close()
@@ -0,0 +1,84 @@
+"""Vector (SVG / PDF) output for labeled QR codes, drawn straight from the module matrix.
+
+No raster image is built at any point. Dark modules are merged into rectangles: runs of
+neighbouring modules in a row, then identical runs in the rows below. They are written
+as one SVG path or one PDF fill, so a label is a few hundred bytes of drawing commands
+and prints sharp at any size. The layout matches make_labeled_qr(): the label centered
+in a band above the code, with coordinates in the same pixel units as the PNG.
+"""
+from .render_cache import text_size
+
+SVG_FONT_FAMILY = "Arial, Helvetica, 'Liberation Sans', 'DejaVu Sans', sans-serif"
+
+def _escape(text):
+    # Same as xml.sax.saxutils.escape, whose import pulls in urllib and http.client
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def module_rects(matrix):
+    """(x, y, width, height) rectangles, in modules, covering every dark module."""
+    rects = []
+    open_rects = {} # (x, width) -> index in rects of the run still growing downwards
+    for y, row in enumerate(matrix):
+        runs = {}
+        x, n = 0, len(row)
+        while x < n:
+            if row[x]:
+                start = x
+                while x < n and row[x]:
+                    x += 1
+                runs[(start, x - start)] = True
+            else:
+                x += 1
+        grown = {}
+        for run in runs:
+            i = open_rects.get(run)
+            if i is not None:
+                x0, y0, w, h = rects[i]
+                rects[i] = (x0, y0, w, h + 1)
+            else:
+                i = len(rects)
+                rects.append((run[0], y, run[1], 1))
+            grown[run] = i
+        open_rects = grown
+    return rects
+
+def label_layout(matrix, label, font, box_size=10):
+    # Same geometry as make_labeled_qr(): (width, height, band, text_x, baseline)
+    text_width, text_height = text_size(label, font)
+    width = len(matrix) * box_size
+    band = text_height + 10 # 10px padding
+    ascent = font.getmetrics()[0]
+    return width, width + band, band, (width - text_width) // 2, 5 + ascent
+
+def qr_svg(matrix, label, font, box_size=10):
+    """SVG document (str) of the QR code with label above it."""
+    width, height, band, _, baseline = label_layout(matrix, label, font, box_size)
+    path = "".join(f"M{x} {y}h{w}v{h}h-{w}z" for x, y, w, h in module_rects(matrix))
+    size = getattr(font, "size", 24)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">'
+            f'<rect width="100%" height="100%" fill="#fff"/>'
+            f'<text x="{width / 2:g}" y="{baseline}" font-family="{SVG_FONT_FAMILY}" font-size="{size}" '
+            f'text-anchor="middle">{_escape(label)}</text>'
+            f'<path transform="translate(0 {band}) scale({box_size})" shape-rendering="crispEdges" d="{path}"/>'
+            f'</svg>\n')
+
+def _pdf_text(text):
+    # Helvetica with WinAnsiEncoding: cp1252, with ( ) \ escaped
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def qr_pdf_page(matrix, label, font, box_size=10):
+    """(width, height, content) of one vector PDF page, in pixel units with y pointing down.
+
+    The content stream draws the label in /F1 (Helvetica) and fills all module
+    rectangles at once; archive_output scales it to points and flips it upright.
+    """
+    width, height, band, text_x, baseline = label_layout(matrix, label, font, box_size)
+    size = getattr(font, "size", 24)
+    ops = [b"1 g 0 0 %d %d re f 0 g" % (width, height),
+           b"BT /F1 %d Tf 1 0 0 -1 %d %d Tm (%s) Tj ET" % (size, text_x, baseline, _pdf_text(label))]
+    ops += [b"%d %d %d %d re" % (x * box_size, band + y * box_size, w * box_size, h * box_size)
+            for x, y, w, h in module_rects(matrix)]
+    ops.append(b"f")
+    return width, height, b"\n".join(ops)
@@ -0,0 +1,116 @@
+"""Shared font, text-measurement and canvas caches for the Pillow-based image tools.
+
+QRcodeMaker.py and Create_social_card.py both draw text onto blank canvases. Doing the
+setup once per process instead of once per image keeps batch runs busy with the work
+that matters (QR encoding and PNG compression):
+
+- get_font(name, size) finds a font file once (searching the usual font folders on
+  Linux, macOS and Windows, with metric-compatible stand-ins for Arial) and keeps the
+  loaded font for the rest of the process.
+- text_bbox(text, font) remembers the bounding boxes of recently measured strings.
+- CanvasPool hands out pre-sized blank canvases and clears them in place on reuse.
+
+Pillow itself is only imported when the first font is loaded or canvas created, so
+tools importing this module still start quickly for --help or a prompt.
+"""
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+
+DEFAULT_FONT = "arial.ttf"
+
+# Tried in order when the requested font is not installed (typical on Linux)
+FALLBACK_FONTS = ("arial.ttf", "LiberationSans-Regular.ttf", "DejaVuSans.ttf",
+                  "Arimo-Regular.ttf", "FreeSans.ttf", "Helvetica.ttc")
+
+def font_dirs():
+    dirs = [os.path.expanduser("~/.local/share/fonts"), os.path.expanduser("~/.fonts"),
+            "/usr/local/share/fonts", "/usr/share/fonts"]
+    if sys.platform == "darwin":
+        dirs += [os.path.expanduser("~/Library/Fonts"), "/Library/Fonts", "/System/Library/Fonts"]
+    elif sys.platform == "win32":
+        dirs += [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+                 os.path.join(os.environ.get("LOCALAPPDATA", ""), r"Microsoft\Windows\Fonts")]
+    return [d for d in dirs if os.path.isdir(d)]
+
+@lru_cache(maxsize=1)
+def _font_index():
+    # {lower-case file name: path} for every font below the font folders, built once
+    index = {}
+    stack = list(reversed(font_dirs()))
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith((".ttf", ".otf", ".ttc")):
+                        index.setdefault(entry.name.lower(), entry.path)
+        except OSError:
+            continue
+    return index
+
+@lru_cache(maxsize=None)
+def resolve_font(name=DEFAULT_FONT):
+    """Path of the font file for name (a path or a file name), a stand-in, or None."""
+    if os.path.isfile(name):
+        return name
+    index = _font_index()
+    for candidate in (name,) + FALLBACK_FONTS:
+        path = index.get(os.path.basename(candidate).lower())
+        if path:
+            return path
+    return None
+
+@lru_cache(maxsize=64)
+def get_font(name=DEFAULT_FONT, size=24):
+    """Loaded font for (name, size), shared by every image drawn in this process."""
+    from PIL import ImageFont
+    path = resolve_font(name)
+    if path:
+        try:
+            return ImageFont.truetype(path, size=size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size) # Scalable built-in font (Pillow >= 10.1)
+    except TypeError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=4096)
+def text_bbox(text, font):
+    """(left, top, right, bottom) of text drawn at (0, 0), like ImageDraw.textbbox."""
+    try:
+        return font.getbbox(text)
+    except AttributeError: # Bitmap fonts before Pillow 9.2 only have getsize()
+        width, height = font.getsize(text)
+        return 0, 0, width, height
+
+def text_size(text, font):
+    left, top, right, bottom = text_bbox(text, font)
+    return right - left, bottom - top
+
+class CanvasPool:
+    """Blank canvases kept per (mode, size, color) and cleared in place when reused.
+
+    A canvas handed out by get() is only valid until the next get() with the same key,
+    so use it for images that are saved straight away (batch runs), not returned.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.canvases = OrderedDict()
+
+    def get(self, mode, size, color):
+        key = (mode, size, color)
+        canvas = self.canvases.get(key)
+        if canvas is None:
+            from PIL import Image
+            canvas = self.canvases[key] = Image.new(mode, size, color)
+            if len(self.canvases) > self.maxsize:
+                self.canvases.popitem(last=False)
+        else:
+            self.canvases.move_to_end(key)
+            canvas.paste(color, (0, 0) + size)
+        return canvas
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# st_scanner.py
+# Shared Structured Text (IEC 61131-3) scanner used by the call-graph tools.
+#
+# One compiled regex walks the ST source left to right and classifies every
+# token as a comment, string, pragma, numeric literal or identifier, so text
+# inside (* comments *), // comments, 'strings' and {pragmas} never produces a
+# match. Identifiers are looked up in a PouIndex that is built once per
+# project. Because POU names are always whole ST tokens, a token-level hash
+# lookup does the job of a trie/Aho-Corasick automaton in one linear pass and
+# cannot match FB_Motor inside FB_MotorGroup the way a substring search does.
+#
+# Kept Python 2.7 compatible so the CODESYS scripting host can import it.
+import re
+
+_TOKEN_RE = re.compile(r"""
+      \(\*.*?(?:\*\)|\Z)                  # (* block comment *)
+    | /\*.*?(?:\*/|\Z)                    # /* block comment */
+    | //[^\n]*                            # // line comment
+    | '(?:\$.|[^'$])*(?:'|\Z)             # 'string'  ($ is the ST escape char)
+    | "(?:\$.|[^"$])*(?:"|\Z)             # "wstring"
+    | \{[^}]*(?:\}|\Z)                    # {attribute/pragma}
+    | [0-9][A-Za-z0-9_#.]*                # numeric / typed literal (16#FF, T#5S)
+    | ([A-Za-z_][A-Za-z0-9_]*)(\s*\()?    # identifier, optionally followed by '('
+""", re.DOTALL | re.VERBOSE)
+
+
+class PouIndex(object):
+    """Case-insensitive lookup of known POU names, built once per project.
+
+    ST identifiers are case-insensitive, so every name is keyed by its upper
+    case form and maps back to the spelling used in the export.
+    """
+
+    def __init__(self, names):
+        self.lookup = {}
+        for name in sorted(n for n in names if n):
+            self.lookup.setdefault(name.upper(), name)
+
+    def __len__(self):
+        return len(self.lookup)
+
+    def __contains__(self, name):
+        return name.upper() in self.lookup
+
+    def names(self):
+        return set(self.lookup.values())
+
+
+def as_index(pou_names):
+    # Accept a ready PouIndex or any iterable of names
+    if isinstance(pou_names, PouIndex):
+        return pou_names
+    return PouIndex(pou_names)
+
+
+def scan_calls(st_text, index):
+    """Return the known POUs called as Name( ... ) in an ST body."""
+    found = set()
+    lookup = index.lookup
+    for m in _TOKEN_RE.finditer(st_text):
+        if m.group(2) is None:
+            continue  # not an identifier, or not followed by '('
+        hit = lookup.get(m.group(1).upper())
+        if hit is not None:
+            found.add(hit)
+    return found
+
+
+def scan_references(st_text, index):
+    """Return the known POUs referenced anywhere in ST code (calls, declarations, types)."""
+    found = set()
+    lookup = index.lookup
+    for m in _TOKEN_RE.finditer(st_text):
+        ident = m.group(1)
+        if ident is None:
+            continue
+        hit = lookup.get(ident.upper())
+        if hit is not None:
+            found.add(hit)
+    return found
@@ -0,0 +1,61 @@
+"""Shared fixtures: a small PLCopen XML export covering the shapes the call-graph tools read."""
+import pytest
+
+EXPORT = """<?xml version="1.0" encoding="utf-8"?>
+<project xmlns="http://www.plcopen.org/xml/tc6_0200">
+  <types>
+    <pous>
+      <pou name="PLC_PRG" pouType="program">
+        <body>
+          <ST><xhtml xmlns="http://www.w3.org/1999/xhtml">fbMotor(Enable := TRUE);
+fc_scale(x := 1);   (* FB_Unused(); *)
+// FB_Valve();
+sMsg := 'FB_Valve()';
+{attribute 'FB_Valve()'}
+</xhtml></ST>
+        </body>
+        <actions>
+          <action name="Reset">
+            <body><ST><xhtml xmlns="http://www.w3.org/1999/xhtml">FB_MOTOR();</xhtml></ST></body>
+          </action>
+        </actions>
+      </pou>
+      <pou name="FB_Motor" pouType="functionBlock">
+        <body>
+          <FBD>
+            <block localId="1" typeName="FC_Scale"/>
+            <block localId="2"><typeName>TON</typeName></block>
+          </FBD>
+        </body>
+      </pou>
+      <pou name="FC_Scale" pouType="function">
+        <body><ST><xhtml xmlns="http://www.w3.org/1999/xhtml">FC_Scale := x * 2;</xhtml></ST></body>
+      </pou>
+      <pou name="FB_Unused" pouType="functionBlock">
+        <body><ST><xhtml xmlns="http://www.w3.org/1999/xhtml">FB_Valve();</xhtml></ST></body>
+      </pou>
+      <pou name="FB_Valve" pouType="functionBlock">
+        <body><ST><xhtml xmlns="http://www.w3.org/1999/xhtml">FB_Unused();</xhtml></ST></body>
+      </pou>
+    </pous>
+  </types>
+  <addData>
+    <data name="http://www.3s-software.com/plcopenxml/projectstructure" handleUnknown="discard">
+      <ProjectStructure>
+        <Object Name="PLC_PRG"/>
+        <Folder Name="Drives">
+          <Object Name="FB_Motor"/>
+          <Folder Name="Math"><Object Name="FC_Scale"/></Folder>
+        </Folder>
+      </ProjectStructure>
+    </data>
+  </addData>
+</project>
+"""
+
+
+@pytest.fixture
+def plcopen_export(tmp_path):
+    path = tmp_path / "export.xml"
+    path.write_text(EXPORT, encoding="utf-8")
+    return str(path)
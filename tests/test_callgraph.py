@@ -0,0 +1,68 @@
+"""callgraph: edges from the shared export, serial, in a process pool and from the cache."""
+import os
+
+from mypyhelpers.callgraph import build_call_graph, export_call_graph
+from mypyhelpers.callgraph_cache import CallGraphCache
+
+EDGES = set([
+    ("PLC_PRG", "FC_Scale"), ("PLC_PRG", "FB_Motor"),  # fbMotor( is an instance, not a POU
+    ("FB_Motor", "FC_Scale"), ("FB_Motor", "TON"),
+    ("FB_Unused", "FB_Valve"), ("FB_Valve", "FB_Unused"),
+])
+
+
+def test_serial_and_parallel_agree(plcopen_export):
+    assert build_call_graph(plcopen_export, workers=1) == EDGES
+    # Tiny chunks so both workers get several
+    assert build_call_graph(plcopen_export, workers=2, chunk_chars=1) == EDGES
+
+
+def test_export_writes_csv_and_mermaid(plcopen_export, tmp_path):
+    out = str(tmp_path / "Exports")
+    assert export_call_graph(plcopen_export, out, use_cache=False) == EDGES
+    with open(os.path.join(out, "pou_call_graph.csv"), encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "Caller,Callee"
+    assert lines[1:] == ["%s,%s" % e for e in sorted(EDGES)]
+    assert sorted(os.listdir(out)) == ["call_graph.mmd", "pou_call_graph.csv"]
+
+
+def cache_run(xml_path, cache_path):
+    cache = CallGraphCache(cache_path)
+    edges = build_call_graph(xml_path, cache=cache)
+    return edges, cache.hits, cache.misses
+
+
+def test_cache_reuses_unchanged_pous(plcopen_export, tmp_path):
+    cache_path = str(tmp_path / "callgraph_cache.json")
+    assert cache_run(plcopen_export, cache_path) == (EDGES, 0, 5)
+    assert cache_run(plcopen_export, cache_path) == (EDGES, 5, 0)
+
+    with open(plcopen_export, encoding="utf-8") as f:
+        text = f.read()
+    with open(plcopen_export, "w", encoding="utf-8") as f:
+        f.write(text.replace("FB_Valve();</xhtml>", "FC_Scale(x := 0);</xhtml>"))
+    changed = (EDGES - set([("FB_Unused", "FB_Valve")])) | set([("FB_Unused", "FC_Scale")])
+    assert cache_run(plcopen_export, cache_path) == (changed, 4, 1)
+
+
+def test_cache_dropped_when_pou_names_change(plcopen_export, tmp_path):
+    cache_path = str(tmp_path / "callgraph_cache.json")
+    cache_run(plcopen_export, cache_path)
+    with open(plcopen_export, encoding="utf-8") as f:
+        text = f.read()
+    # A new POU can turn identifiers in unchanged bodies into calls
+    with open(plcopen_export, "w", encoding="utf-8") as f:
+        f.write(text.replace('<pou name="FB_Valve"', '<pou name="FbMotor" pouType="functionBlock"/>\n'
+                                                    '      <pou name="FB_Valve"'))
+    edges, hits, misses = cache_run(plcopen_export, cache_path)
+    assert ("PLC_PRG", "FbMotor") in edges
+    assert (hits, misses) == (0, 6)
+
+
+def test_unreadable_cache_is_ignored(plcopen_export, tmp_path):
+    cache_path = tmp_path / "callgraph_cache.json"
+    cache_path.write_text("{not json", encoding="utf-8")
+    assert cache_run(plcopen_export, str(cache_path)) == (EDGES, 0, 5)
+    assert cache_run(plcopen_export, str(cache_path)) == (EDGES, 5, 0)
+    assert sorted(os.listdir(tmp_path)) == ["callgraph_cache.json", "export.xml"]
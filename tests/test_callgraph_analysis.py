@@ -0,0 +1,58 @@
+"""callgraph_analysis: roots, reachability, recursion groups and call depth."""
+from mypyhelpers.callgraph_analysis import CallGraph, analyse, match_roots, strongly_connected
+from mypyhelpers.callgraph_diff import diff_call_graphs
+
+EDGES = [("PLC_PRG", "FB_Motor"), ("FB_Motor", "FC_Scale"), ("VISU_PRG", "FB_Display")]
+
+
+def test_roots_match_case_insensitively():
+    assert match_roots(["plc_prg", "FB_MOTOR", "PLC_PRG", "Nope"], set(["PLC_PRG", "FB_Motor"])) == \
+        (["FB_Motor", "PLC_PRG"], ["Nope"])
+    s = analyse(EDGES, roots=["plc_prg", "MAIN"])["summary"]
+    assert s["roots"] == ["PLC_PRG"]
+    assert s["unknown_roots"] == ["MAIN"]
+    assert s["unreachable"] == ["FB_Display", "VISU_PRG"]
+
+
+def test_diff_roots_match_case_insensitively():
+    report = diff_call_graphs(EDGES, EDGES[:2], roots=["visu_prg"])
+    assert report["roots"] == ["VISU_PRG"]
+    assert report["unknown_roots"] == []
+
+
+def test_recursion_groups():
+    edges = [("MAIN", "A"), ("A", "B"), ("B", "C"), ("C", "A"), ("C", "D"), ("D", "D"), ("MAIN", "E")]
+    graph = CallGraph(edges)
+    comp, sccs = strongly_connected(graph)
+    groups = sorted(sorted(graph.names[v] for v in members) for members in sccs)
+    assert groups == [["A", "B", "C"], ["D"], ["E"], ["MAIN"]]
+    # Reverse topological order: the D group comes before the A-B-C group that calls it
+    assert comp[graph.ids["D"]] < comp[graph.ids["A"]] < comp[graph.ids["MAIN"]]
+    s = analyse(edges)["summary"]
+    assert s["recursion"] == [["A", "B", "C"], ["D"]]  # Self-calls count, single nodes don't
+
+
+def test_longest_depth_through_cycles():
+    edges = [("MAIN", "A"), ("A", "B"), ("B", "A"), ("B", "C"), ("C", "D"), ("MAIN", "D")]
+    result = analyse(edges, roots=["MAIN"])
+    depth = dict(zip(result["graph"].names, result["depth"]))
+    # A and B share one SCC, so the cycle adds one level, not an endless chain
+    assert depth == {"MAIN": 3, "A": 2, "B": 2, "C": 1, "D": 0}
+    assert result["summary"]["root_depth"] == {"MAIN": 3}
+
+
+def test_deep_chain_does_not_recurse():
+    edges = [("P%05d" % i, "P%05d" % (i + 1)) for i in range(5000)]
+    result = analyse(edges)
+    assert result["summary"]["root_depth"] == {"P00000": 5000}
+    assert result["summary"]["recursion"] == []
+
+
+def test_dead_code_with_pou_types():
+    types = {"PLC_PRG": "program", "FB_Used": "functionBlock", "FB_Dead": "functionBlock",
+             "FB_Orphan": "functionBlock"}
+    s = analyse([("PLC_PRG", "FB_Used"), ("FB_Dead", "FB_Used"), ("FB_Used", "TON")], types)["summary"]
+    assert s["roots"] == ["PLC_PRG"]
+    assert s["unreachable"] == ["FB_Dead", "FB_Orphan"]  # TON is a library block, never dead
+    assert s["unreferenced"] == ["FB_Dead", "FB_Orphan"]
+    assert s["top_fan_in"][0] == ["FB_Used", 2]
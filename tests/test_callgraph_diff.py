@@ -0,0 +1,50 @@
+"""callgraph_diff: change report, roots, watched POUs and Mermaid view."""
+from mypyhelpers.callgraph_diff import diff_call_graphs, write_diff_mermaid
+
+
+def test_mermaid_ids_stay_unique(tmp_path):
+    report = diff_call_graphs([], [("PLC_PRG", "A B"), ("PLC_PRG", "A_B")])
+    path = str(tmp_path / "diff.mmd")
+    write_diff_mermaid(report, path)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert 'A_B["A B"]' in text
+    assert 'A_B_2["A_B"]' in text
+    assert "PLC_PRG --> A_B_2" in text
+
+
+OLD = [("PLC_PRG", "FB_Motor"), ("PLC_PRG", "FB_Door"), ("FB_Door", "FB_EStop"), ("FB_Motor", "FC_Scale")]
+NEW = [("PLC_PRG", "FB_Motor"), ("FB_Motor", "FB_EStop"), ("FB_Motor", "FC_Scale"), ("FB_Door", "FB_EStop"),
+       ("FB_New", "FC_Scale")]
+
+
+def test_newly_dead_and_watched_callers():
+    report = diff_call_graphs(OLD, NEW, roots=["PLC_PRG"], watch=["FB_EStop", "FB_Safety"])
+    assert report["edges_added"] == [("FB_Motor", "FB_EStop"), ("FB_New", "FC_Scale")]
+    assert report["edges_removed"] == [("PLC_PRG", "FB_Door")]
+    assert report["pous_added"] == ["FB_New"]
+    assert report["became_unreachable"] == ["FB_Door"]
+    assert report["added_unreachable"] == ["FB_New"]
+    assert report["watched"]["FB_EStop"] == {
+        "callers_added": ["FB_Motor"], "callers_removed": [], "callers": 2, "reachable": [True, True]}
+    assert report["watched"]["FB_Safety"]["reachable"] == [False, False]
+    assert report["summary"]["became_unreachable"] == 1
+
+
+def test_default_roots_and_programs():
+    # Without roots, POUs nobody called before are the roots
+    assert diff_call_graphs(OLD, NEW)["roots"] == ["FB_New", "PLC_PRG"]
+    types = {"PLC_PRG": "program", "FB_Door": "program"}
+    report = diff_call_graphs(OLD, NEW, new_types=types)
+    assert report["roots"] == ["FB_Door", "PLC_PRG"]
+    assert report["became_unreachable"] == []
+
+
+def test_mermaid_marks_newly_dead(tmp_path):
+    path = str(tmp_path / "diff.mmd")
+    write_diff_mermaid(diff_call_graphs(OLD, NEW, roots=["PLC_PRG"]), path)
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    assert "PLC_PRG -.-> FB_Door" in text
+    assert "class FB_Door,FB_New dead" in text
+    assert "class FB_New added" in text
@@ -0,0 +1,69 @@
+"""callgraph_render: Mermaid output, node budget and transitive reduction."""
+import os
+
+from mypyhelpers.callgraph_render import adjacency, cluster_of, extract_subgraph, partition, reduce_transitive, render
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_mermaid_ids_stay_unique_and_labels_escaped(tmp_path):
+    edges = [("PLC_PRG", 'FB "quoted"'), ("PLC_PRG", "A B"), ("PLC_PRG", "A_B"), ("A B", "A_B")]
+    path, = render(edges, str(tmp_path))
+    text = read(path)
+    assert 'FB_quoted_["FB #quot;quoted#quot;"]' in text
+    assert 'A_B["A B"]' in text
+    assert 'A_B_2["A_B"]' in text
+    assert "A_B --> A_B_2" in text
+    assert '"quoted"' not in text
+
+
+def test_cluster_labels_escaped(tmp_path):
+    folders = {"FB_Motor": 'Drives "new"', "FB_Pump": "Drives_new"}
+    path, = render([("FB_Motor", "FB_Pump")], str(tmp_path), cluster="folder", folders=folders)
+    text = read(path)
+    assert 'subgraph cluster_Drives_new_["Drives #quot;new#quot;"]' in text
+    assert 'subgraph cluster_Drives_new["Drives_new"]' in text
+    assert cluster_of("Lib.FB_Motor", "namespace") == "Lib"
+
+
+def test_reduce_transitive_keeps_reachability():
+    edges = [("A", "B"), ("B", "C"), ("A", "C"), ("C", "A"), ("A", "D")]
+    kept = reduce_transitive(edges)
+    assert ("A", "C") not in kept
+    assert sorted(kept) == [("A", "B"), ("A", "D"), ("B", "C"), ("C", "A")]
+
+
+def test_subgraph_budget_and_depth():
+    adj = adjacency([("R", "A"), ("R", "B"), ("A", "C"), ("B", "D"), ("D", "E")])
+    nodes, truncated = extract_subgraph(adj, "R", depth=2)
+    assert nodes == ["R", "A", "B", "C", "D"]
+    assert truncated == set(["D"])  # E is below the depth limit
+    nodes, truncated = extract_subgraph(adj, "R", max_nodes=3)
+    assert nodes == ["R", "A", "B"]
+    assert truncated == set(["A", "B"])  # Both have callees left out
+
+
+def test_partition_respects_the_budget():
+    key = lambda n: n.split(".")[0]
+    # A cluster that does not fit in what is left of a part starts the next one
+    assert partition(["A.1", "A.2", "A.3", "B.1", "B.2"], key, 4) == [["A.1", "A.2", "A.3"], ["B.1", "B.2"]]
+    # One larger than the budget is split, and the rest is packed with the next clusters
+    nodes = ["X.%d" % i for i in range(5)] + ["Y.1", "Y.2", "Z.1"]
+    assert partition(nodes, key, 4) == [["X.0", "X.1", "X.2", "X.3"], ["X.4", "Y.1", "Y.2", "Z.1"]]
+
+
+def test_render_splits_and_counts_omitted_edges(tmp_path):
+    edges = [("N%02d" % i, "N%02d" % (i + 1)) for i in range(9)]
+    paths = render(edges, str(tmp_path), max_nodes=4)
+    assert [os.path.basename(p) for p in paths] == ["call_graph_part01.mmd", "call_graph_part02.mmd",
+                                                    "call_graph_part03.mmd"]
+    assert "part 1 of 3, 1 edges to other parts omitted" in read(paths[0])
+    paths = render(edges, str(tmp_path), fmt="dot", roots=["n00"], depth=2)
+    assert [os.path.basename(p) for p in paths] == ["call_graph_N00.dot"]
+    text = read(paths[0])
+    assert '"N01" -> "N02";' in text
+    assert '"N02" [style=dashed];' in text
+    assert "N03" not in text
@@ -0,0 +1,45 @@
+"""crossref_export: CSV rows and the gzip output feeding the SQLite index."""
+import gzip
+from collections import namedtuple
+
+from mypyhelpers.crossref_export import export_cross_reference
+from mypyhelpers.crossref_index import CrossRefIndex, build_index, find_crossref
+
+Entry = namedtuple("Entry", "name location type access pou line")
+LegacyEntry = namedtuple("LegacyEntry", "Name Location Access")  # older builds: other names, no POU/line
+
+ENTRIES = [
+    Entry("gSpeed", "GVL", "INT", "Write", "FB_Motor", 3),
+    Entry("gSpeed", "GVL", "INT", "Read", "PLC_PRG", 12),
+    LegacyEntry("gDoor", "GVL_Safety", "Read"),
+]
+
+EXPECTED = (
+    "Variable,Location,Type,Access,POU,Line\n"
+    "gSpeed,GVL,INT,Write,FB_Motor,3\n"
+    "gSpeed,GVL,INT,Read,PLC_PRG,12\n"
+    "gDoor,GVL_Safety,,Read,,\n"
+)
+
+
+def test_csv_rows(tmp_path):
+    path = str(tmp_path / "cross_reference.csv")
+    assert export_cross_reference(ENTRIES, path, batch_rows=2) == 3
+    with open(path, encoding="utf-8", newline="") as f:
+        assert f.read() == EXPECTED
+
+
+def test_gzip_output_builds_the_index(tmp_path):
+    path = str(tmp_path / "cross_reference.csv.gz")
+    export_cross_reference(ENTRIES, path)
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        assert f.read() == EXPECTED
+    assert find_crossref(str(tmp_path)) == path
+    db = str(tmp_path / "crossref.db")
+    build_index(db, crossref_csv=path)
+    idx = CrossRefIndex(db)
+    try:
+        assert idx.writers("gSpeed") == ["FB_Motor"]
+        assert idx.readers("gspeed") == ["PLC_PRG"]
+    finally:
+        idx.close()
@@ -0,0 +1,64 @@
+"""crossref_index: building, refreshing and querying the SQLite index."""
+import os
+
+from mypyhelpers.crossref_index import CrossRefIndex, build_index
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def names(db):
+    idx = CrossRefIndex(db)
+    try:
+        return sorted(r[0] for r in idx.con.execute("SELECT name FROM pous"))
+    finally:
+        idx.close()
+
+
+def test_refresh_drops_removed_pous(tmp_path):
+    db = str(tmp_path / "crossref.db")
+    build_index(db, edges=[("PLC_PRG", "FB_Old"), ("PLC_PRG", "FB_Motor")])
+    build_index(db, edges=[("PLC_PRG", "FB_Motor")])
+    assert names(db) == ["FB_Motor", "PLC_PRG"]
+    assert os.listdir(tmp_path) == ["crossref.db"]
+
+
+def test_refresh_keeps_the_part_not_given(tmp_path):
+    db = str(tmp_path / "crossref.db")
+    crossref = write(tmp_path / "cross_reference.csv",
+                     "Variable,Location,Type,Access,POU,Line\ngSpeed,GVL,INT,Write,FB_Motor,3\n")
+    build_index(db, crossref_csv=crossref, edges=[("PLC_PRG", "FB_Motor")])
+    build_index(db, edges=[("PLC_PRG", "FB_Motor"), ("PLC_PRG", "FB_Valve")])
+    idx = CrossRefIndex(db)
+    try:
+        assert idx.writers("gspeed") == ["FB_Motor"]
+        assert idx.callees("plc_prg") == ["FB_Motor", "FB_Valve"]
+    finally:
+        idx.close()
+    callgraph = write(tmp_path / "pou_call_graph.csv", "Caller,Callee\nMAIN,FB_Motor\n")
+    build_index(db, crossref_csv=crossref)
+    build_index(db, callgraph_csv=callgraph)
+    idx = CrossRefIndex(db)
+    try:
+        assert idx.callers("FB_Motor") == ["MAIN"]
+        assert idx.writers("gSpeed") == ["FB_Motor"]
+    finally:
+        idx.close()
+
+
+def test_failed_build_keeps_the_old_index(tmp_path):
+    db = str(tmp_path / "crossref.db")
+    build_index(db, edges=[("PLC_PRG", "FB_Motor")])
+
+    def broken():
+        yield ("PLC_PRG", "FB_New")
+        raise IOError("export truncated")
+
+    try:
+        build_index(db, edges=broken())
+    except IOError:
+        pass
+    assert names(db) == ["FB_Motor", "PLC_PRG"]
+    assert os.listdir(tmp_path) == ["crossref.db"]
@@ -0,0 +1,72 @@
+"""FileRenamer command line: options, config files and the undo journal."""
+import json
+import os
+
+from mypyhelpers.FileRenamer import main
+
+
+def make(folder, *names):
+    for name in names:
+        open(os.path.join(folder, name), "w").close()
+
+
+def test_cli_counter_start_beats_config(tmp_path):
+    folder = tmp_path / "files"
+    folder.mkdir()
+    make(folder, "a.txt", "b.txt")
+    config = tmp_path / "rename.json"
+    config.write_text(json.dumps({"counter_start": 100, "steps": [{"op": "template", "format": "{counter}{ext}"}]}))
+    journal = str(tmp_path / "journal.jsonl")
+    assert main([str(folder), "--config", str(config), "--counter-start", "5", "--journal", journal, "-q"]) == 0
+    assert sorted(os.listdir(folder)) == ["5.txt", "6.txt"]
+
+
+def test_config_counter_start_without_cli(tmp_path):
+    folder = tmp_path / "files"
+    folder.mkdir()
+    make(folder, "a.txt")
+    config = tmp_path / "rename.json"
+    config.write_text(json.dumps({"counter_start": 100, "steps": [{"op": "template", "format": "{counter}{ext}"}]}))
+    assert main([str(folder), "--config", str(config), "--journal", str(tmp_path / "j.jsonl"), "-q"]) == 0
+    assert os.listdir(folder) == ["100.txt"]
+
+
+def test_default_journal_names_are_unique():
+    from mypyhelpers.FileRenamer import default_journal_path
+    assert default_journal_path() != default_journal_path()
+
+
+def test_legacy_helpers_write_no_journal_unless_asked(tmp_path, monkeypatch):
+    from mypyhelpers.FileRenamer import add_prefix, undo_journal
+    folder = tmp_path / "files"
+    folder.mkdir()
+    make(folder, "a.txt")
+    monkeypatch.chdir(tmp_path)
+    add_prefix(str(folder), "old_", ".txt")
+    assert sorted(os.listdir(tmp_path)) == ["files"]
+    assert os.listdir(folder) == ["old_a.txt"]
+
+    journal = str(tmp_path / "j.jsonl")
+    add_prefix(str(folder), "new_", ".txt", journal_path=journal)
+    assert os.listdir(folder) == ["new_old_a.txt"]
+    assert undo_journal(journal) == 1
+    assert os.listdir(folder) == ["old_a.txt"]
+
+
+def test_swap_counts_each_file_once(tmp_path, capsys):
+    from mypyhelpers.FileRenamer import run_rule, undo_journal
+    make(tmp_path, "a.txt", "b.txt", "c.txt")
+    swap = {"a.txt": "b.txt", "b.txt": "a.txt", "c.txt": "d.txt"}
+    rule = lambda name, entry=None: swap.get(name)
+
+    run_rule(str(tmp_path), rule, dry_run=True)
+    assert "3 renames planned" in capsys.readouterr().out
+
+    journal = str(tmp_path.parent / "swap.jsonl")
+    summary = run_rule(str(tmp_path), rule, journal_path=journal)
+    assert summary["renamed"] == 3 # Not counting the move to and from the temporary name
+    out = capsys.readouterr().out
+    assert "renaming-" not in out
+    assert "Renamed: a.txt -> b.txt" in out and "Renamed: b.txt -> a.txt" in out
+    assert undo_journal(journal) == 4 # The journal itself still has every step
+    assert sorted(os.listdir(tmp_path)) == ["a.txt", "b.txt", "c.txt"]
@@ -0,0 +1,64 @@
+"""FolderWatcher rescans (after an inotify overflow) and ignored rename targets."""
+import os
+
+from mypyhelpers import folder_watch
+from mypyhelpers.folder_watch import FolderWatcher
+
+OVERFLOW = folder_watch._EVENT.pack(-1, folder_watch.IN_Q_OVERFLOW, 0, 0)
+
+
+def make(path, text="x"):
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_overflow_skips_files_already_renamed(tmp_path):
+    make(tmp_path / "x.jpg")
+    os.rename(tmp_path / "x.jpg", tmp_path / "old_x.jpg") # The initial pass, before watching starts
+    watcher = FolderWatcher(tmp_path, settle=0)
+    watcher.known = watcher._scan(watcher.directory)      # Snapshot taken when the watch is set up
+    new = make(tmp_path / "y.jpg")
+
+    watcher._handle_events(None, {}, OVERFLOW)
+    assert list(watcher.pending) == [new]
+
+
+def test_overflow_skips_handled_and_ignored_files(tmp_path):
+    watcher = FolderWatcher(tmp_path, settle=0)
+    handled = make(tmp_path / "a.jpg")
+    watcher._touch(handled)
+    watcher._check_pending() # Not settled yet: size/mtime recorded
+    watcher._check_pending()
+    assert watcher.ready.get_nowait() == handled
+
+    target = str(tmp_path / "old_a.jpg")
+    watcher.ignore(target)
+    os.rename(handled, target)
+    watcher._handle_events(None, {}, OVERFLOW) # The rename's own event was lost in the overflow
+    assert watcher.pending == {}
+    assert target not in watcher.ignored
+
+
+def test_ignore_swallows_only_one_event(tmp_path):
+    watcher = FolderWatcher(tmp_path, settle=0)
+    target = make(tmp_path / "old_x.jpg")
+    watcher.ignore(target)
+    watcher._touch(target)
+    assert watcher.pending == {}
+    os.remove(target)
+    make(target, "a different file under the same name")
+    watcher._touch(target)
+    assert list(watcher.pending) == [target]
+
+
+def test_files_landing_after_the_first_pass_are_picked_up(tmp_path):
+    from mypyhelpers.FileRenamer import make_rule, run_rule
+    make(tmp_path / "x.jpg")
+    watcher = FolderWatcher(tmp_path, settle=0, force_polling=True)
+    watcher.snapshot() # As watch_folder() does, before its first pass
+    run_rule(str(tmp_path), make_rule("add", "prefix", "old_", ".jpg"), journal_path=False, verbose=False,
+             on_applied=lambda ops: watcher.seen(dst for _, dst in ops))
+    late = make(tmp_path / "late.jpg") # After the pass, before the watch is up
+    watcher._start_scan()
+    assert list(watcher.pending) == [late]
@@ -0,0 +1,69 @@
+"""output_cache: atomic writes and the render manifest."""
+import os
+import threading
+
+from mypyhelpers.output_cache import OutputManifest, atomic_save, atomic_write, link_or_copy
+
+
+def test_concurrent_atomic_writes_to_one_path(tmp_path):
+    path = str(tmp_path / "same.png")
+    errors = []
+
+    def writer(n):
+        for i in range(50):
+            try:
+                atomic_write(path, b"%d-%d" % (n, i))
+            except OSError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ["same.png"] # No temp files left behind
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    class Broken:
+        def save(self, path, **kwargs):
+            open(path, "wb").close()
+            raise OSError("disk full")
+
+    try:
+        atomic_save(Broken(), str(tmp_path / "card.png"), format="PNG")
+    except OSError:
+        pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_manifest_links_duplicates(tmp_path):
+    src = tmp_path / "a.png"
+    atomic_write(str(src), b"image")
+    manifest = OutputManifest(str(tmp_path))
+    manifest.record("a.png", "k1")
+    assert manifest.find("k1") == "a.png"
+    manifest.link("a.png", "b.png", "k1")
+    manifest.save()
+    reloaded = OutputManifest(str(tmp_path))
+    assert reloaded.is_current("b.png", "k1")
+    assert (tmp_path / "b.png").read_bytes() == b"image"
+    link_or_copy(str(src), str(tmp_path / "c.png"))
+    assert sorted(os.listdir(tmp_path)) == ["a.png", "b.png", "c.png", "render_manifest.json"]
+
+
+def test_manifest_save_uses_its_own_temp_file(tmp_path, monkeypatch):
+    from mypyhelpers import output_cache
+    foreign = str(tmp_path / "render_manifest.json.tmp") # Left by a run using the old fixed name
+    with open(foreign, "w") as f:
+        f.write("{half written")
+    temps = []
+    real = output_cache._tmp_path
+    monkeypatch.setattr(output_cache, "_tmp_path", lambda path: temps.append(real(path)) or temps[-1])
+    manifest = OutputManifest(str(tmp_path))
+    manifest.save()
+    manifest.save()
+    assert len(set(temps)) == 2 and foreign not in temps
+    assert OutputManifest(str(tmp_path)).run == 2
+    assert sorted(os.listdir(tmp_path)) == ["render_manifest.json", "render_manifest.json.tmp"]
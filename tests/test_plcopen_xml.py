@@ -0,0 +1,29 @@
+"""plcopen_xml: streaming POU bodies, types and project folders out of an export."""
+from mypyhelpers.plcopen_xml import iter_pous, read_pou_folders, read_pou_names, read_pou_types
+
+
+def test_iter_pous(plcopen_export):
+    pous = dict((p.name, p) for p in iter_pous(plcopen_export))
+    assert sorted(pous) == ["FB_Motor", "FB_Unused", "FB_Valve", "FC_Scale", "PLC_PRG"]
+    prg = pous["PLC_PRG"]
+    assert prg.pou_type == "program"
+    assert len(prg.st_texts) == 2  # Main body and the Reset action
+    assert prg.st_texts[1] == "FB_MOTOR();"
+    assert prg.block_types == []
+    # typeName as an attribute and as a child element
+    assert pous["FB_Motor"].block_types == ["FC_Scale", "TON"]
+    assert pous["FB_Motor"].st_texts == []
+
+
+def test_read_pou_types(plcopen_export):
+    assert read_pou_types(plcopen_export) == {
+        "PLC_PRG": "program", "FB_Motor": "functionBlock", "FC_Scale": "function",
+        "FB_Unused": "functionBlock", "FB_Valve": "functionBlock",
+    }
+    assert read_pou_names(plcopen_export) == set(read_pou_types(plcopen_export))
+
+
+def test_read_pou_folders(plcopen_export):
+    assert read_pou_folders(plcopen_export) == {
+        "PLC_PRG": "", "FB_Motor": "Drives", "FC_Scale": "Drives/Math",
+    }
@@ -0,0 +1,77 @@
+"""qr_vector / archive_output: vector QR labels and the PDF writer produce well-formed files."""
+import re
+import zlib
+import xml.etree.ElementTree as ET
+
+from mypyhelpers.QRcodeMaker import FONT, FONT_SIZE, qr_matrix
+from mypyhelpers.archive_output import _PdfStream, vector_pdf
+from mypyhelpers.qr_vector import module_rects, qr_pdf_page, qr_svg
+from mypyhelpers.render_cache import get_font
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_rects_cover_exactly_the_dark_modules():
+    matrix = qr_matrix("https://example.com/parts/LM324")
+    drawn = [[0] * len(row) for row in matrix]
+    for x, y, w, h in module_rects(matrix):
+        for yy in range(y, y + h):
+            for xx in range(x, x + w):
+                drawn[yy][xx] += 1
+    assert drawn == [[int(bool(m)) for m in row] for row in matrix]
+
+
+def test_svg_parses():
+    matrix = qr_matrix("https://example.com")
+    root = ET.fromstring(qr_svg(matrix, "R&D <lab>", get_font(FONT, FONT_SIZE)))
+    assert root.tag == SVG + "svg"
+    assert root.find(SVG + "text").text == "R&D <lab>"
+    path = root.find(SVG + "path").get("d")
+    assert len(re.findall(r"M\d+ \d+h\d+v\d+h-\d+z", path)) == len(module_rects(matrix))
+
+
+def pdf_objects(pdf):
+    """Check the xref table and startxref against the file; returns {number: object bytes}."""
+    assert pdf.startswith(b"%PDF-1.4\n")
+    assert pdf.endswith(b"%%EOF\n")
+    xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", pdf).group(1))
+    assert pdf[xref:].startswith(b"xref\n")
+    count = int(re.match(rb"xref\n0 (\d+)\n", pdf[xref:]).group(1))
+    offsets = [int(o) for o in re.findall(rb"(\d{10}) 00000 n \n", pdf[xref:])]
+    assert len(offsets) == count - 1
+    assert b"/Size %d " % count in pdf[xref:]
+    objects = {}
+    for num, off in enumerate(offsets, 1):
+        assert pdf[off:].startswith(b"%d 0 obj\n" % num)
+        objects[num] = pdf[off:pdf.index(b"endobj", off)]
+    return objects
+
+
+def stream(obj):
+    data = obj[obj.index(b"stream\n") + 7:obj.rindex(b"\nendstream")]
+    return zlib.decompress(data) if b"/FlateDecode" in obj else data
+
+
+def test_vector_pdf_parses():
+    matrix = qr_matrix("https://example.com")
+    width, height, content = qr_pdf_page(matrix, "Motor (M1)", get_font(FONT, FONT_SIZE))
+    objects = pdf_objects(vector_pdf(width, height, content))
+    assert b"/Kids [5 0 R] /Count 1" in objects[2]
+    assert b"/Contents 4 0 R" in objects[5]
+    assert b"/BaseFont /Helvetica" in objects[3]
+    page = stream(objects[4])
+    assert b"(Motor \\(M1\\)) Tj" in page
+    assert page.count(b" re\n") + page.count(b" re f") == len(module_rects(matrix)) + 1
+
+
+def test_mixed_pages(tmp_path):
+    path = tmp_path / "sheet.pdf"
+    with open(str(path), "wb") as f:
+        pdf = _PdfStream(f, 150)
+        pdf.add_image_page(2, 1, "L", zlib.compress(b"\x00\xff"))
+        pdf.add_vector_page(10, 10, b"0 0 10 10 re f")
+        pdf.close()
+    objects = pdf_objects(path.read_bytes())
+    assert b"/Count 2" in objects[2]
+    assert b"/ColorSpace /DeviceGray" in objects[3]
+    assert stream(objects[3]) == b"\x00\xff"
@@ -0,0 +1,65 @@
+"""QRcodeMaker batch input: CSV/JSONL parsing and rows sharing an output file name."""
+import pytest
+
+from mypyhelpers.QRcodeMaker import iter_rows, main, make_labeled_qr
+from mypyhelpers.render_cache import text_bbox
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_csv_header_in_any_order(tmp_path):
+    path = write(tmp_path / "in.csv", "label,data,name\nL1,d1,n1\n,d2,n2\n")
+    assert list(iter_rows(path)) == [("n1", "d1", "L1"), ("n2", "d2", None)]
+
+
+def test_csv_header_without_data_column(tmp_path, capsys):
+    path = write(tmp_path / "h.csv", "name,url,label\na,b,c\n")
+    with pytest.raises(ValueError):
+        list(iter_rows(path))
+    with pytest.raises(SystemExit) as e:
+        main([path, "-o", str(tmp_path / "out"), "-j", "1"])
+    assert e.value.code == 2
+    assert "'data'" in capsys.readouterr().err
+
+
+def test_csv_short_rows_are_reported(tmp_path):
+    path = write(tmp_path / "s.csv", "name,label,data\na,L\nb,L2,d2\n\nc\n")
+    errors = []
+    assert list(iter_rows(path, errors)) == [("b", "d2", "L2")]
+    assert len(errors) == 2
+    assert errors[0].startswith("s.csv line 2:")
+
+
+def test_jsonl_bad_lines_are_reported(tmp_path):
+    path = write(tmp_path / "in.jsonl", '{"name": "a", "data": "x"}\n{"name": "b"}\nnot json\n[1]\n\n')
+    errors = []
+    assert list(iter_rows(path, errors)) == [("a", "x", None)]
+    assert [e.split(":")[0] for e in errors] == ["in.jsonl line 2", "in.jsonl line 3", "in.jsonl line 4"]
+
+
+def test_rows_sharing_an_output_name(tmp_path):
+    from mypyhelpers.QRcodeMaker import batch_generate
+    rows = "name,data\n" + "".join(f"same,d{i}\n" for i in range(5)) + "same,d0\nother,x\n"
+    path = write(tmp_path / "same.csv", rows)
+    out = tmp_path / "out"
+    summary = batch_generate(path, str(out), workers=1, chunk_rows=1, progress_every=0)
+    assert summary["images"] == 2 # The first "same" row and "other"; the repeat of d0 is not an error
+    assert len(summary["errors"]) == 4
+    assert all(e.startswith("same.png: ") for e in summary["errors"])
+    assert sorted(p.name for p in out.iterdir()) == ["other.png", "render_manifest.json", "same.png"]
+
+
+def test_labeled_qr_is_rgb_unless_asked_for_grayscale():
+    assert make_labeled_qr("https://example.com", "Label").mode == "RGB"
+    assert make_labeled_qr("https://example.com", "Label", mode="L").mode == "L"
+
+
+def test_text_bbox_on_fonts_without_getbbox():
+    class OldBitmapFont:  # Pillow < 9.2 load_default()
+        def getsize(self, text):
+            return 6 * len(text), 11
+
+    assert text_bbox("abc", OldBitmapFont()) == (0, 0, 18, 11)
@@ -0,0 +1,62 @@
+"""Create_social_card batch mode: manifest rows, failures and the render cache."""
+import json
+import os
+
+from mypyhelpers.Create_social_card import batch_social_cards
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def picture(path, size=(200, 100)):
+    from PIL import Image
+    Image.new("RGB", size, (40, 90, 160)).save(path)
+    return str(path)
+
+
+def test_missing_image_is_an_error_and_not_cached(tmp_path):
+    picture(tmp_path / "photo.jpg")
+    manifest = write(tmp_path / "cards.csv", "repo_name,image,subtext,output\n"
+                                             "good,photo.jpg,fine,good.png\n"
+                                             "bad,missing.jpg,no picture,bad.png\n")
+    out = str(tmp_path / "out")
+    for _ in range(2): # The failed card must not count as up to date the second time
+        summary = batch_social_cards(manifest, out, workers=1)
+        assert len(summary["errors"]) == 1
+        assert summary["errors"][0].startswith("bad.png: ")
+    assert summary["skipped"] == 1
+    assert sorted(os.listdir(out)) == ["good.png", "render_manifest.json"]
+    with open(os.path.join(out, "render_manifest.json")) as f:
+        assert list(json.load(f)["files"]) == ["good.png"]
+
+
+def test_bad_jsonl_lines_are_reported(tmp_path):
+    from mypyhelpers.Create_social_card import iter_card_rows
+    picture(tmp_path / "photo.jpg")
+    manifest = write(tmp_path / "cards.jsonl", '{"repo_name": "a", "image": "photo.jpg", "subtext": "x"}\n'
+                                               '{"repo_name": "b", broken\n'
+                                               '["not", "an", "object"]\n'
+                                               '\n'
+                                               '{"repo_name": "c", "image": "photo.jpg"}\n')
+    errors = []
+    assert [row[0] for row in iter_card_rows(manifest, errors)] == ["a.png", "c.png"]
+    assert [e.split(": ")[0] for e in errors] == ["cards.jsonl:2", "cards.jsonl:3"]
+
+    summary = batch_social_cards(manifest, str(tmp_path / "out"), workers=1)
+    assert summary["cards"] == 2
+    assert len(summary["errors"]) == 2
+
+
+def test_single_card_decodes_at_full_quality(tmp_path, monkeypatch):
+    from mypyhelpers import Create_social_card
+    seen = []
+    load = Create_social_card.load_picture
+    monkeypatch.setattr(Create_social_card, "load_picture",
+                        lambda path, size, draft=True: seen.append(draft) or load(path, size, draft))
+    image = picture(tmp_path / "photo.jpg")
+    Create_social_card.create_social_card("repo", image, "text", str(tmp_path / "card.png"))
+    batch_social_cards(write(tmp_path / "cards.csv", "repo_name,image,subtext\nrepo,photo.jpg,text\n"),
+                       str(tmp_path / "out"), workers=1)
+    assert seen == [False, True]
@@ -0,0 +1,35 @@
+"""st_scanner: ST call detection skips comments, strings and pragmas and ignores case."""
+from mypyhelpers.st_scanner import PouIndex, scan_calls, scan_references
+
+INDEX = PouIndex(["FB_Motor", "FB_MotorGroup", "FC_Scale", "FB_Valve"])
+
+
+def test_calls_ignore_case_and_map_to_export_spelling():
+    assert scan_calls("fb_motor(); FC_SCALE (x := 1);\nfc_scale\n(2);", INDEX) == set(["FB_Motor", "FC_Scale"])
+
+
+def test_whole_tokens_only():
+    assert scan_calls("FB_MotorGroup(); My_FB_Motor(); FB_Motor2();", INDEX) == set(["FB_MotorGroup"])
+
+
+def test_comments_strings_and_pragmas_hold_no_calls():
+    text = """
+    (* FB_Motor(); *)
+    /* FC_Scale(); */
+    // FB_Valve();
+    s := 'FB_Motor()';
+    ws := "FC_Scale($"x$")";
+    {attribute 'FB_Valve()'}
+    t := T#5S; n := 16#FB_Motor;
+    """
+    assert scan_calls(text, INDEX) == set()
+
+
+def test_unterminated_comment_runs_to_the_end():
+    assert scan_calls("FB_Valve(); (* FB_Motor();", INDEX) == set(["FB_Valve"])
+
+
+def test_references_include_declarations():
+    text = "VAR fbMotor : FB_Motor; END_VAR\nfbMotor(); // FC_Scale"
+    assert scan_calls(text, INDEX) == set()
+    assert scan_references(text, INDEX) == set(["FB_Motor"])